@@ -2,9 +2,9 @@
 import sys
 from pathlib import Path
 
-# Add your src/ folder to sys.path
+# Add your src/ folder to sys.path (BASE is models-api/)
 BASE = Path(__file__).resolve().parent.parent
-sys.path.append(str(BASE / "models-api" / "src"))
+sys.path.append(str(BASE / "src"))
 
 # Import the FastAPI app
 from fastapi_app import app
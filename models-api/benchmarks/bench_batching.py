@@ -0,0 +1,66 @@
+# models-api/benchmarks/bench_batching.py
+"""
+In-process comparison of single-patient scoring with and without the micro-batcher:
+N concurrent coroutines each score patients one at a time, either through their own
+executor call (_score([row])) or through MicroBatcher.submit(row). No HTTP, so the numbers
+isolate the per-call model overhead the batcher removes. The prediction cache is off.
+
+    python benchmarks/bench_batching.py --clients 1 8 64 --window-ms 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import fastapi_app as api  # noqa: E402
+from micro_batcher import MicroBatcher  # noqa: E402
+
+
+def _patients(n: int):
+    rng = random.Random(0)
+    return [api.decode_patient({
+        "age": rng.randint(20, 85), "sbp": rng.randint(100, 180), "ldl": round(rng.uniform(1.5, 5.5), 2),
+        "hba1c": round(rng.uniform(4.5, 9.5), 1), "bmi": round(rng.uniform(18, 40), 1),
+    }) for _ in range(n)]
+
+
+async def _drive(fn, patients, clients: int):
+    queue, latencies = list(patients), []
+
+    async def client():
+        while queue:
+            p = queue.pop()
+            t0 = time.perf_counter()
+            await fn(p)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(clients)])
+    return time.perf_counter() - t0, sorted(latencies)
+
+
+async def main(args) -> None:
+    api.executor.start()
+    batcher = MicroBatcher(api._score, args.window_ms, args.max_batch)
+    patients = _patients(args.requests)
+    await _drive(batcher.submit, patients[:64], 8)  # warm-up: loads models, compiles plans
+    for clients in args.clients:
+        for name, fn in (("single", lambda p: api._score([p])), ("batched", batcher.submit)):
+            wall, lat = await _drive(fn, patients, clients)
+            print(f"{clients:4d} clients  {name:8s} {len(lat) / wall:8.0f} req/s   "
+                  f"p50 {lat[len(lat) // 2] * 1e3:7.2f} ms   p99 {lat[int(len(lat) * 0.99)] * 1e3:7.2f} ms")
+    sizes = batcher.status()["batch_size"]
+    print(f"batches: {sizes['count']}, mean size {sizes['sum'] / max(1, sizes['count']):.1f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    ap.add_argument("--requests", type=int, default=640)
+    ap.add_argument("--window-ms", type=float, default=2.0)
+    ap.add_argument("--max-batch", type=int, default=64)
+    asyncio.run(main(ap.parse_args()))
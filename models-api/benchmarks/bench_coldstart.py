@@ -0,0 +1,108 @@
+# models-api/benchmarks/bench_coldstart.py
+"""
+Cold-start profile of the serverless entry point api/index.py.
+
+import: runs `import index` in fresh interpreters under `python -X importtime` and reports
+the median total import time, the modules with the largest self time (from the last run)
+and whether numpy / joblib / sklearn were imported. Use --api-dir to profile another
+checkout (e.g. a worktree of the previous commit) for a before/after comparison.
+
+serve: starts uvicorn in each STARTUP_MODE and reports the time from process start to the
+first successful GET /health and then to the first scored POST /api/patient/add.
+
+    python benchmarks/bench_coldstart.py --top 15
+    python benchmarks/bench_coldstart.py --api-dir /tmp/before/models-api/api --no-serve
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api")
+HEAVY = ("numpy", "joblib", "sklearn")
+
+
+def _importtime(api_dir: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """Total import time (s) of `import index` and (module, self us, cumulative us) per imported module."""
+    code = f"import sys; sys.path.insert(0, {os.path.abspath(api_dir)!r}); import index"
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.abspath(api_dir)))
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr[-2000:])
+    modules, total = [], 0
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cum_us)))
+        if not name[1:].startswith(" "):  # top-level import: its cumulative time covers its children
+            total += int(cum_us)
+    return total / 1e6, modules
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(mode: str) -> Dict[str, float]:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, STARTUP_MODE=mode)
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "index:app", "--port", str(port), "--log-level", "warning"],
+        cwd=API_DIR, env=env,
+    )
+    out = {}
+    try:
+        while "health" not in out:
+            try:
+                if httpx.get(f"{url}/health", timeout=5).status_code == 200:
+                    out["health"] = time.perf_counter() - t0
+            except httpx.HTTPError:
+                time.sleep(0.01)
+            if time.perf_counter() - t0 > 60:
+                raise RuntimeError("API did not come up")
+        r = httpx.post(f"{url}/api/patient/add", json={"age": 55, "sbp": 140, "ldl": 3.5}, timeout=60)
+        r.raise_for_status()
+        out["first_score"] = time.perf_counter() - t0
+    finally:
+        proc.terminate()
+        proc.wait()
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--api-dir", default=API_DIR, help="directory holding index.py (default: this checkout)")
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10, help="modules to list by self time")
+    ap.add_argument("--no-serve", action="store_true", help="skip the uvicorn time-to-first-response runs")
+    args = ap.parse_args()
+
+    runs = [_importtime(args.api_dir) for _ in range(args.repeats)]
+    total = statistics.median(t for t, _ in runs)
+    modules = runs[-1][1]
+    names = {name for name, _, _ in modules}
+    print(f"import index: {total * 1e3:.0f} ms (median of {args.repeats})   "
+          f"heavy modules: {', '.join(m for m in HEAVY if m in names) or 'none'}")
+    for name, self_us, cum_us in sorted(modules, key=lambda m: -m[1])[:args.top]:
+        print(f"  {self_us / 1e3:8.1f} ms self  {cum_us / 1e3:8.1f} ms cumulative  {name}")
+
+    if not args.no_serve:
+        for mode in ("lazy", "prewarm", "eager"):
+            res = [_serve(mode) for _ in range(max(1, args.repeats // 2))]
+            print(f"STARTUP_MODE={mode:8s} first /health {statistics.median(r['health'] for r in res):6.2f} s   "
+                  f"first prediction {statistics.median(r['first_score'] for r in res):6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
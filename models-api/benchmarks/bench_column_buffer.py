@@ -0,0 +1,130 @@
+# models-api/benchmarks/bench_column_buffer.py
+"""
+Batch feature extraction into preallocated column buffers against the previous path of
+one dict per patient (labels computed per patient) packed by pack_rows.
+
+Synthetic bundles are parsed once up front, so only the accumulate -> features -> batch
+part is timed. Both paths must give identical RecordBatches (values, NaN positions and
+kind codes); the best time per bundle and the tracemalloc peak of one whole batch are
+reported for each.
+
+    python benchmarks/bench_column_buffer.py --bundles 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+from data_preparation_model_training import (  # noqa: E402
+    FEATURE_COLUMNS, accumulate_bundle, add_labels, new_feature_buffer, years_between,
+)
+from feature_store import pack_rows  # noqa: E402
+from synthetic_fhir import make_bundle  # noqa: E402
+
+
+# ─── Reference: per-patient dict with scalar rules, as before the column buffers ───
+def _cvd_risk(age, gender, sbp, dbp, tc, hdl, ldl, smoking_status, has_dm, family_cad) -> int:
+    score = 0
+    if age and age >= 50: score += 2 if age >= 65 else 1
+    if gender == 1 and age and age >= 45: score += 1
+    if tc and tc >= 6.2: score += 2
+    elif tc and tc >= 5.2: score += 1
+    if hdl and ((gender == 1 and hdl < 1.0) or (gender == 0 and hdl < 1.3)): score += 1
+    if ldl and ldl >= 4.1: score += 2
+    elif ldl and ldl >= 2.6: score += 1
+    if sbp and sbp >= 160 or dbp and dbp >= 100: score += 2
+    elif sbp and sbp >= 140 or dbp and dbp >= 90: score += 1
+    if smoking_status == 2: score += 2
+    elif smoking_status == 1: score += 1
+    if has_dm: score += 2
+    if family_cad: score += 1
+    return 2 if score >= 8 else 1 if score >= 4 else 0
+
+
+def _reference_row(acc) -> dict:
+    age = years_between(acc.patient.get("birthDate"))
+    gender = acc.patient.get("gender", "").lower()
+    gender = 1 if gender == "male" else 0 if gender == "female" else None
+    family_cad = 0
+    for rel_age in acc.fam_ascvd_ages:
+        if rel_age is None or rel_age < (55 if gender == 1 else 65):
+            family_cad = 1
+    smoker = acc.SMOKE_MAP.get(acc.smoking_code, 0)
+    return dict(
+        age=age, gender=gender, sbp=acc.sbp, dbp=acc.dbp, glucose=acc.glucose, bmi=acc.bmi,
+        tc=acc.tc, hdl=acc.hdl, ldl=acc.ldl, smoker=smoker, dm=int(acc.has_dm), htn=int(acc.has_htn),
+        fam_cad=family_cad,
+        risk_label=_cvd_risk(age, gender, acc.sbp, acc.dbp, acc.tc, acc.hdl, acc.ldl, smoker, acc.has_dm, family_cad),
+        hba1c=acc.hba1c, alt=acc.alt, ast=acc.ast, creat=acc.creat, egfr=acc.egfr, uacr=acc.uacr,
+        bilirubin=acc.bilirubin,
+        diabetes_label=int(bool(acc.has_diabetes_icd or (acc.hba1c is not None and acc.hba1c >= 6.5))),
+        ckd_label=int(bool(acc.has_ckd_icd or (acc.egfr is not None and acc.egfr < 60)
+                           or (acc.creat is not None and acc.creat > 120))),
+        nafld_label=int(bool(acc.has_nafld_icd or (acc.alt is not None and acc.alt > 70)
+                             or (acc.ast is not None and acc.ast > 70))),
+    )
+
+
+def dict_batch(bundles):
+    return pack_rows([_reference_row(accumulate_bundle(b)) for b in bundles], FEATURE_COLUMNS)
+
+
+def buffer_batch(bundles):
+    buf = new_feature_buffer(len(bundles))
+    for b in bundles:
+        accumulate_bundle(b).write(buf)
+    add_labels(buf)
+    return buf.record_batch(FEATURE_COLUMNS)
+
+
+# ─── Measurement ───
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(n_bundles: int, repeats: int) -> bool:
+    rng = random.Random(0)
+    bundles = [make_bundle(rng) for _ in range(n_bundles)]
+
+    (v_ref, k_ref), (v_buf, k_buf) = dict_batch(bundles), buffer_batch(bundles)
+    ok = np.array_equal(v_ref, v_buf, equal_nan=True) and np.array_equal(k_ref, k_buf)
+    labels = FEATURE_COLUMNS.index("risk_label")
+    print(f"{n_bundles} bundles  parity: {'OK' if ok else 'MISMATCH'}  "
+          f"risk_label counts {np.bincount(v_buf[labels].astype(int)).tolist()}")
+
+    t_dict = _best_of(lambda: dict_batch(bundles), repeats) / n_bundles
+    t_buf = _best_of(lambda: buffer_batch(bundles), repeats) / n_bundles
+    print(f"  time/bundle   dicts + pack_rows {t_dict * 1e6:7.1f} us   column buffer {t_buf * 1e6:7.1f} us   "
+          f"x{t_dict / t_buf:.2f}")
+    m_dict, m_buf = _peak(lambda: dict_batch(bundles)), _peak(lambda: buffer_batch(bundles))
+    print(f"  peak traced   dicts + pack_rows {m_dict / 2**20:7.2f} MiB  column buffer {m_buf / 2**20:7.2f} MiB")
+    return ok
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--bundles", type=int, default=2000)
+    ap.add_argument("--repeats", type=int, default=5)
+    args = ap.parse_args()
+    sys.exit(0 if run(args.bundles, args.repeats) else 1)
@@ -0,0 +1,110 @@
+# models-api/benchmarks/bench_export.py
+"""
+Parity and footprint of the NumPy-only forest exports (<model>.forest.npz) against the
+sklearn joblib artifacts they were written from.
+
+For every disease with both artifacts in the models directory, random inputs spread
+around the training medians (from the schema) are scored by scaler.transform +
+predict_proba and by the exported forest; the largest absolute probability difference is
+reported and must stay within --tolerance. Then artifact sizes on disk and the import +
+first prediction cost of each path are compared, each in a fresh interpreter.
+
+    python data_preparation_model_training.py --export-only   # exports for existing models
+    python benchmarks/bench_export.py --rows 20000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+from disease_specs import DISEASES  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+
+# one prediction through each path, timed from interpreter start
+_COLD = """
+import sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {src!r})
+import numpy as np
+if {sklearn}:
+    import joblib
+    model = joblib.load({model!r}); scaler = joblib.load({scaler!r})
+    model.predict_proba(scaler.transform(np.zeros((1, model.n_features_in_))))
+else:
+    from forest_engine import CompiledForest
+    forest = CompiledForest.load({forest!r})
+    forest.predict_proba(np.zeros((1, forest.n_features)))
+print(time.perf_counter() - t0, "sklearn" in sys.modules)
+"""
+
+
+def _inputs(spec, models_dir: str, rows: int, rng: np.random.Generator) -> np.ndarray:
+    center = np.array([spec.defaults.get(c, 0.0) for c in spec.features], dtype=float)
+    schema_path = os.path.join(models_dir, spec.schema_file)
+    if os.path.exists(schema_path):
+        with open(schema_path, "r", encoding="utf-8") as f:
+            medians = json.load(f).get("medians", {})
+        center = np.array([medians.get(c) if medians.get(c) is not None else v
+                           for c, v in zip(spec.features, center)], dtype=float)
+    spread = np.maximum(np.abs(center) * 0.5, 1.0)
+    return center + rng.standard_normal((rows, len(center))) * spread
+
+
+def _cold(models_dir: str, spec, sklearn: bool) -> tuple:
+    code = _COLD.format(src=SRC_DIR, sklearn=sklearn, model=os.path.join(models_dir, spec.model_file),
+                        scaler=os.path.join(models_dir, spec.scaler_file),
+                        forest=os.path.join(models_dir, spec.forest_file))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+    return float(out[0]), out[1] == "True"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--models-dir", default=os.path.join(SRC_DIR, "..", "models"))
+    ap.add_argument("--rows", type=int, default=10_000)
+    ap.add_argument("--tolerance", type=float, default=1e-9, help="largest allowed |p_sklearn - p_numpy|")
+    args = ap.parse_args()
+
+    import joblib
+
+    rng = np.random.default_rng(0)
+    failed = False
+    for spec in DISEASES.values():
+        paths = [os.path.join(args.models_dir, f) for f in (spec.model_file, spec.scaler_file, spec.forest_file)]
+        if not all(os.path.exists(p) for p in paths):
+            print(f"{spec.name:9s} skipped (needs {spec.model_file}, {spec.scaler_file} and {spec.forest_file})")
+            continue
+        model, scaler = joblib.load(paths[0]), joblib.load(paths[1])
+        forest = CompiledForest.load(paths[2])
+        X = _inputs(spec, args.models_dir, args.rows, rng)
+
+        t0 = time.perf_counter()
+        expected = model.predict_proba(scaler.transform(X))
+        t_sklearn = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = forest.predict_proba(X)
+        t_numpy = time.perf_counter() - t0
+        diff = float(np.abs(expected - got).max())
+        same_classes = np.array_equal(model.classes_, forest.classes)
+        ok = same_classes and diff <= args.tolerance
+        failed |= not ok
+
+        joblib_kb = (os.path.getsize(paths[0]) + os.path.getsize(paths[1])) / 1024
+        cold_sk, _ = _cold(args.models_dir, spec, sklearn=True)
+        cold_np, np_imported_sklearn = _cold(args.models_dir, spec, sklearn=False)
+        print(f"{spec.name:9s} {'OK  ' if ok else 'FAIL'} max|dp| {diff:.2e} over {args.rows} rows "
+              f"({t_sklearn * 1e3:.1f} ms sklearn, {t_numpy * 1e3:.1f} ms numpy)\n"
+              f"          artifacts {joblib_kb:8.0f} KiB joblib  {os.path.getsize(paths[2]) / 1024:8.0f} KiB npz\n"
+              f"          cold import + first prediction  sklearn {cold_sk * 1e3:6.0f} ms  "
+              f"numpy {cold_np * 1e3:6.0f} ms (sklearn imported: {np_imported_sklearn})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
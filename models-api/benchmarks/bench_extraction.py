@@ -0,0 +1,149 @@
+# models-api/benchmarks/bench_extraction.py
+"""
+Per-resource classification cost in feature extraction: the LOINC/ICD-10 dispatch index
+(LOINC_INDEX / ICD10_FLAGS) against the original elif chain of set intersections and
+startswith scans, on synthetic bundles. Also checks both give identical features.
+
+    python benchmarks/bench_extraction.py --bundles 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+from data_preparation_model_training import ASCVD_CODES, LOINC_CODES, PatientFeatureAccumulator, loinc_in  # noqa: E402
+from synthetic_fhir import make_bundle  # noqa: E402
+
+
+class ChainAccumulator(PatientFeatureAccumulator):
+    """Reference: the classification code as it was before the dispatch index."""
+
+    def _add_family_history(self, fh):
+        rel_age = None
+        if "age" in fh and isinstance(fh["age"], dict):
+            rel_age = fh["age"].get("value")
+        for cond in fh.get("condition", []):
+            for coding in cond.get("code", {}).get("coding", []):
+                icd = coding.get("code", "")
+                if any(icd.startswith(c) for c in ASCVD_CODES):
+                    self.fam_ascvd_ages.append(rel_age)
+
+    def _add_observation(self, obs):
+        codes = loinc_in(obs)
+        valq  = obs.get("valueQuantity")
+        value = valq.get("value") if valq else None
+        unit  = valq.get("unit") if valq else None
+        if not value:
+            if LOINC_CODES["BP_PANEL"] & codes:
+                for comp in obs.get("component", []):
+                    c_codes = loinc_in(comp)
+                    c_val   = comp.get("valueQuantity", {}).get("value")
+                    if LOINC_CODES["SBP"] & c_codes and self.sbp is None:
+                        self.sbp = c_val
+                    if LOINC_CODES["DBP"] & c_codes and self.dbp is None:
+                        self.dbp = c_val
+            return
+        if codes & LOINC_CODES["SBP"]:
+            self.sbp = value
+        elif codes & LOINC_CODES["DBP"]:
+            self.dbp = value
+        elif codes & LOINC_CODES["GLU"]:
+            self.glucose = round(value / 18.0, 2) if value > 50 else value
+        elif codes & LOINC_CODES["BMI"]:
+            self.bmi = value
+        elif codes & LOINC_CODES["TC"]:
+            self.tc = value if unit and "mmol" in unit else round(value / 38.67, 2)
+        elif codes & LOINC_CODES["HDL"]:
+            self.hdl = value if unit and "mmol" in unit else round(value / 38.67, 2)
+        elif codes & LOINC_CODES["LDL"]:
+            self.ldl = value if unit and "mmol" in unit else round(value / 38.67, 2)
+        elif codes & LOINC_CODES["SMOKE"]:
+            self.smoking_code = obs.get("valueCodeableConcept", {}).get("coding", [{}])[0].get("code")
+        elif codes & LOINC_CODES["HBA1C"]:
+            self.hba1c = value
+        elif codes & LOINC_CODES["ALT"]:
+            self.alt = value
+        elif codes & LOINC_CODES["AST"]:
+            self.ast = value
+        elif codes & LOINC_CODES["CREAT"]:
+            self.creat = value
+        elif codes & LOINC_CODES["EGFR"]:
+            self.egfr = value
+        elif codes & LOINC_CODES["UACR"]:
+            self.uacr = value
+        elif codes & LOINC_CODES["BILIRUBIN"]:
+            self.bilirubin = value
+
+    def _add_condition(self, cond):
+        for coding in cond.get("code", {}).get("coding", []):
+            cc = coding.get("code", "").upper()
+            disp = coding.get("display", "").lower()
+            if cc.startswith("I10") or "hypertension" in disp:
+                self.has_htn = True
+            if cc.startswith("E11") or "diabetes" in disp:
+                self.has_dm = True
+                self.has_diabetes_icd = True
+            if cc.startswith("N18"):
+                self.has_ckd_icd = True
+            if cc.startswith("K76"):
+                self.has_nafld_icd = True
+
+
+def _extract(cls, bundle):
+    acc = cls()
+    for entry in bundle["entry"]:
+        acc.add(entry["resource"])
+    return acc.finish()
+
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _per_resource(method_name, cls, resources, repeats):
+    def run():
+        acc = cls()
+        method = getattr(acc, method_name)
+        for res in resources:
+            method(res)
+    return _best_of(run, repeats) / len(resources)
+
+
+def run(n_bundles: int, repeats: int) -> None:
+    rng = random.Random(0)
+    bundles = [make_bundle(rng) for _ in range(n_bundles)]
+    resources = [e["resource"] for b in bundles for e in b["entry"]]
+    by_type = {}
+    for res in resources:
+        by_type.setdefault(res["resourceType"], []).append(res)
+
+    mismatches = sum(_extract(ChainAccumulator, b) != _extract(PatientFeatureAccumulator, b) for b in bundles)
+    print(f"{n_bundles} bundles, {len(resources)} resources  parity: "
+          f"{'OK' if not mismatches else f'{mismatches} MISMATCHED bundles'}")
+
+    for rtype, method in (("Observation", "_add_observation"), ("Condition", "_add_condition"),
+                          ("FamilyMemberHistory", "_add_family_history")):
+        t_chain = _per_resource(method, ChainAccumulator, by_type[rtype], repeats)
+        t_index = _per_resource(method, PatientFeatureAccumulator, by_type[rtype], repeats)
+        print(f"  {rtype:20s} chain {t_chain * 1e9:7.0f} ns   index {t_index * 1e9:7.0f} ns   x{t_chain / t_index:.2f}")
+
+    t_chain = _best_of(lambda: [_extract(ChainAccumulator, b) for b in bundles], repeats) / n_bundles
+    t_index = _best_of(lambda: [_extract(PatientFeatureAccumulator, b) for b in bundles], repeats) / n_bundles
+    print(f"  {'whole bundle':20s} chain {t_chain * 1e6:7.1f} us   index {t_index * 1e6:7.1f} us   x{t_chain / t_index:.2f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--bundles", type=int, default=500)
+    ap.add_argument("--repeats", type=int, default=7)
+    args = ap.parse_args()
+    run(args.bundles, args.repeats)
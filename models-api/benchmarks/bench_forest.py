@@ -0,0 +1,76 @@
+# models-api/benchmarks/bench_forest.py
+"""
+Parity check + latency benchmark: sklearn predict_proba vs the compiled forest engine.
+
+Fits a StandardScaler + RandomForestClassifier the same way train_model_for_label does
+(on processed_multidisease_data.csv), then compares probabilities and timings for
+single-row and growing batch sizes. Exits 1 if any probability differs (the parity tests
+themselves are tests/test_forest_engine.py).
+
+    python benchmarks/bench_forest.py --n-estimators 200 400
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+from forest_engine import CompiledForest  # noqa: E402
+
+CARDIO_COLS = ["age", "gender", "sbp", "dbp", "glucose", "bmi", "tc", "hdl", "ldl", "smoker", "dm", "htn", "fam_cad"]
+
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(n_estimators: int, max_depth, repeats: int, csv_path: str) -> bool:
+    df = pd.read_csv(csv_path)
+    X = df[CARDIO_COLS].to_numpy(dtype=float)
+    y = df["risk_label"].to_numpy()
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(
+        n_estimators=n_estimators, max_depth=max_depth, class_weight="balanced", random_state=42
+    ).fit(scaler.transform(X), y)
+
+    t0 = time.perf_counter()
+    engine = CompiledForest.from_sklearn(model, scaler)
+    compile_s = time.perf_counter() - t0
+
+    ref = model.predict_proba(scaler.transform(X))
+    got = engine.predict_proba(X)
+    max_err = float(np.abs(ref - got).max())
+    ok = ref.shape == got.shape and max_err < 1e-12
+
+    print(f"n_estimators={n_estimators} max_depth={max_depth} nodes={len(engine.feature)} "
+          f"depth={engine.max_depth} compile={compile_s * 1e3:.1f}ms size={engine.nbytes / 1e6:.1f}MB")
+    print(f"  parity   max|sklearn - compiled| = {max_err:.2e}  ({'OK' if ok else 'MISMATCH'})")
+    for rows in (1, 16, 64, 256, 1024, len(X)):
+        batch = X[:rows]
+        reps = max(3, repeats * 16 // (16 + rows))
+        t_sk = _best_of(lambda: model.predict_proba(scaler.transform(batch)), reps)
+        t_cf = _best_of(lambda: engine.predict_proba(batch), reps)
+        print(f"  {rows:5d} rows  sklearn {t_sk * 1e3:8.2f} ms   compiled {t_cf * 1e3:8.2f} ms   x{t_sk / t_cf:.1f}")
+    return ok
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n-estimators", type=int, nargs="+", default=[200, 400])
+    ap.add_argument("--max-depth", type=int, default=None)
+    ap.add_argument("--repeats", type=int, default=50)
+    ap.add_argument("--csv", default=os.path.join(SRC_DIR, "processed_multidisease_data.csv"))
+    args = ap.parse_args()
+    results = [run(n, args.max_depth, args.repeats, args.csv) for n in args.n_estimators]
+    sys.exit(0 if all(results) else 1)
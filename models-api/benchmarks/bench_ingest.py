@@ -0,0 +1,93 @@
+# models-api/benchmarks/bench_ingest.py
+"""
+Request ingest cost: the compiled decoder (patient_schema.decode_patient) against
+validating every record into a PatientIn and reading its fields back (the path the
+endpoints used before), at 1, 100 and 10,000 patients per request.
+
+Each round parses the same JSON body and turns it into the scoring matrix; the best
+round of each path is reported per patient, next to the scoring time of that matrix
+(prediction cache off), so the share of a request spent on ingest is visible. Both
+paths must produce the same matrix, and the sample records include the spellings the
+frontend sends ("" for blank fields, "0"/"1" flags).
+
+    python benchmarks/bench_ingest.py --sizes 1 100 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import scoring  # noqa: E402
+from patient_schema import PatientIn, decode_patient, patient_row  # noqa: E402
+
+
+def _records(n: int):
+    rng = random.Random(0)
+    out = []
+    for _ in range(n):
+        rec = {
+            "name": "Test Patient", "email": "", "age": rng.randint(20, 85), "gender": rng.choice(["0", "1"]),
+            "sbp": rng.randint(100, 180), "dbp": rng.randint(60, 110), "bmi": round(rng.uniform(18, 40), 1),
+            "glucose": round(rng.uniform(4, 12), 1), "tc": round(rng.uniform(3.5, 7.5), 2),
+            "hdl": round(rng.uniform(0.8, 2.0), 2), "ldl": round(rng.uniform(1.5, 5.5), 2),
+            "hba1c": round(rng.uniform(4.5, 9.5), 1), "smoker": rng.choice(["0", "1", ""]),
+            "dm": rng.choice(["0", "1"]), "htn": rng.choice(["0", "1"]), "fam_cad": rng.choice(["0", "1", ""]),
+        }
+        for field in ("alt", "ast", "creat", "egfr", "uacr", "bilirubin"):
+            rec[field] = rng.choice(["", None, round(rng.uniform(10, 120), 1)])
+        out.append(rec)
+    return out
+
+
+def via_model(body: bytes) -> np.ndarray:
+    return scoring._row_matrix([patient_row(PatientIn.model_validate(r)) for r in json.loads(body)])
+
+
+def via_decoder(body: bytes) -> np.ndarray:
+    return scoring._row_matrix([decode_patient(r) for r in json.loads(body)])
+
+
+def _best_of(fn, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    ap.add_argument("--patients", type=int, default=20_000, help="patients decoded per round (whole requests)")
+    ap.add_argument("--rounds", type=int, default=7)
+    args = ap.parse_args()
+
+    scoring.load_models()
+    ok = True
+    for size in args.sizes:
+        body = json.dumps(_records(size)).encode()
+        requests = max(1, args.patients // size)
+        same = np.array_equal(via_model(body), via_decoder(body), equal_nan=True)
+        ok &= same
+
+        t_model = _best_of(lambda: [via_model(body) for _ in range(requests)], args.rounds) / (requests * size)
+        t_fast = _best_of(lambda: [via_decoder(body) for _ in range(requests)], args.rounds) / (requests * size)
+        raw = via_decoder(body)
+        scoring.score_matrix(raw)  # warm-up: loads the models, faults in the forests
+        t_score = _best_of(lambda: [scoring.score_matrix(raw) for _ in range(requests)], args.rounds) / (requests * size)
+        print(f"{size:6d} patients/request  {'OK  ' if same else 'DIFF'} "
+              f"ingest PatientIn {t_model * 1e6:6.2f} us  decoder {t_fast * 1e6:6.2f} us  x{t_model / t_fast:.1f}   "
+              f"scoring {t_score * 1e6:7.2f} us   ingest share {t_model / (t_model + t_score) * 100:4.1f}% -> "
+              f"{t_fast / (t_fast + t_score) * 100:4.1f}%  (per patient)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# models-api/benchmarks/bench_lookup.py
+"""
+Precomputed probability tables (<model>.lookup.npz, see lookup_table.py) against exact
+inference through the serving engine, for every disease that has one.
+
+Parity: every grid cell sampled (each axis on a grid point or missing) must be a hit
+and read back the exact engine output bit for bit, and inputs moved off the grid points
+must not be answered from the table (they go to the model), or the run fails. Latency:
+P(positive) per row from the table and from the engine (prediction cache off) at a few
+batch sizes, on grid rows.
+
+    RISK_LOOKUP=all python benchmarks/bench_lookup.py --sizes 1 64 1024
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import scoring  # noqa: E402
+from disease_specs import DISEASES  # noqa: E402
+
+
+def _best_of(fn, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 64, 1024])
+    ap.add_argument("--cells", type=int, default=50_000, help="grid cells checked for exact parity per disease")
+    ap.add_argument("--samples", type=int, default=50_000, help="off-grid inputs checked to miss the table")
+    ap.add_argument("--rows", type=int, default=20_000, help="rows scored per round in the latency runs")
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+
+    artifacts = scoring.active()
+    ok, found = True, False
+    for spec in DISEASES.values():
+        table = artifacts.registry.lookup(spec.model_stem)
+        plan = artifacts.plans.get(spec.name)
+        if table is None or plan is None:
+            print(f"{spec.name:8s} no usable {spec.lookup_file}, skipped")
+            continue
+        found = True
+        if not table.matches(plan.columns, plan.fill) or table.meta.get("positive_classes") != list(spec.positive_classes):
+            print(f"{spec.name:8s} FAIL table built for other columns / imputation values / positive classes "
+                  f"than the serving plan")
+            ok = False
+            continue
+
+        def exact(X: np.ndarray) -> np.ndarray:
+            return scoring._positive_proba(plan, X, artifacts.registry)
+
+        rng = np.random.default_rng(0)
+        cells = table.sample_inputs(args.cells, rng)
+        hit, p = table.lookup(cells)
+        expected = exact(np.where(np.isnan(cells), table.fill, cells))
+        bad = int(np.count_nonzero(~hit)) + int(np.count_nonzero(p[hit] != expected[hit]))
+        # every grid feature moved off its point (or missing): no row may be a hit unless all are missing
+        off = table.sample_inputs(args.samples, rng, off_grid=1.0)
+        off_hit, _ = table.lookup(off)
+        leaked = int(np.count_nonzero(off_hit & ~np.isnan(off[:, table.grid_index]).all(axis=1)))
+        ok &= bad == 0 and leaked == 0
+        print(f"{spec.name:8s} {'OK  ' if not bad else 'FAIL'} {bad} of {args.cells} grid cells differ from the "
+              f"engine   table {table.table.size:,} cells ({table.table.nbytes / 2**20:.1f} MiB) over {table.grid_columns}")
+        print(f"         {'OK  ' if not leaked else 'FAIL'} {leaked} of {args.samples} off-grid inputs answered from "
+              f"the table   memory-mapped: {table.mmapped}")
+
+        rows = table.sample_inputs(args.rows, rng)  # grid points only: all hits
+        filled = np.where(np.isnan(rows), table.fill, rows)
+        exact(filled[:1])  # warm-up: loads the forest
+        for size in args.sizes:
+            n = args.rows - args.rows % size or size
+            t_lookup = _best_of(lambda: [table.lookup(rows[i:i + size]) for i in range(0, n, size)], args.rounds) / n
+            t_exact = _best_of(lambda: [exact(filled[i:i + size]) for i in range(0, n, size)], args.rounds) / n
+            print(f"         {size:5d} rows/call  lookup {t_lookup * 1e6:8.2f} us/row  engine {t_exact * 1e6:8.2f} us/row"
+                  f"  x{t_exact / t_lookup:.0f}")
+    sys.exit(0 if ok and found else 1)
+
+
+if __name__ == "__main__":
+    main()
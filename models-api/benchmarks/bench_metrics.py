@@ -0,0 +1,128 @@
+# models-api/benchmarks/bench_metrics.py
+"""
+Overhead of the /metrics instrumentation on scoring.
+
+Times score_patients_batch with the stage histograms and counters recording as in
+production, and with them patched to no-ops (observe_since still reads the clock, so
+only the recording cost is measured). Rounds alternate between the two and the best
+round of each is reported. On a noisy machine that difference can be swamped by jitter,
+so the script also counts the recordings one call makes and multiplies by the measured
+cost of one, which bounds the overhead independently of scoring noise. The prediction
+cache is off so every call reaches the models. Finally the same estimate is given
+relative to a whole single-patient request through the app (in-process test client).
+
+    python benchmarks/bench_metrics.py --batch-sizes 1 64 --rounds 15
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from unittest import mock
+
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import fastapi_app as api  # noqa: E402
+import scoring  # noqa: E402
+from metrics import CounterFamily, HistogramFamily  # noqa: E402
+
+
+def _patients(n: int):
+    rng = random.Random(0)
+    return [scoring.PatientIn.model_validate({
+        "age": rng.randint(20, 85), "sbp": rng.randint(100, 180), "ldl": round(rng.uniform(1.5, 5.5), 2),
+        "hba1c": round(rng.uniform(4.5, 9.5), 1), "bmi": round(rng.uniform(18, 40), 1),
+    }) for _ in range(n)]
+
+
+def _per_call(payloads, calls: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        scoring.score_patients_batch(payloads)
+    return (time.perf_counter() - t0) / calls
+
+
+def _disabled():
+    return mock.patch.multiple(
+        HistogramFamily,
+        observe=lambda self, value, *labels: None,
+        observe_since=lambda self, t0, *labels: time.perf_counter(),
+    ), mock.patch.object(CounterFamily, "inc", lambda self, *labels, amount=1.0: None)
+
+
+def _recordings_per_call(payloads) -> int:
+    """How many histogram/counter updates one scoring call makes."""
+    calls = [0]
+
+    def counting(fn):
+        def wrapper(*args, **kwargs):
+            calls[0] += 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    with mock.patch.multiple(HistogramFamily, observe=counting(HistogramFamily.observe),
+                             observe_since=counting(HistogramFamily.observe_since)), \
+            mock.patch.object(CounterFamily, "inc", counting(CounterFamily.inc)):
+        scoring.score_patients_batch(payloads)
+    return calls[0]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64])
+    ap.add_argument("--rounds", type=int, default=20)
+    ap.add_argument("--calls", type=int, default=50, help="scoring calls per round")
+    args = ap.parse_args()
+
+    scoring.load_models()
+
+    # cost of one recording, the dominant (and only per-call) instrumentation cost
+    n = 100_000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        scoring.MODEL_STAGE_SECONDS.observe_since(t0, "cardio", "predict")
+    per_op = (time.perf_counter() - t0) / n
+    print(f"one labelled observe_since: {per_op * 1e9:.0f} ns")
+
+    for size in args.batch_sizes:
+        payloads = _patients(size)
+        _per_call(payloads, 20)  # warm-up: compiles plans, faults in the forests
+        ops = _recordings_per_call(payloads)
+
+        on, off = [], []
+        for r in range(args.rounds):
+            hist_patch, counter_patch = _disabled()
+            # alternate which variant goes first so drift hits both equally
+            if r % 2:
+                with hist_patch, counter_patch:
+                    off.append(_per_call(payloads, args.calls))
+                on.append(_per_call(payloads, args.calls))
+            else:
+                on.append(_per_call(payloads, args.calls))
+                with hist_patch, counter_patch:
+                    off.append(_per_call(payloads, args.calls))
+        # best-of-rounds: the least-disturbed run of each variant
+        t_on, t_off = min(on), min(off)
+        print(f"batch {size:4d}  {ops} recordings/call = {ops * per_op * 1e6:5.1f} us   "
+              f"metrics on {t_on * 1e6:8.1f} us   off {t_off * 1e6:8.1f} us   "
+              f"measured {(t_on / t_off - 1) * 100:+.2f}%   estimated {ops * per_op / t_off * 100:.2f}%")
+
+    # relative to a whole single-patient request (+1 recording: the HTTP middleware's)
+    from fastapi.testclient import TestClient
+    body = _patients(1)[0].model_dump(exclude_none=True)
+    with TestClient(api.app) as client:
+        for _ in range(20):
+            client.post("/api/patient/add", json=body)
+        times = []
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            for _ in range(args.calls):
+                client.post("/api/patient/add", json=body)
+            times.append((time.perf_counter() - t0) / args.calls)
+    ops = _recordings_per_call(_patients(1)) + 1
+    print(f"POST /api/patient/add  {min(times) * 1e6:8.1f} us/request   "
+          f"{ops} recordings = {ops * per_op / min(times) * 100:.2f}% of request time")
+
+
+if __name__ == "__main__":
+    main()
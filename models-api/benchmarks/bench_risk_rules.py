@@ -0,0 +1,68 @@
+# models-api/benchmarks/bench_risk_rules.py
+"""
+Throughput of the vectorized clinical rules (risk_rules.py) against the scalar Python
+they replace: the four training label rules and the linear fallback heuristic of every
+DiseaseSpec that has one. The scalar reference and the threshold grid are those of
+tests/test_risk_rules.py, which holds the exact-parity tests; a mismatch seen here
+still fails the run.
+
+    python benchmarks/bench_risk_rules.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+API_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(API_ROOT, "src"))
+sys.path.insert(0, os.path.join(API_ROOT, "tests"))
+import risk_rules  # noqa: E402
+from disease_specs import DISEASES  # noqa: E402
+from test_risk_rules import sample_rows, scalar_labels  # noqa: E402
+
+
+def scalar_fallback(spec, row) -> float:
+    raw = 0
+    for f, (weight, center, default) in spec.fallback_terms.items():
+        raw = raw + weight * ((row[f] or default) - center)
+    return spec.fallback_base + raw
+
+
+def run(n_rows: int) -> bool:
+    rows, arrays = sample_rows(n_rows, random.Random(0))
+    ok = True
+
+    t0 = time.perf_counter()
+    expected = scalar_labels(rows)
+    t_scalar = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = risk_rules.label_columns(arrays.__getitem__)
+    t_vector = time.perf_counter() - t0
+    for label, values in expected.items():
+        ok &= bool(np.array_equal(np.asarray(values), got[label]))
+    print(f"labels            scalar {n_rows / t_scalar:12,.0f} rows/s   vectorized {n_rows / t_vector:14,.0f} rows/s   "
+          f"x{t_scalar / t_vector:.0f}")
+
+    for spec in (s for s in DISEASES.values() if s.fallback_terms):
+        t0 = time.perf_counter()
+        expected = np.array([scalar_fallback(spec, r) for r in rows])
+        t_scalar = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = risk_rules.linear_score(spec.fallback_base, spec.fallback_terms, arrays.__getitem__, n_rows)
+        t_vector = time.perf_counter() - t0
+        ok &= bool(np.array_equal(expected, got, equal_nan=True))
+        print(f"fallback {spec.name:8s} scalar {n_rows / t_scalar:12,.0f} rows/s   "
+              f"vectorized {n_rows / t_vector:14,.0f} rows/s   x{t_scalar / t_vector:.0f}")
+    if not ok:
+        print("MISMATCH against the scalar rules: run pytest tests/test_risk_rules.py")
+    return ok
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=200_000)
+    args = ap.parse_args()
+    sys.exit(0 if run(args.rows) else 1)
@@ -0,0 +1,86 @@
+# models-api/benchmarks/bench_training.py
+"""
+Wall time and peak memory of the training modes in data_preparation_model_training.py:
+the per-disease GridSearchCV ("grid") against warm-started forests on one shared pool
+("warm", same selected params) and its successive-halving variant ("halving"), the
+latter two on each of --pools (worker processes mapping the training matrices from
+shared memory, or threads).
+
+Each mode runs in a fresh subprocess on the processed CSV and writes its models to a
+temporary directory. Peak RSS is the training process itself plus the largest child
+(the joblib workers GridSearchCV starts, or one pool process).
+
+    python benchmarks/bench_training.py --modes grid warm halving --pools process thread --cpus 4
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def _child(mode: str, csv_path: str, diseases, cpus, pool) -> None:
+    sys.path.insert(0, SRC_DIR)
+    import pandas as pd
+    import data_preparation_model_training as prep
+
+    df = pd.read_csv(csv_path)
+    out_dir = tempfile.mkdtemp(prefix="bench_training_")
+    prep.MODEL_DIR = out_dir
+    configs = {
+        name: (spec.features, spec.label, os.path.join(out_dir, spec.model_file),
+               os.path.join(out_dir, spec.scaler_file), os.path.join(out_dir, spec.schema_file))
+        for name, spec in prep.DISEASES.items()
+        if name in diseases and df[spec.label].nunique() > 1
+    }
+    log = io.StringIO()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        if mode == "grid":
+            for feat_cols, label_col, model_path, scaler_path, schema_path in configs.values():
+                prep.train_model_for_label(df, feat_cols, label_col, model_path, scaler_path, schema_path)
+        else:
+            prep.train_models_concurrently(df, configs, halving=mode == "halving", cpus=cpus, pool=pool)
+    wall = time.perf_counter() - t0
+    best = [line for line in log.getvalue().splitlines() if "best params" in line]
+    print(json.dumps(dict(
+        mode=mode if mode == "grid" else f"{mode}/{pool}", wall_s=wall, diseases=list(configs), best=best,
+        self_maxrss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        child_maxrss_mb=resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    )))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modes", nargs="+", default=["grid", "warm", "halving"], choices=["grid", "warm", "halving"])
+    ap.add_argument("--diseases", nargs="+", default=["cardio", "diabetes", "ckd", "nafld"])
+    ap.add_argument("--pools", nargs="+", default=["process", "thread"], choices=["process", "thread"])
+    ap.add_argument("--cpus", type=int, default=None)
+    ap.add_argument("--csv", default=os.path.join(SRC_DIR, "processed_multidisease_data.csv"))
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        _child(args.child, args.csv, args.diseases, args.cpus, args.pools[0])
+        return
+
+    print(f"cpus={os.cpu_count()} csv={args.csv}")
+    runs = [(mode, pool) for mode in args.modes for pool in (args.pools[:1] if mode == "grid" else args.pools)]
+    for mode, pool in runs:
+        cmd = [sys.executable, "-W", "ignore", os.path.abspath(__file__), "--child", mode, "--csv", args.csv,
+               "--diseases", *args.diseases, "--pools", pool] + (["--cpus", str(args.cpus)] if args.cpus else [])
+        res = json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout.splitlines()[-1])
+        print(f"{res['mode']:15s} wall {res['wall_s']:7.1f} s   peak RSS {res['self_maxrss_mb']:6.0f} MB "
+              f"(+ worker {res['child_maxrss_mb']:.0f} MB)   {', '.join(res['diseases'])}")
+        for line in res["best"]:
+            print(f"                  {line}")
+
+
+if __name__ == "__main__":
+    main()
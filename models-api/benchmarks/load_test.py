@@ -0,0 +1,139 @@
+# models-api/benchmarks/load_test.py
+"""
+Closed-loop load test for POST /api/patient/add.
+
+Starts the API with uvicorn (or targets --url), then for each concurrency level runs that
+many clients, each sending its next request as soon as the previous one returns, and
+reports p50/p99 latency of successful requests, throughput and how many were shed (503).
+Payloads are randomized and the prediction cache is disabled unless --keep-cache, so
+every request reaches the models.
+
+    python benchmarks/load_test.py --executor thread --clients 1 8 64
+    python benchmarks/load_test.py --executor process --workers 4 --max-queue 16
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def _payload(rng: random.Random) -> dict:
+    return {
+        "name": "load test",
+        "age": rng.randint(20, 85),
+        "gender": rng.choice(["0", "1"]),
+        "sbp": rng.randint(100, 180),
+        "dbp": rng.randint(60, 110),
+        "bmi": round(rng.uniform(18, 40), 1),
+        "ldl": round(rng.uniform(1.5, 5.5), 2),
+        "hba1c": round(rng.uniform(4.5, 9.5), 1),
+        "glucose": round(rng.uniform(4.0, 11.0), 1),
+        "smoker": rng.choice(["0", "1"]),
+        "dm": rng.choice(["0", "1"]),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(args) -> tuple:
+    port = _free_port()
+    env = dict(os.environ, INFERENCE_EXECUTOR=args.executor, INFERENCE_MAX_QUEUE=str(args.max_queue))
+    if args.workers:
+        env["INFERENCE_WORKERS"] = str(args.workers)
+    if not args.keep_cache:
+        env["PREDICTION_CACHE_SIZE"] = "0"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "fastapi_app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SRC_DIR, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("API did not come up")
+
+
+async def _client(http: httpx.AsyncClient, url: str, n: int, rng: random.Random, out: dict) -> None:
+    for _ in range(n):
+        t0 = time.perf_counter()
+        try:
+            r = await http.post(f"{url}/api/patient/add", json=_payload(rng))
+        except httpx.HTTPError:
+            out["errors"] += 1
+            continue
+        elapsed = time.perf_counter() - t0
+        if r.status_code == 200:
+            out["latencies"].append(elapsed)
+        elif r.status_code == 503:
+            out["shed"] += 1
+        else:
+            out["errors"] += 1
+
+
+async def _level(url: str, clients: int, requests: int) -> dict:
+    out = {"latencies": [], "shed": 0, "errors": 0}
+    per_client = max(1, requests // clients)
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        # warm-up outside the measurement
+        await asyncio.gather(*[http.post(f"{url}/api/patient/add", json=_payload(random.Random(i)))
+                               for i in range(min(clients, 8))])
+        t0 = time.perf_counter()
+        await asyncio.gather(*[_client(http, url, per_client, random.Random(c), out) for c in range(clients)])
+        out["wall"] = time.perf_counter() - t0
+    out["sent"] = per_client * clients
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", help="target a running API instead of starting one")
+    ap.add_argument("--executor", choices=["thread", "process"], default="thread")
+    ap.add_argument("--workers", type=int, default=0)
+    ap.add_argument("--max-queue", type=int, default=64)
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    ap.add_argument("--requests", type=int, default=640, help="requests per concurrency level")
+    ap.add_argument("--keep-cache", action="store_true", help="leave the prediction cache enabled")
+    args = ap.parse_args()
+
+    proc = None
+    url = args.url
+    if url is None:
+        proc, url = _start_server(args)
+    try:
+        executor = httpx.get(f"{url}/health").json().get("executor", {})
+        print(f"{url}  executor={executor.get('kind')} workers={executor.get('workers')} "
+              f"max_queue={executor.get('max_queue')}")
+        for clients in args.clients:
+            res = asyncio.run(_level(url, clients, args.requests))
+            lat = np.asarray(res["latencies"]) * 1e3
+            p50, p99 = (np.percentile(lat, 50), np.percentile(lat, 99)) if len(lat) else (float("nan"),) * 2
+            print(f"  {clients:3d} clients  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  "
+                  f"{len(lat) / res['wall']:7.1f} req/s  ok {len(lat)}/{res['sent']}  "
+                  f"shed {res['shed']}  errors {res['errors']}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
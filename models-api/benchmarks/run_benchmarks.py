@@ -0,0 +1,297 @@
+# models-api/benchmarks/run_benchmarks.py
+"""
+Reproducible benchmark suite for the serving and training paths.
+
+Suites:
+  scoring     in-process scoring per disease model (single row and batches) and for the
+              whole score_patients_batch call; the prediction cache is off
+  http        end-to-end POST /api/patient/add against a local uvicorn (load_test.py)
+              at several closed-loop concurrency levels
+  coldstart   fresh-interpreter import of api/index.py, the first /health and then the
+              first scoring call (which loads numpy and the artifacts), in new processes;
+              also counts heavy modules (numpy, joblib, sklearn) loaded before that call
+  extraction  FHIR feature extraction throughput on generated synthetic bundles, with
+              json.load and (if ijson is installed) the streaming reader
+
+Every metric is the median over --repeats runs. Results are written as JSON together with
+machine, interpreter, library and git info, so two runs can be compared. With --baseline
+the new results are compared against an earlier file and the script exits 1 if any metric
+got worse by more than --threshold (a fraction, default 0.10), which makes it usable as a
+merge gate. Only compare runs from the same machine.
+
+    python benchmarks/run_benchmarks.py --out bench.json
+    python benchmarks/run_benchmarks.py --suites scoring coldstart --baseline main.json --threshold 0.15
+    python benchmarks/run_benchmarks.py --input bench.json --baseline main.json   # compare only
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_ROOT = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(API_ROOT, "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+SCHEMA_VERSION = 1
+
+Metrics = Dict[str, Dict[str, Any]]  # name -> {"value", "unit", "better": "lower" | "higher", ...}
+
+
+def _metric(value: float, unit: str, better: str = "lower", **extra: Any) -> Dict[str, Any]:
+    return {"value": round(value, 6), "unit": unit, "better": better, **extra}
+
+
+def _median_per_call(fn: Callable[[], Any], repeats: int, min_time: float = 0.05) -> float:
+    """Median over `repeats` rounds of the mean time per call; each round runs long enough to time reliably."""
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    fn()
+    once = max(time.perf_counter() - t0, 1e-7)
+    calls = max(1, int(min_time / once))
+    rounds = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        rounds.append((time.perf_counter() - t0) / calls)
+    return statistics.median(rounds)
+
+
+# ─── Suites ───
+
+def suite_scoring(args) -> Metrics:
+    os.environ["PREDICTION_CACHE_SIZE"] = "0"
+    import scoring
+    from load_test import _payload
+
+    scoring.load_models()
+    out: Metrics = {}
+    for rows in args.batch_sizes:
+        rng = random.Random(rows)
+        payloads = [scoring.PatientIn.model_validate(_payload(rng)) for _ in range(rows)]
+        raw = scoring._payload_matrix(payloads)
+        for spec in scoring.DISEASES.values():
+            try:
+                scoring.predict_disease_batch(spec, raw)
+                fn, source = (lambda s=spec: scoring.predict_disease_batch(s, raw)), "model"
+            except scoring.ModelUnavailable as e:
+                if not spec.fallback_terms:
+                    continue  # left out of the response: nothing to time
+                # no usable model here: time what the API would serve instead
+                fn, source = (lambda s=spec: scoring.fallback_batch(s, raw)), f"fallback:{e.reason}"
+            t = _median_per_call(fn, args.repeats)
+            out[f"scoring.{spec.name}.rows_{rows}"] = _metric(t * 1e3, "ms", source=source)
+        t = _median_per_call(lambda: scoring.score_patients_batch(payloads), args.repeats)
+        out[f"scoring.all.rows_{rows}"] = _metric(t * 1e3, "ms")
+        out[f"scoring.all.rows_{rows}.throughput"] = _metric(rows / t, "rows/s", "higher")
+    return out
+
+
+def suite_http(args) -> Metrics:
+    import numpy as np
+    from load_test import _level, _start_server
+
+    server_args = argparse.Namespace(executor="thread", workers=0, max_queue=max(64, max(args.clients)),
+                                     keep_cache=False)
+    proc, url = _start_server(server_args)
+    out: Metrics = {}
+    try:
+        for clients in args.clients:
+            runs = [asyncio.run(_level(url, clients, args.requests)) for _ in range(args.repeats)]
+            p50 = [float(np.percentile(r["latencies"], 50)) for r in runs if r["latencies"]]
+            p99 = [float(np.percentile(r["latencies"], 99)) for r in runs if r["latencies"]]
+            rps = [len(r["latencies"]) / r["wall"] for r in runs]
+            failed = sum(r["shed"] + r["errors"] for r in runs)
+            out[f"http.clients_{clients}.p50"] = _metric(statistics.median(p50) * 1e3, "ms")
+            out[f"http.clients_{clients}.p99"] = _metric(statistics.median(p99) * 1e3, "ms")
+            out[f"http.clients_{clients}.throughput"] = _metric(statistics.median(rps), "req/s", "higher",
+                                                                failed=failed)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return out
+
+
+_COLDSTART_CHILD = """
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {api_dir!r})
+import index
+t1 = time.perf_counter()
+import fastapi_app
+asyncio.run(fastapi_app.health())
+t2 = time.perf_counter()
+heavy = [m for m in ("numpy", "joblib", "sklearn") if m in sys.modules]
+fastapi_app.score_patients_batch([fastapi_app.PatientIn(age=55, sbp=140, ldl=3.5)])
+t3 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "health": t2 - t1, "first_score": t3 - t2, "heavy": heavy}}))
+"""
+
+
+def suite_coldstart(args) -> Metrics:
+    code = _COLDSTART_CHILD.format(api_dir=os.path.join(API_ROOT, "api"))
+    runs = []
+    for _ in range(args.repeats):
+        t0 = time.perf_counter()
+        res = subprocess.run([sys.executable, "-c", code], cwd=API_ROOT, capture_output=True, text=True)
+        wall = time.perf_counter() - t0
+        if res.returncode != 0:
+            raise RuntimeError(f"cold-start child failed:\n{res.stderr}")
+        runs.append(dict(json.loads(res.stdout.strip().splitlines()[-1]), process=wall))
+    return {
+        "coldstart.import_index": _metric(statistics.median(r["import"] for r in runs) * 1e3, "ms"),
+        "coldstart.first_health": _metric(statistics.median(r["health"] for r in runs) * 1e3, "ms"),
+        "coldstart.first_score": _metric(statistics.median(r["first_score"] for r in runs) * 1e3, "ms"),
+        "coldstart.process": _metric(statistics.median(r["process"] for r in runs) * 1e3, "ms"),
+        # heavy modules loaded before the first prediction: should stay 0 (see STARTUP_MODE)
+        "coldstart.heavy_modules_before_score": _metric(len(runs[0]["heavy"]), "modules",
+                                                        modules=runs[0]["heavy"]),
+    }
+
+
+def suite_extraction(args) -> Metrics:
+    import data_preparation_model_training as prep
+    from synthetic_fhir import write_bundles
+
+    out: Metrics = {}
+    with tempfile.TemporaryDirectory(prefix="bench_fhir_") as tmp:
+        write_bundles(tmp, args.bundles, seed=0)
+        paths = sorted(os.path.join(tmp, f) for f in os.listdir(tmp))
+        readers = {"json": 1 << 62}  # stream_min_bytes: never / always use the streaming reader
+        if prep.ijson is not None:
+            readers["stream"] = 0
+        for reader, min_bytes in readers.items():
+            prep.extract_bundle_files(paths[:8], min_bytes)  # warm the page cache and imports
+            rounds = []
+            for _ in range(args.repeats):
+                t0 = time.perf_counter()
+                prep.extract_bundle_files(paths, min_bytes)
+                rounds.append(time.perf_counter() - t0)
+            t = statistics.median(rounds)
+            out[f"extraction.{reader}.throughput"] = _metric(len(paths) / t, "bundles/s", "higher")
+    return out
+
+
+SUITES: Dict[str, Callable[[Any], Metrics]] = {
+    "scoring": suite_scoring,
+    "http": suite_http,
+    "coldstart": suite_coldstart,
+    "extraction": suite_extraction,
+}
+
+
+# ─── Environment + comparison ───
+
+def _git(*cmd: str) -> str:
+    try:
+        return subprocess.run(["git", *cmd], cwd=API_ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def machine_info() -> Dict[str, Any]:
+    libs = {}
+    for name in ("numpy", "pandas", "sklearn", "fastapi", "pydantic", "uvicorn", "ijson"):
+        try:
+            libs[name] = __import__(name).__version__
+        except (ImportError, AttributeError):
+            libs[name] = None
+    return {
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "libraries": libs,
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_dirty": bool(_git("status", "--porcelain", "--", ".")),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a metric-by-metric comparison; returns the names of metrics that regressed past `threshold`."""
+    regressions = []
+    if current["machine"].get("hostname") != baseline["machine"].get("hostname"):
+        print("warning: baseline was recorded on a different machine; timings may not be comparable")
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if base["value"]:
+            change = cur["value"] / base["value"] - 1
+        else:  # e.g. a count that should stay 0: any increase is a regression
+            change = float("inf") if cur["value"] > 0 else 0.0
+        worse = change > threshold if cur["better"] == "lower" else change < -threshold
+        if worse:
+            regressions.append(name)
+        print(f"  {name:40s} {base['value']:12.3f} -> {cur['value']:12.3f} {cur['unit']:9s} "
+              f"{change * 100:+7.1f}%{'  REGRESSION' if worse else ''}")
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--suites", nargs="+", choices=list(SUITES), default=list(SUITES))
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--input", help="skip running; load results from this JSON (for --baseline comparisons)")
+    ap.add_argument("--baseline", help="compare against this earlier results JSON")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="allowed fractional slowdown per metric before --baseline fails (default 0.10)")
+    ap.add_argument("--repeats", type=int, default=7)
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024])
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    ap.add_argument("--requests", type=int, default=320, help="HTTP requests per concurrency level and repeat")
+    ap.add_argument("--bundles", type=int, default=300, help="synthetic FHIR bundles for the extraction suite")
+    args = ap.parse_args()
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            report = json.load(f)
+    else:
+        report = {
+            "schema": SCHEMA_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "machine": machine_info(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "input", "baseline")},
+            "results": {},
+        }
+        for name in args.suites:
+            t0 = time.perf_counter()
+            results = SUITES[name](args)
+            report["results"].update(results)
+            print(f"{name} ({time.perf_counter() - t0:.1f} s)")
+            for metric, res in results.items():
+                extra = "".join(f"  {k}={v}" for k, v in res.items() if k not in ("value", "unit", "better"))
+                print(f"  {metric:40s} {res['value']:12.3f} {res['unit']}{extra}")
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"compared with {args.baseline} ({baseline['machine'].get('git_commit', '')[:10]}), "
+              f"threshold {args.threshold:.0%}")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
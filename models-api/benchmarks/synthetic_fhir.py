@@ -0,0 +1,70 @@
+# models-api/benchmarks/synthetic_fhir.py
+"""
+Deterministic synthetic FHIR bundles shaped like the Synthea exports in data/fhir:
+one Patient, a mix of lab/vital Observations (including a BP panel and smoking status),
+a couple of Conditions, a FamilyMemberHistory and an unrelated Encounter.
+
+    python benchmarks/synthetic_fhir.py /tmp/fhir 1000
+"""
+import json
+import os
+import random
+import sys
+from typing import Any, Dict
+
+# (LOINC code, low, high, unit)
+LAB_CODES = [
+    ("8480-6", 90, 180, "mm[Hg]"), ("8462-4", 50, 110, "mm[Hg]"), ("2339-0", 60, 200, "mg/dL"),
+    ("39156-5", 18, 40, "kg/m2"), ("2093-3", 120, 300, "mg/dL"), ("2085-9", 30, 90, "mg/dL"),
+    ("18262-6", 60, 200, "mg/dL"), ("4548-4", 4, 10, "%"), ("1743-4", 10, 120, "U/L"),
+    ("1920-8", 10, 120, "U/L"), ("2160-0", 40, 200, "umol/L"), ("48642-3", 20, 120, "mL/min"),
+    ("14959-1", 1, 300, "mg/g"), ("1975-2", 0.2, 3, "mg/dL"), ("9999-9", 1, 2, "x"),
+]
+CONDITIONS = [("I10", "Hypertension"), ("E11.9", "Diabetes mellitus type 2"), ("N18.3", "Chronic kidney disease"),
+              ("K76.0", "Fatty liver"), ("J45", "Asthma")]
+
+
+def make_bundle(rng: random.Random, n_obs: int = 40) -> Dict[str, Any]:
+    entries = [{"resource": {"resourceType": "Patient", "birthDate": f"{rng.randint(1930, 2010)}-01-01",
+                             "gender": rng.choice(["male", "female", "other"])}}]
+    for _ in range(n_obs):
+        code, lo, hi, unit = rng.choice(LAB_CODES)
+        entries.append({"resource": {
+            "resourceType": "Observation",
+            "code": {"coding": [{"system": "http://loinc.org", "code": code, "display": "x"}]},
+            "valueQuantity": {"value": round(rng.uniform(lo, hi), 2), "unit": unit},
+        }})
+    entries.append({"resource": {
+        "resourceType": "Observation",
+        "code": {"coding": [{"code": "85354-9"}]},
+        "component": [
+            {"code": {"coding": [{"code": "8480-6"}]}, "valueQuantity": {"value": rng.randint(100, 170)}},
+            {"code": {"coding": [{"code": "8462-4"}]}, "valueQuantity": {"value": rng.randint(60, 100)}},
+        ],
+    }})
+    entries.append({"resource": {
+        "resourceType": "Observation",
+        "code": {"coding": [{"code": "72166-2"}]},
+        "valueCodeableConcept": {"coding": [{"code": rng.choice(["77176002", "8517006", "428041000124106"])}]},
+    }})
+    for code, display in rng.sample(CONDITIONS, 2):
+        entries.append({"resource": {"resourceType": "Condition", "code": {"coding": [{"code": code, "display": display}]}}})
+    entries.append({"resource": {
+        "resourceType": "FamilyMemberHistory",
+        "age": {"value": rng.randint(30, 80)},
+        "condition": [{"code": {"coding": [{"code": rng.choice(["I21", "I25.1", "E11"])}]}}],
+    }})
+    entries.append({"resource": {"resourceType": "Encounter", "id": "x" * 200}})
+    return {"resourceType": "Bundle", "entry": entries}
+
+
+def write_bundles(out_dir: str, n: int, seed: int = 0) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    for i in range(n):
+        with open(os.path.join(out_dir, f"patient_{i:05d}.json"), "w", encoding="utf-8") as f:
+            json.dump(make_bundle(rng), f)
+
+
+if __name__ == "__main__":
+    write_bundles(sys.argv[1], int(sys.argv[2]))
@@ -1,34 +1,58 @@
-import os, json, joblib
+import os, sys, json, hashlib, warnings, joblib
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from functools import partial
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
 
 import numpy as np
 import pandas as pd
+try:
+    import ijson  # optional: incremental parsing for oversized bundles
+except ImportError:
+    ijson = None
 from imblearn.over_sampling import SMOTE
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report
-from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.model_selection import GridSearchCV, ParameterGrid, StratifiedKFold, train_test_split
 from sklearn.preprocessing import StandardScaler
 
+from disease_specs import DISEASES, select_diseases
+from feature_store import ColumnBuffer, FeatureStore, RecordBatch, file_stamp, pack_rows
+from forest_engine import CompiledForest
+from lookup_table import LookupTable, file_sha1
+from processed_dataset import load_processed, write_processed
+from risk_rules import label_columns
+import shared_arrays
+
 # ───────────────────────────────────────── CONFIG ──────────────────────────────
 BASE_DIR       = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR       = os.path.join(BASE_DIR, "..", "data")
-OUT_CSV        = os.path.join(BASE_DIR, "processed_multidisease_data.csv")
-MODEL_DIR      = os.path.join(BASE_DIR, "..", "models")
-
-# Model paths per disease
-MODEL_PATHS = {
-    "cardio": os.path.join(MODEL_DIR, "cardio_risk_rf.joblib"),
-    "diabetes": os.path.join(MODEL_DIR, "diabetes_rf.joblib"),
-    "ckd": os.path.join(MODEL_DIR, "ckd_rf.joblib"),
-    "nafld": os.path.join(MODEL_DIR, "nafld_rf.joblib"),
-}
-SCALER_PATHS = {
-    "cardio": os.path.join(MODEL_DIR, "cardio_scaler.joblib"),
-    "diabetes": os.path.join(MODEL_DIR, "diabetes_scaler.joblib"),
-    "ckd": os.path.join(MODEL_DIR, "ckd_scaler.joblib"),
-    "nafld": os.path.join(MODEL_DIR, "nafld_scaler.joblib"),
-}
+OUT_DATA       = os.path.join(BASE_DIR, "processed_multidisease_data")   # columnar: one .npy per column
+OUT_CSV        = os.path.join(BASE_DIR, "processed_multidisease_data.csv")  # optional export (--csv)
+# per-bundle extracted features, reused across runs for bundles that did not change
+FEATURE_CACHE  = os.getenv("FEATURE_CACHE", os.path.join(BASE_DIR, "processed_multidisease_data.features.npz"))
+# a subdirectory (e.g. models/2026-10-17) makes a versioned set the API can swap in (MODEL_SET / reload)
+MODEL_DIR      = os.getenv("MODEL_DIR", os.path.join(BASE_DIR, "..", "models"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or (os.cpu_count() or 1)
+INGEST_CHUNK   = int(os.getenv("INGEST_CHUNK", "64"))   # bundles per worker task
+# bundles at least this large are parsed incrementally (needs ijson); 0 streams everything
+STREAM_MIN_BYTES = int(os.getenv("STREAM_MIN_BYTES", str(16 * 1024 * 1024)))
+# pool the warm/halving searches run their forest fits on: "thread" (keeps halving forests
+# between stages) or, opt-in, "process" (training matrices in shared memory; only pays off
+# with several cores, and halving then refits every surviving forest from scratch)
+TRAIN_POOL = os.getenv("TRAIN_POOL", "thread").lower()
+# diseases whose precomputed probability table (<model>.lookup.npz) is built next to the model, for
+# the API's RISK_LOOKUP: comma-separated names or "all"; none by default
+LOOKUP_TABLES = select_diseases(os.getenv("LOOKUP_TABLES", ""))
+
+# Model paths per disease (names, features and labels live in disease_specs.py, shared with the API)
+MODEL_PATHS  = {name: os.path.join(MODEL_DIR, spec.model_file) for name, spec in DISEASES.items()}
+SCALER_PATHS = {name: os.path.join(MODEL_DIR, spec.scaler_file) for name, spec in DISEASES.items()}
+SCHEMA_PATHS = {name: os.path.join(MODEL_DIR, spec.schema_file) for name, spec in DISEASES.items()}
+FOREST_PATHS = {name: os.path.join(MODEL_DIR, spec.forest_file) for name, spec in DISEASES.items()}
+LOOKUP_PATHS = {name: os.path.join(MODEL_DIR, spec.lookup_file) for name, spec in DISEASES.items()}
 
 # LOINC sets
 LOINC_CODES = {
@@ -57,11 +81,62 @@ LOINC_CODES = {
     "UACR": {"14959-1"},
 }
 
+_RESOURCE_PREFIX      = "entry.item.resource"
+_RESOURCE_TYPE_PREFIX = "entry.item.resource.resourceType"
+
+# bump when extraction or labelling changes so cached features are re-extracted
+EXTRACTION_VERSION = 2
+
 # ICD-10 codes
 ASCVD_CODES   = {"I20", "I21", "I22", "I23", "I24", "I25", "I63", "I64"}
 ICD10_DIABETES = {"E11"}
 ICD10_CKD     = {"N18"}
 ICD10_NAFLD   = {"K76"}
+ICD10_HTN     = {"I10"}
+# every code family above is a 3-character category, so "startswith" is a lookup on code[:3]
+ICD10_PREFIX_LEN = 3
+# category -> accumulator flags it sets
+ICD10_FLAGS = {}
+for _codes, _flags in ((ICD10_HTN, ("has_htn",)), (ICD10_DIABETES, ("has_dm", "has_diabetes_icd")),
+                       (ICD10_CKD, ("has_ckd_icd",)), (ICD10_NAFLD, ("has_nafld_icd",))):
+    for _code in _codes:
+        ICD10_FLAGS[_code] = ICD10_FLAGS.get(_code, ()) + _flags
+
+def _as_mmol(value, unit, obs):
+    return value if unit and "mmol" in unit else round(value / 38.67, 2)
+
+def _glucose_mmol(value, unit, obs):
+    return round(value / 18.0, 2) if value > 50 else value
+
+def _smoking_code(value, unit, obs):
+    return obs.get("valueCodeableConcept", {}).get("coding", [{}])[0].get("code")
+
+def _as_is(value, unit, obs):
+    return value
+
+# Observation slots in match priority order: (LOINC_CODES key, accumulator attribute, converter)
+LOINC_SLOTS = [
+    ("SBP", "sbp", _as_is),
+    ("DBP", "dbp", _as_is),
+    ("GLU", "glucose", _glucose_mmol),
+    ("BMI", "bmi", _as_is),
+    ("TC", "tc", _as_mmol),
+    ("HDL", "hdl", _as_mmol),
+    ("LDL", "ldl", _as_mmol),
+    ("SMOKE", "smoking_code", _smoking_code),
+    ("HBA1C", "hba1c", _as_is),
+    ("ALT", "alt", _as_is),
+    ("AST", "ast", _as_is),
+    ("CREAT", "creat", _as_is),
+    ("EGFR", "egfr", _as_is),
+    ("UACR", "uacr", _as_is),
+    ("BILIRUBIN", "bilirubin", _as_is),
+]
+# LOINC code -> (priority, attribute, converter); a code listed under two keys keeps the earlier one
+LOINC_INDEX = {}
+for _priority, (_key, _slot, _convert) in enumerate(LOINC_SLOTS):
+    for _code in LOINC_CODES[_key]:
+        LOINC_INDEX.setdefault(_code, (_priority, _slot, _convert))
 
 # ─────────────────────────── F E A T U R E   E X T R A C T I O N ───────────────
 
@@ -82,237 +157,635 @@ def display_contains(obs: Dict[str, Any], keywords: List[str]) -> bool:
 def loinc_in(obs: Dict[str, Any]) -> set:
     return {c.get("code") for c in obs.get("code", {}).get("coding", []) if c.get("code")}
 
-def extract_patient_features(bundle: Dict[str, Any]) -> Dict[str, Any]:
-    patient, observations, conditions, fam_histories = {}, [], [], []
-
-    for entry in bundle.get("entry", []):
-        res = entry.get("resource", {})
+class PatientFeatureAccumulator:
+    """
+    Running feature state for one patient. Resources are fed one at a time (in bundle
+    order) and folded in immediately, so neither the bundle nor per-type resource lists
+    have to be kept around. Family history needs the patient's gender, which may come
+    later in the bundle, so only (relative age, has ASCVD code) pairs are deferred.
+    """
+    RESOURCE_TYPES = {"Patient", "Observation", "Condition", "FamilyMemberHistory"}
+    # the only resource fields extraction reads; everything else can be skipped unparsed
+    READ_KEYS = {"resourceType", "birthDate", "gender", "code", "valueQuantity", "component",
+                 "valueCodeableConcept", "age", "condition"}
+
+    def __init__(self):
+        self.patient: Dict[str, Any] = {}
+        self.fam_ascvd_ages: List[Any] = []
+        # Cardio & general labs
+        self.sbp = self.dbp = self.glucose = self.bmi = self.tc = self.hdl = self.ldl = None
+        # New fields:
+        self.hba1c = self.alt = self.ast = self.creat = self.egfr = self.uacr = self.bilirubin = None
+        self.smoking_code = None
+        # Hypertension / DM flags
+        self.has_htn = self.has_dm = False
+        self.has_diabetes_icd = self.has_ckd_icd = self.has_nafld_icd = False
+
+    def add(self, res: Dict[str, Any]) -> None:
         rtype = res.get("resourceType")
         if rtype == "Patient":
-            patient = res
+            self.patient = res
         elif rtype == "Observation":
-            observations.append(res)
+            self._add_observation(res)
         elif rtype == "Condition":
-            conditions.append(res)
+            self._add_condition(res)
         elif rtype == "FamilyMemberHistory":
-            fam_histories.append(res)
-
-    # Demographics
-    age    = years_between(patient.get("birthDate"))
-    gender = patient.get("gender", "").lower()
-    gender = 1 if gender == "male" else 0 if gender == "female" else None
-
-    # Cardio & general labs
-    sbp = dbp = glucose = bmi = tc = hdl = ldl = None
-    # New fields:
-    hba1c = alt = ast = creat = egfr = uacr = bilirubin = None
-    smoking_code = None
-    family_cad   = 0
-
-    # Family history of premature CAD
-    for fh in fam_histories:
+            self._add_family_history(res)
+
+    def _add_family_history(self, fh: Dict[str, Any]) -> None:
         rel_age = None
         if "age" in fh and isinstance(fh["age"], dict):
             rel_age = fh["age"].get("value")
         for cond in fh.get("condition", []):
             for coding in cond.get("code", {}).get("coding", []):
-                icd = coding.get("code", "")
-                if any(icd.startswith(c) for c in ASCVD_CODES):
-                    if rel_age is None or rel_age < (55 if gender == 1 else 65):
-                        family_cad = 1
-
-    # Observations
-    for obs in observations:
-        codes = loinc_in(obs)
+                if coding.get("code", "")[:ICD10_PREFIX_LEN] in ASCVD_CODES:
+                    self.fam_ascvd_ages.append(rel_age)
+
+    def _add_observation(self, obs: Dict[str, Any]) -> None:
+        codings = obs.get("code", {}).get("coding", [])
         valq  = obs.get("valueQuantity")
         value = valq.get("value") if valq else None
         unit  = valq.get("unit") if valq else None
 
         if not value:
             # Check BP components
-            if LOINC_CODES["BP_PANEL"] & codes:
+            if any(c.get("code") in LOINC_CODES["BP_PANEL"] for c in codings):
                 for comp in obs.get("component", []):
                     c_codes = loinc_in(comp)
                     c_val   = comp.get("valueQuantity", {}).get("value")
-                    if LOINC_CODES["SBP"] & c_codes and sbp is None:
-                        sbp = c_val
-                    if LOINC_CODES["DBP"] & c_codes and dbp is None:
-                        dbp = c_val
-            continue
-
-        if codes & LOINC_CODES["SBP"]:
-            sbp = value
-        elif codes & LOINC_CODES["DBP"]:
-            dbp = value
-        elif codes & LOINC_CODES["GLU"]:
-            glucose = round(value / 18.0, 2) if value > 50 else value
-        elif codes & LOINC_CODES["BMI"]:
-            bmi = value
-        elif codes & LOINC_CODES["TC"]:
-            tc = value if unit and "mmol" in unit else round(value / 38.67, 2)
-        elif codes & LOINC_CODES["HDL"]:
-            hdl = value if unit and "mmol" in unit else round(value / 38.67, 2)
-        elif codes & LOINC_CODES["LDL"]:
-            ldl = value if unit and "mmol" in unit else round(value / 38.67, 2)
-        elif codes & LOINC_CODES["SMOKE"]:
-            smoking_code = obs.get("valueCodeableConcept", {}).get("coding", [{}])[0].get("code")
-        elif codes & LOINC_CODES["HBA1C"]:
-            hba1c = value
-        elif codes & LOINC_CODES["ALT"]:
-            alt = value
-        elif codes & LOINC_CODES["AST"]:
-            ast = value
-        elif codes & LOINC_CODES["CREAT"]:
-            creat = value
-        elif codes & LOINC_CODES["EGFR"]:
-            egfr = value
-        elif codes & LOINC_CODES["UACR"]:
-            uacr = value
-        elif codes & LOINC_CODES["BILIRUBIN"]:
-            bilirubin = value
+                    if LOINC_CODES["SBP"] & c_codes and self.sbp is None:
+                        self.sbp = c_val
+                    if LOINC_CODES["DBP"] & c_codes and self.dbp is None:
+                        self.dbp = c_val
+            return
+
+        # several codings may name different slots: the earliest slot in LOINC_SLOTS wins
+        best = None
+        for coding in codings:
+            hit = LOINC_INDEX.get(coding.get("code"))
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = hit
+        if best is not None:
+            _, slot, convert = best
+            setattr(self, slot, convert(value, unit, obs))
+
+    def _add_condition(self, cond: Dict[str, Any]) -> None:
+        for coding in cond.get("code", {}).get("coding", []):
+            for flag in ICD10_FLAGS.get(coding.get("code", "")[:ICD10_PREFIX_LEN].upper(), ()):
+                setattr(self, flag, True)
+            disp = coding.get("display", "").lower()
+            if "hypertension" in disp:
+                self.has_htn = True
+            if "diabetes" in disp:
+                self.has_dm = True
+                self.has_diabetes_icd = True
 
     # Smoking numeric encoding
-    smoke_map = {
+    SMOKE_MAP = {
         "77176002": 2,  # current every day smoker
         "449868002": 2,  # current some day smoker
         "428041000124106": 1,  # former smoker
         "8517006": 0,  # never smoker
     }
-    smoking_status = smoke_map.get(smoking_code, 0)
 
-    # Hypertension / DM flags
-    has_htn = has_dm = False
-    has_diabetes_icd = has_ckd_icd = has_nafld_icd = False
-    for cond in conditions:
-        for coding in cond.get("code", {}).get("coding", []):
-            cc = coding.get("code", "").upper()
-            disp = coding.get("display", "").lower()
-            if cc.startswith("I10") or "hypertension" in disp:
-                has_htn = True
-            if cc.startswith("E11") or "diabetes" in disp:
-                has_dm = True
-                has_diabetes_icd = True
-            if cc.startswith("N18"):
-                has_ckd_icd = True
-            if cc.startswith("K76"):
-                has_nafld_icd = True
-
-    risk_label     = compute_cvd_risk(age, gender, sbp, dbp, tc, hdl, ldl, smoking_status, has_dm, family_cad)
-    diabetes_label = compute_diabetes_label(hba1c, has_diabetes_icd)
-    ckd_label      = compute_ckd_label(egfr, creat, uacr, has_ckd_icd)
-    nafld_label    = compute_nafld_label(alt, ast, has_nafld_icd)
+    def write(self, buf: ColumnBuffer) -> int:
+        """Append this patient's features to `buf` (EXTRACT_NULLABLE / EXTRACT_FLAGS layout); labels come later."""
+        # Demographics
+        age    = years_between(self.patient.get("birthDate"))
+        gender = self.patient.get("gender", "").lower()
+        gender = 1 if gender == "male" else 0 if gender == "female" else None
+
+        # Family history of premature CAD
+        family_cad = 0
+        for rel_age in self.fam_ascvd_ages:
+            if rel_age is None or rel_age < (55 if gender == 1 else 65):
+                family_cad = 1
+
+        smoking_status = self.SMOKE_MAP.get(self.smoking_code, 0)
+        # measurements are always floats: json.load keeps an integer FHIR value (120) an int while
+        # the streaming reader (use_float=True) gives 120.0, and the kind codes/dtypes must not
+        # depend on which reader parsed the bundle
+        labs = (self.sbp, self.dbp, self.glucose, self.bmi, self.tc, self.hdl, self.ldl,
+                self.hba1c, self.alt, self.ast, self.creat, self.egfr, self.uacr, self.bilirubin)
+        return buf.append(
+            (age, gender) + tuple(None if v is None else float(v) for v in labs),
+            (smoking_status, int(self.has_dm), int(self.has_htn), family_cad,
+             int(self.has_diabetes_icd), int(self.has_ckd_icd), int(self.has_nafld_icd), 0, 0, 0, 0),
+        )
+
+    def finish(self) -> Dict[str, Any]:
+        """This patient's FEATURE_COLUMNS as a dict (single-bundle path; batches use write())."""
+        buf = new_feature_buffer(1)
+        self.write(buf)
+        add_labels(buf)
+        return buf.row_dict(0, FEATURE_COLUMNS)
+
+def accumulate_bundle(bundle: Dict[str, Any]) -> PatientFeatureAccumulator:
+    acc = PatientFeatureAccumulator()
+    for entry in bundle.get("entry", []):
+        acc.add(entry.get("resource", {}))
+    return acc
 
-    return dict(
-        # Cardio & general fields
-        age=age, gender=gender, sbp=sbp, dbp=dbp, glucose=glucose, bmi=bmi,
-        tc=tc, hdl=hdl, ldl=ldl, smoker=smoking_status, dm=int(has_dm), htn=int(has_htn), fam_cad=family_cad, risk_label=risk_label,
-        # Extended labs
-        hba1c=hba1c, alt=alt, ast=ast, creat=creat, egfr=egfr, uacr=uacr, bilirubin=bilirubin,
-        # Labels
-        diabetes_label=diabetes_label, ckd_label=ckd_label, nafld_label=nafld_label,
-    )
+def extract_patient_features(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    return accumulate_bundle(bundle).finish()
+
+def extract_patient_features_streaming(fp) -> Dict[str, Any]:
+    """Same features as extract_patient_features(json.load(fp)), parsed incrementally (see accumulate_streaming)."""
+    return accumulate_streaming(fp).finish()
+
+def accumulate_streaming(fp) -> PatientFeatureAccumulator:
+    """
+    Same accumulator as accumulate_bundle(json.load(fp)), but parsed incrementally with
+    ijson: each entry[*].resource is built only if it is a type the extractor reads, only
+    with the fields it reads, and handed to the accumulator as soon as it closes. Peak
+    memory is one resource, not several copies of the bundle.
+    """
+    acc = PatientFeatureAccumulator()
+    builder = None      # ijson.ObjectBuilder for the resource being read, None while skipping
+    keep_key = False    # whether the current top-level resource field is one we read
+    for prefix, event, value in ijson.parse(fp, use_float=True):
+        if prefix == _RESOURCE_PREFIX:
+            if event == "start_map":
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif builder is None:
+                continue
+            elif event == "map_key":
+                keep_key = value in PatientFeatureAccumulator.READ_KEYS
+                if keep_key:
+                    builder.event(event, value)
+            elif event == "end_map":
+                builder.event(event, value)
+                if builder.value.get("resourceType") in PatientFeatureAccumulator.RESOURCE_TYPES:
+                    acc.add(builder.value)
+                builder = None
+            continue
+        if builder is None or not keep_key or not prefix.startswith(_RESOURCE_PREFIX):
+            continue
+        if prefix == _RESOURCE_TYPE_PREFIX and value not in PatientFeatureAccumulator.RESOURCE_TYPES:
+            builder = None  # a resource type we never read: drop what was built, skip the rest
+            continue
+        builder.event(event, value)
+    return acc
 
 # ────────────────────────────── RISK SCORING LOGIC ────────────────────────────
-def compute_cvd_risk(age, gender, sbp, dbp, tc, hdl, ldl, smoking_status, has_dm, family_cad) -> int:
-    score = 0
-    # Demographics
-    if age and age >= 50: score += 2 if age >= 65 else 1
-    if gender == 1 and age and age >= 45: score += 1
-    # Lipids
-    if tc and tc >= 6.2: score += 2
-    elif tc and tc >= 5.2: score += 1
-    if hdl and ((gender == 1 and hdl < 1.0) or (gender == 0 and hdl < 1.3)): score += 1
-    if ldl and ldl >= 4.1: score += 2
-    elif ldl and ldl >= 2.6: score += 1
-    # BP
-    if sbp and sbp >= 160 or dbp and dbp >= 100: score += 2
-    elif sbp and sbp >= 140 or dbp and dbp >= 90: score += 1
-    # Others
-    if smoking_status == 2: score += 2
-    elif smoking_status == 1: score += 1
-    if has_dm: score += 2
-    if family_cad: score += 1
-    return 2 if score >= 8 else 1 if score >= 4 else 0
-
-def compute_diabetes_label(hba1c, has_diabetes_icd) -> int:
-    if has_diabetes_icd: return 1
-    if hba1c is not None and hba1c >= 6.5: return 1
-    return 0
-
-def compute_ckd_label(egfr, creat, uacr, has_ckd_icd) -> int:
-    if has_ckd_icd: return 1
-    if egfr is not None and egfr < 60: return 1
-    if creat is not None and creat > 120: return 1 # umol/L threshold
-    return 0
-
-def compute_nafld_label(alt, ast, has_nafld_icd) -> int:
-    # Very basic NAFLD: ALT/AST > 2x ULN (assuming 35 for ALT)
-    if has_nafld_icd: return 1
-    if alt is not None and alt > 70: return 1
-    if ast is not None and ast > 70: return 1
-    return 0
+def add_labels(buf: ColumnBuffer) -> None:
+    """Fill the label columns of every row in `buf` with one vectorized pass per rule (risk_rules.py)."""
+    for label, values in label_columns(buf.column).items():
+        buf.column(label)[:] = values
 
 # ───────────────────────────────── DATA PIPELINE ──────────────────────────────
-def prepare_dataframe() -> pd.DataFrame:
-    rows: List[Dict[str, Any]] = []
-    for fname in os.listdir(DATA_DIR):
-        if not fname.endswith(".json"):
-            continue
-        with open(os.path.join(DATA_DIR, fname), "r", encoding="utf-8") as f:
-            bundle = json.load(f)
-        feats = extract_patient_features(bundle)
-        print(f"→ {fname}  {feats}")
-        rows.append(feats)
-
-    df = pd.DataFrame(rows)
-    # Impute numerics
-    num_cols = ["sbp", "dbp", "glucose", "bmi", "tc", "hdl", "ldl", "hba1c", "alt", "ast", "creat", "egfr", "uacr", "bilirubin"]
-    for col in num_cols:
+# Column order of extract_patient_features() output == processed CSV column order
+FEATURE_COLUMNS = [
+    "age", "gender", "sbp", "dbp", "glucose", "bmi", "tc", "hdl", "ldl", "smoker", "dm", "htn", "fam_cad", "risk_label",
+    "hba1c", "alt", "ast", "creat", "egfr", "uacr", "bilirubin",
+    "diabetes_label", "ckd_label", "nafld_label",
+]
+NUM_COLS = ["sbp", "dbp", "glucose", "bmi", "tc", "hdl", "ldl", "hba1c", "alt", "ast", "creat", "egfr", "uacr", "bilirubin"]
+# Fixed slot layout of the extraction buffer: nullable values (float64 + kind code), then
+# int8 flags and labels; the ICD flags only feed the labels and are not output columns
+EXTRACT_NULLABLE = ["age", "gender"] + NUM_COLS
+EXTRACT_FLAGS = ["smoker", "dm", "htn", "fam_cad", "has_diabetes_icd", "has_ckd_icd", "has_nafld_icd",
+                 "risk_label", "diabetes_label", "ckd_label", "nafld_label"]
+
+def new_feature_buffer(capacity: int = 64) -> ColumnBuffer:
+    return ColumnBuffer(EXTRACT_NULLABLE, EXTRACT_FLAGS, capacity)
+
+def extract_bundle_files(paths: List[str], stream_min_bytes: int = STREAM_MIN_BYTES) -> RecordBatch:
+    """Worker task: extract a chunk of bundle files straight into column buffers, then label them column-wise."""
+    buf = new_feature_buffer(len(paths))
+    for path in paths:
+        if ijson is not None and os.path.getsize(path) >= stream_min_bytes:
+            with open(path, "rb") as f:
+                accumulate_streaming(f).write(buf)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                accumulate_bundle(json.load(f)).write(buf)
+    add_labels(buf)
+    return buf.record_batch(FEATURE_COLUMNS)
+
+def extraction_fingerprint() -> str:
+    """
+    Identifies everything cached features depend on besides the bundle itself. Bump
+    EXTRACTION_VERSION whenever extraction or labelling logic changes; the year is in
+    here because age is computed against the current year.
+    """
+    key = repr((EXTRACTION_VERSION, datetime.now().year, FEATURE_COLUMNS,
+                sorted((k, sorted(v)) for k, v in LOINC_CODES.items()),
+                sorted(ASCVD_CODES), sorted(ICD10_FLAGS.items())))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def _iter_batches(chunks: List[List[str]], workers: int, stream_min_bytes: int) -> Iterator[RecordBatch]:
+    """Yield extracted batches in input order; at most workers * 2 chunks are in flight."""
+    if workers <= 1:
+        for chunk in chunks:
+            yield extract_bundle_files(chunk, stream_min_bytes)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(extract_bundle_files, chunk, stream_min_bytes))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def prepare_dataframe(workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                      stream_min_bytes: Optional[int] = None, use_cache: bool = True,
+                      csv_path: Optional[str] = None) -> pd.DataFrame:
+    workers = INGEST_WORKERS if workers is None else workers
+    chunk_size = chunk_size or INGEST_CHUNK
+    stream_min_bytes = STREAM_MIN_BYTES if stream_min_bytes is None else stream_min_bytes
+    if ijson is None:
+        print("ijson not installed: every bundle is parsed with json.load", file=sys.stderr)
+    paths = [os.path.join(DATA_DIR, f) for f in os.listdir(DATA_DIR) if f.endswith(".json")]
+    stamps = np.array([file_stamp(p) for p in paths], dtype=np.int64).reshape(-1, 2)
+
+    # Only new or changed bundles are extracted; the rest come from the feature cache
+    cache = FeatureStore(FEATURE_COLUMNS, extraction_fingerprint())
+    if use_cache:
+        cache = FeatureStore.load(FEATURE_CACHE, FEATURE_COLUMNS, cache.fingerprint)
+    cached_rows = cache.lookup(paths, stamps)
+    todo = [p for p, row in zip(paths, cached_rows) if row < 0]
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+
+    parts, done = [pack_rows([], FEATURE_COLUMNS)], 0
+    for values, kinds in _iter_batches(chunks, workers, stream_min_bytes):
+        parts.append((values, kinds))
+        done += values.shape[1]
+        print(f"\r→ {done}/{len(todo)} bundles extracted", end="", file=sys.stderr, flush=True)
+    print(f"\r→ {len(todo)} bundles extracted, {len(paths) - len(todo)} from cache", file=sys.stderr)
+    fresh = (np.concatenate([v for v, _ in parts], axis=1), np.concatenate([k for _, k in parts], axis=1))
+    store = cache.rebuild(paths, stamps, cached_rows, fresh)
+    if use_cache:
+        store.save(FEATURE_CACHE)
+
+    df = store.to_frame()
+    # Impute numerics (medians straight from the cached columns)
+    medians = store.medians()
+    for col in NUM_COLS:
         if col in df.columns:
-            df[col].fillna(df[col].median(), inplace=True)
+            df[col] = df[col].fillna(medians[col])
     df.dropna(subset=["age", "gender"], inplace=True)
-    df.to_csv(OUT_CSV, index=False)
-    print(f"\nSaved dataset → {OUT_CSV}  ({len(df)} rows)")
-    return df
+    write_processed(df, OUT_DATA)
+    print(f"\nSaved dataset → {OUT_DATA}  ({len(df)} rows, {workers} worker(s))")
+    if csv_path:
+        df.to_csv(csv_path, index=False)
+        print(f"Exported CSV → {csv_path}")
+    # hand back the stored (typed, memory-mapped) columns so training sees the same data either way
+    return load_processed(OUT_DATA)
 
 # ───────────────────────────── M O D E L   T R A I N ──────────────────────────
-def train_model_for_label(df: pd.DataFrame, feat_cols: List[str], label_name: str, model_path: str, scaler_path: str):
+def build_feature_schema(X: pd.DataFrame, label_name: str, classes) -> Dict[str, Any]:
+    """Input contract stored next to each model; the API compiles it into its feature gather plan."""
+    medians = X.median()
+    return dict(
+        label=label_name,
+        columns=list(X.columns),
+        dtypes={c: str(X[c].dtype) for c in X.columns},
+        # continuous lab/vital columns only: age, gender and the 0/1 flags stay null so the API
+        # imputes the documented spec defaults (a median would make a missing gender 1.0, or a flag 0.5);
+        # NaN (all-missing column) becomes null too
+        medians={c: (None if c not in NUM_COLS or pd.isna(medians[c]) else float(medians[c])) for c in X.columns},
+        classes=[int(c) for c in classes],
+        n_train=int(len(X)),
+        trained_at=datetime.now().isoformat(timespec="seconds"),
+    )
+
+# Hyper-parameter grid searched for every disease model
+PARAM_GRID = dict(
+    n_estimators=[200, 400],
+    max_depth=[None, 20, 30],
+    min_samples_split=[2, 5],
+)
+
+def _split_and_scale(df: pd.DataFrame, feat_cols: List[str], label_name: str):
+    """Stratified train/test split, SMOTE on the training part, StandardScaler fit on the result."""
     X, y = df[feat_cols], df[label_name]
     strat = y.nunique() > 1
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, stratify=y if strat else None, random_state=42
     )
+    X_train_raw = X_train  # pre-SMOTE training rows: source of the schema's imputation medians
     if y_train.nunique() > 1 and len(y_train) >= 5:
         X_train, y_train = SMOTE(random_state=42).fit_resample(X_train, y_train)
     scaler = StandardScaler()
     X_train_s, X_test_s = scaler.fit_transform(X_train), scaler.transform(X_test)
+    return X_train_raw, X_train_s, y_train, X_test_s, y_test, scaler
+
+def export_forest(model, scaler, forest_path: str) -> None:
+    """
+    Write the NumPy-only serving artifact: the forest's node arrays with the scaler folded
+    into the split thresholds (forest_engine.CompiledForest), so the API can predict
+    without sklearn. The scaler's own parameters are kept alongside for reference.
+    """
+    forest = CompiledForest.from_sklearn(model, scaler)
+    if scaler is not None:
+        forest.extra["scaler_mean"] = np.asarray(scaler.mean_, dtype=np.float64)
+        forest.extra["scaler_scale"] = np.asarray(scaler.scale_, dtype=np.float64)
+    _atomic_write(forest_path, forest.save)
+
+def export_lookup(spec, model, scaler, schema: Dict[str, Any], forest_path: str, lookup_path: str) -> None:
+    """
+    Write the precomputed P(positive) table over spec.lookup_grid (lookup_table.LookupTable)
+    for the model just exported to forest_path, imputing like the API does from the schema
+    medians. Every cell is the model's own output for that input.
+    """
+    if not spec.lookup_grid:
+        return
+    columns = list(schema["columns"])
+    positive = np.isin(model.classes_, spec.positive_classes)
+
+    def predict(X: np.ndarray) -> np.ndarray:
+        X = pd.DataFrame(X, columns=columns)
+        if scaler is not None:
+            X = scaler.transform(X)
+        return model.predict_proba(X)[:, positive].sum(axis=1)
+
+    fill = spec.fill_values(columns, schema.get("medians") or {})
+    meta = {"forest_sha1": file_sha1(forest_path), "positive_classes": list(spec.positive_classes)}
+    table = LookupTable.build(columns, fill, spec.lookup_grid, predict, meta=meta)
+    _atomic_write(lookup_path, table.save)
+    print(f"{spec.name} Lookup → {lookup_path}  ({table.table.size:,} cells over {table.grid_columns}, "
+          f"{table.table.nbytes / 2**20:.1f} MiB)")
+
+def _atomic_write(path: str, write) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+def _save_model(model, scaler, X_train_raw, X_test_s, y_test, label_name: str, model_path: str,
+                scaler_path: str, schema_path: Optional[str] = None, lookup: bool = False) -> None:
+    print(
+        f"\nTest set report for {label_name}:\n",
+        classification_report(y_test, model.predict(X_test_s), digits=3))
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    # every artifact is written to a temp file and renamed into place: a running API may have
+    # the previous file memory-mapped, and its reload watcher must never see a half-written one
+    _atomic_write(model_path, lambda tmp: joblib.dump(model, tmp))
+    _atomic_write(scaler_path, lambda tmp: joblib.dump(scaler, tmp))
+    schema_path = schema_path or os.path.splitext(model_path)[0] + ".schema.json"
+    schema = build_feature_schema(X_train_raw, label_name, model.classes_)
+
+    def write_schema(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(schema, f, indent=2)
+    _atomic_write(schema_path, write_schema)
+    forest_path = os.path.splitext(model_path)[0] + ".forest.npz"
+    export_forest(model, scaler, forest_path)
+    print(f"{label_name} Model → {model_path}\nScaler → {scaler_path}\nSchema → {schema_path}\n"
+          f"Forest → {forest_path}")
+    lookup_path = os.path.splitext(model_path)[0] + ".lookup.npz"
+    spec = next((s for s in DISEASES.values() if s.label == label_name), None)
+    if lookup and spec is not None:
+        export_lookup(spec, model, scaler, schema, forest_path, lookup_path)
+    elif os.path.exists(lookup_path):
+        # built for the previous model: the API would refuse it anyway
+        os.remove(lookup_path)
+        print(f"Removed stale {lookup_path}")
+
+def train_model_for_label(df: pd.DataFrame, feat_cols: List[str], label_name: str, model_path: str, scaler_path: str,
+                          schema_path: Optional[str] = None, lookup: bool = False):
+    X_train_raw, X_train_s, y_train, X_test_s, y_test, scaler = _split_and_scale(df, feat_cols, label_name)
     grid = GridSearchCV(
         RandomForestClassifier(class_weight="balanced", random_state=42),
-        param_grid=dict(
-            n_estimators=[200, 400],
-            max_depth=[None, 20, 30],
-            min_samples_split=[2, 5],
-        ),
+        param_grid=PARAM_GRID,
         cv=4, scoring="accuracy", n_jobs=-1, verbose=1)
     grid.fit(X_train_s, y_train)
     print(f"{label_name} best params: {grid.best_params_}")
-    print(
-        f"\nTest set report for {label_name}:\n",
-        classification_report(y_test, grid.best_estimator_.predict(X_test_s), digits=3))
-    os.makedirs(MODEL_DIR, exist_ok=True)
-    joblib.dump(grid.best_estimator_, model_path)
-    joblib.dump(scaler, scaler_path)
-    print(f"{label_name} Model → {model_path}\nScaler → {scaler_path}")
+    _save_model(grid.best_estimator_, scaler, X_train_raw, X_test_s, y_test, label_name,
+                model_path, scaler_path, schema_path, lookup)
+
+# ─────────────────────────── F A S T   S E A R C H ────────────────────────────
+class WarmForestSearch:
+    """
+    PARAM_GRID search for one label where each (max_depth, min_samples_split) candidate and
+    CV fold grows one warm-started forest through the n_estimators values (200 → 400 adds
+    200 trees instead of fitting 400 from scratch). With the same random_state a grown
+    forest is identical to a fresh fit, so the scores and best_params_ match
+    GridSearchCV(cv=4, scoring="accuracy") exactly; a task grows its forest through every
+    size and drops it. With halving, the search stops after each size and only the better
+    half of the candidates is grown further (their forests are kept between sizes).
+    """
+
+    def __init__(self, label_name: str, X: np.ndarray, y: np.ndarray, cv: int = 4, halving: bool = False):
+        self.label_name = label_name
+        self.X, self.y = X, np.asarray(y)
+        self.sizes = sorted(PARAM_GRID["n_estimators"])
+        self.stages = [[size] for size in self.sizes] if halving else [self.sizes]
+        self.candidates = list(ParameterGrid({k: v for k, v in PARAM_GRID.items() if k != "n_estimators"}))
+        self.folds = list(StratifiedKFold(n_splits=cv).split(self.X, self.y))
+        self.alive = list(range(len(self.candidates)))
+        self.forests: Dict[Tuple[int, int], RandomForestClassifier] = {}
+        self.scores: Dict[Tuple[int, int], float] = {}  # (candidate, size) -> mean CV accuracy
+
+    def tasks(self, stage: int) -> List[Tuple[int, int, List[int]]]:
+        """(candidate, fold, sizes) of every forest to grow in `stage`."""
+        if stage >= len(self.stages):
+            return []
+        return [(cand, fold, self.stages[stage]) for cand in self.alive for fold in range(len(self.folds))]
+
+    def grow(self, cand: int, fold: int, sizes: List[int]) -> List[float]:
+        forest = self.forests.pop((cand, fold), None) or _new_forest(self.candidates[cand])
+        train_idx, val_idx = self.folds[fold]
+        scores = _grow_forest(forest, self.X, self.y, train_idx, val_idx, sizes)
+        if sizes[-1] != self.sizes[-1]:
+            self.forests[(cand, fold)] = forest  # halving: grown further if the candidate survives
+        return scores
+
+    def finish_stage(self, stage: int, fold_scores: Dict[Tuple[int, int], List[float]]) -> None:
+        sizes = self.stages[stage]
+        for cand in self.alive:
+            for i, size in enumerate(sizes):
+                self.scores[(cand, size)] = float(np.average([fold_scores[(cand, f)][i] for f in range(len(self.folds))]))
+        if stage + 1 < len(self.stages) and len(self.alive) > 1:
+            ranked = sorted(self.alive, key=lambda c: -self.scores[(c, sizes[-1])])
+            keep = set(ranked[:(len(ranked) + 1) // 2])
+            for cand in self.alive:
+                if cand not in keep:
+                    for fold in range(len(self.folds)):
+                        self.forests.pop((cand, fold), None)
+            self.alive = [c for c in self.alive if c in keep]
+
+    @property
+    def best_params_(self) -> Dict[str, Any]:
+        # GridSearchCV order (sorted keys: max_depth, min_samples_split, n_estimators); first of equal scores wins
+        order = sorted(self.scores, key=lambda k: (k[0], self.sizes.index(k[1])))
+        cand, size = max(order, key=lambda k: self.scores[k])
+        return dict(self.candidates[cand], n_estimators=size)
+
+def _new_forest(params: Dict[str, Any]) -> RandomForestClassifier:
+    return RandomForestClassifier(class_weight="balanced", random_state=42, warm_start=True, n_jobs=1, **params)
+
+def _grow_forest(forest, X, y, train_idx, val_idx, sizes: List[int]) -> List[float]:
+    """Grow `forest` on the training fold through `sizes`; validation accuracy after each."""
+    X_fit, y_fit, X_val, y_val = X[train_idx], y[train_idx], X[val_idx], y[val_idx]
+    scores = []
+    for size in sizes:
+        forest.set_params(n_estimators=size)
+        forest.fit(X_fit, y_fit)
+        scores.append(float(np.mean(forest.predict(X_val) == y_val)))
+    return scores
+
+# Pool tasks are (disease, candidate, params, fold, sizes). Thread workers call the disease's
+# WarmForestSearch directly; process workers read the disease's training matrix, labels and
+# fold indices from shared memory (published by _publish_searches) and get only the task.
+def _grow_task(searches, task):
+    name, cand, _params, fold, sizes = task
+    return name, cand, fold, searches[name].grow(cand, fold, sizes)
+
+def _refit_task(searches, task):
+    name, params = task
+    model = RandomForestClassifier(class_weight="balanced", random_state=42, n_jobs=1, **params)
+    return model.fit(searches[name].X, searches[name].y)
+
+def _publish_searches(shared: shared_arrays.SharedArrays, searches: Dict[str, WarmForestSearch]) -> None:
+    for name, search in searches.items():
+        shared.publish(f"{name}.X", search.X)
+        shared.publish(f"{name}.y", search.y)
+        for fold, (train_idx, val_idx) in enumerate(search.folds):
+            shared.publish(f"{name}.fold{fold}.train", train_idx)
+            shared.publish(f"{name}.fold{fold}.val", val_idx)
+
+def _init_train_worker(shared_dir: str) -> None:
+    shared_arrays.attach(shared_dir)
+    warnings.filterwarnings("ignore", message='class_weight presets "balanced"', category=UserWarning)
+
+def _grow_shared_task(task):
+    # a fresh forest even in later halving stages: with the same random_state, fitting
+    # straight to a size gives the forest warm growth would have (nothing is kept per worker)
+    name, cand, params, fold, sizes = task
+    X, y = shared_arrays.get(f"{name}.X"), shared_arrays.get(f"{name}.y")
+    train_idx, val_idx = shared_arrays.get(f"{name}.fold{fold}.train"), shared_arrays.get(f"{name}.fold{fold}.val")
+    return name, cand, fold, _grow_forest(_new_forest(params), X, y, train_idx, val_idx, sizes)
+
+def _refit_shared_task(task):
+    name, params = task
+    model = RandomForestClassifier(class_weight="balanced", random_state=42, n_jobs=1, **params)
+    return model.fit(shared_arrays.get(f"{name}.X"), shared_arrays.get(f"{name}.y"))
+
+def train_models_concurrently(df: pd.DataFrame, configs: Dict[str, tuple], halving: bool = False,
+                              cpus: Optional[int] = None, pool: Optional[str] = None,
+                              lookup_tables: Optional[Set[str]] = None) -> None:
+    """
+    Train every disease in `configs` ({name: (features, label, model, scaler, schema paths)})
+    with WarmForestSearch. Every forest fit of every disease is one task on a single pool
+    of `cpus` workers, so the diseases share one CPU budget instead of each grid starting
+    n_jobs=-1 workers. Tasks are submitted largest first (training rows x trees), so the
+    small diseases fill the cores the big ones leave idle at the end of each stage.
+
+    pool="process" (opt-in, see TRAIN_POOL) puts each disease's scaled training matrix, labels
+    and CV folds in shared memory once; a task carries only its disease, candidate and fold,
+    and only scores (and the final models) come back. pool="thread" (the default) shares the
+    arrays in process (sklearn builds trees without the GIL) and keeps halving forests
+    between stages. Lookup tables are built for the diseases in `lookup_tables` (default
+    LOOKUP_TABLES).
+    """
+    cpus = cpus or os.cpu_count() or 1
+    pool = (pool or TRAIN_POOL).lower()
+    lookup_tables = LOOKUP_TABLES if lookup_tables is None else lookup_tables
+    # every fold forest is grown on the same rows it started on, which is what the warning is about
+    warnings.filterwarnings("ignore", message='class_weight presets "balanced"', category=UserWarning)
+    prepared, searches = {}, {}
+    for name, (feat_cols, label_col, *_paths) in configs.items():
+        prepared[name] = _split_and_scale(df, feat_cols, label_col)
+        _, X_train_s, y_train, *_rest = prepared[name]
+        searches[name] = WarmForestSearch(label_col, X_train_s, y_train, halving=halving)
+
+    with ExitStack() as stack:
+        if pool == "process":
+            shared = stack.enter_context(shared_arrays.SharedArrays())
+            _publish_searches(shared, searches)
+            executor = stack.enter_context(ProcessPoolExecutor(
+                max_workers=cpus, initializer=_init_train_worker, initargs=(shared.dir,)))
+            grow, refit = _grow_shared_task, _refit_shared_task
+        else:
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=cpus))
+            grow, refit = partial(_grow_task, searches), partial(_refit_task, searches)
+
+        for stage in range(max(len(search.stages) for search in searches.values())):
+            tasks = [(name, cand, search.candidates[cand], fold, sizes)
+                     for name, search in searches.items() for cand, fold, sizes in search.tasks(stage)]
+            tasks.sort(key=lambda t: -len(searches[t[0]].folds[t[3]][0]) * t[4][-1])
+            fold_scores = {name: {} for name in searches}
+            for name, cand, fold, scores in executor.map(grow, tasks):
+                fold_scores[name][(cand, fold)] = scores
+            for name, search in searches.items():
+                if stage < len(search.stages):
+                    search.finish_stage(stage, fold_scores[name])
+            print(f"→ {len(tasks)} forests grown")
+        order = sorted(searches, key=lambda n: -len(searches[n].y))
+        models = dict(zip(order, executor.map(refit, [(n, searches[n].best_params_) for n in order])))
+
+    for name, (feat_cols, label_col, model_path, scaler_path, schema_path) in configs.items():
+        X_train_raw, _, _, X_test_s, y_test, scaler = prepared[name]
+        print(f"{label_col} best params: {searches[name].best_params_}")
+        _save_model(models[name], scaler, X_train_raw, X_test_s, y_test, label_col,
+                    model_path, scaler_path, schema_path, name in lookup_tables)
 
 # ──────────────────────────────────── MAIN ────────────────────────────────────
 if __name__ == "__main__":
-    df = prepare_dataframe()
+    import argparse
+    ap = argparse.ArgumentParser(description="Extract FHIR features and train the per-disease models.")
+    ap.add_argument("--workers", type=int, default=INGEST_WORKERS, help="bundle extraction processes (1 = serial)")
+    ap.add_argument("--chunk-size", type=int, default=INGEST_CHUNK, help="bundles per worker task")
+    ap.add_argument("--no-cache", action="store_true", help="re-extract every bundle and leave the feature cache alone")
+    ap.add_argument("--stream-min-bytes", type=int, default=STREAM_MIN_BYTES,
+                    help="parse bundles at least this large incrementally with ijson (0 = all)")
+    ap.add_argument("--csv", nargs="?", const=OUT_CSV, default=None, metavar="PATH",
+                    help=f"also export the processed dataset as CSV (default path: {OUT_CSV})")
+    ap.add_argument("--skip-extract", action="store_true",
+                    help=f"train from the existing processed dataset in {OUT_DATA}")
+    ap.add_argument("--search", choices=["grid", "warm", "halving"], default="grid",
+                    help="grid: GridSearchCV per disease; warm: same result from warm-started forests, all "
+                         "diseases on one pool; halving: warm, growing only the better half of candidates")
+    ap.add_argument("--cpus", type=int, default=None, help="CPU budget shared by all diseases (warm/halving)")
+    ap.add_argument("--pool", choices=["thread", "process"], default=TRAIN_POOL,
+                    help="warm/halving: fit forests in threads, or in worker processes reading the training "
+                         "matrices from shared memory (multi-core hosts; halving refits each stage)")
+    ap.add_argument("--lookup-tables", default=",".join(sorted(LOOKUP_TABLES)), metavar="NAMES",
+                    help="build the precomputed probability tables of these diseases (comma-separated, or all) "
+                         "for the API's RISK_LOOKUP")
+    ap.add_argument("--export-only", action="store_true",
+                    help="write the NumPy forest exports (and --lookup-tables) for the already trained models and exit")
+    args = ap.parse_args()
+    lookup_tables = select_diseases(args.lookup_tables)
+
+    if args.export_only:
+        for name in DISEASES:
+            if not os.path.exists(MODEL_PATHS[name]):
+                print(f"{name}: no model at {MODEL_PATHS[name]}, skipped")
+                continue
+            scaler = joblib.load(SCALER_PATHS[name]) if os.path.exists(SCALER_PATHS[name]) else None
+            model = joblib.load(MODEL_PATHS[name])
+            export_forest(model, scaler, FOREST_PATHS[name])
+            print(f"{name} Forest → {FOREST_PATHS[name]}")
+            # models older than their schema file are served on the spec's columns and defaults
+            schema = {"columns": DISEASES[name].features}
+            if os.path.exists(SCHEMA_PATHS[name]):
+                with open(SCHEMA_PATHS[name], "r", encoding="utf-8") as f:
+                    schema = json.load(f)
+            if name in lookup_tables:
+                export_lookup(DISEASES[name], model, scaler, schema, FOREST_PATHS[name], LOOKUP_PATHS[name])
+        sys.exit(0)
+
+    if args.skip_extract:
+        needed = {c for spec in DISEASES.values() for c in spec.features + [spec.label]}
+        df = load_processed(OUT_DATA, [c for c in FEATURE_COLUMNS if c in needed])
+    else:
+        df = prepare_dataframe(workers=args.workers, chunk_size=args.chunk_size,
+                               stream_min_bytes=args.stream_min_bytes, use_cache=not args.no_cache,
+                               csv_path=args.csv)
     disease_configs = {
-        "cardio": (["age","gender","sbp","dbp","glucose","bmi","tc","hdl","ldl","smoker","dm","htn","fam_cad"], "risk_label", MODEL_PATHS["cardio"], SCALER_PATHS["cardio"]),
-        "diabetes": (["age","gender","bmi","hba1c","glucose","smoker"], "diabetes_label", MODEL_PATHS["diabetes"], SCALER_PATHS["diabetes"]),
-        "ckd": (["age","gender","creat","egfr","uacr","sbp","dbp","bmi"], "ckd_label", MODEL_PATHS["ckd"], SCALER_PATHS["ckd"]),
-        "nafld": (["age","gender","bmi","alt","ast","bilirubin"], "nafld_label", MODEL_PATHS["nafld"], SCALER_PATHS["nafld"]),
+        name: (spec.features, spec.label, MODEL_PATHS[name], SCALER_PATHS[name], SCHEMA_PATHS[name])
+        for name, spec in DISEASES.items()
     }
-    for disease, (feat_cols, label_col, model_path, scaler_path) in disease_configs.items():
-        if label_col in df.columns and df[label_col].nunique() > 1:
-            train_model_for_label(df, feat_cols, label_col, model_path, scaler_path)
+    disease_configs = {name: cfg for name, cfg in disease_configs.items()
+                       if cfg[1] in df.columns and df[cfg[1]].nunique() > 1}
+    if args.search == "grid":
+        for disease, (feat_cols, label_col, model_path, scaler_path, schema_path) in disease_configs.items():
+            train_model_for_label(df, feat_cols, label_col, model_path, scaler_path, schema_path,
+                                  lookup=disease in lookup_tables)
+    else:
+        train_models_concurrently(df, disease_configs, halving=args.search == "halving", cpus=args.cpus,
+                                  pool=args.pool, lookup_tables=lookup_tables)
@@ -0,0 +1,162 @@
+# models-api/src/disease_specs.py
+"""
+Single declarative description of every disease model, shared by training
+(data_preparation_model_training.py) and serving (fastapi_app.py).
+
+Adding a disease means adding one DiseaseSpec here: training picks up its
+feature columns / label / artifact paths, and the API scores it alongside the
+others with no new endpoint code. Keep this module free of heavy imports.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+
+@dataclass(frozen=True)
+class DiseaseSpec:
+    name: str                               # key in the API response ("risk": {name: ...})
+    features: List[str]                     # training column order == model input order
+    label: str                              # training label column
+    model_file: str                         # artifact names inside MODEL_DIR / MODELS_DIR
+    scaler_file: str
+    defaults: Dict[str, float]              # serving fill values for inputs the request leaves out
+    positive: str                           # response key for P(positive), e.g. "High" / "Yes"
+    negative: str
+    positive_classes: Tuple[int, ...] = (1,)  # label values summed into P(positive)
+    # (min probability, message), checked in order; the last entry should have threshold 0
+    interpretations: List[Tuple[float, str]] = field(default_factory=list)
+    # heuristic used when the model is missing or fails (responses mark it "source": "heuristic"):
+    #   p = fallback_base + sum(weight * ((value or default) - center))
+    # without one, the disease is left out of the response while its model is unavailable
+    fallback_base: float = 0.05
+    fallback_terms: Dict[str, Tuple[float, float, float]] = field(default_factory=dict)
+    # features a precomputed probability table covers, at clinical resolution: feature -> (first, last, step)
+    # (see lookup_table.py; requests setting any other feature are scored by the model)
+    lookup_grid: Dict[str, Tuple[float, float, float]] = field(default_factory=dict)
+
+    @property
+    def model_stem(self) -> str:
+        return self.model_file.rsplit(".", 1)[0]
+
+    @property
+    def scaler_stem(self) -> str:
+        return self.scaler_file.rsplit(".", 1)[0]
+
+    @property
+    def schema_file(self) -> str:
+        # written by training next to the model: column order, dtypes, training medians (continuous columns)
+        return f"{self.model_stem}.schema.json"
+
+    @property
+    def forest_file(self) -> str:
+        # NumPy-only export of the model with its scaler folded in (forest_engine.CompiledForest),
+        # written by training next to the joblib files; the API serves it without sklearn
+        return f"{self.model_stem}.forest.npz"
+
+    @property
+    def lookup_file(self) -> str:
+        # P(positive) over lookup_grid (lookup_table.LookupTable), written by training next to the forest
+        return f"{self.model_stem}.lookup.npz"
+
+    def fill_values(self, columns: List[str], medians: Dict[str, Optional[float]]) -> List[float]:
+        """Imputation value per model column: the training median, or the spec default where training had none."""
+        return [medians[c] if medians.get(c) is not None else self.defaults.get(c, 0.0) for c in columns]
+
+    def interpret(self, p_positive: float) -> str:
+        for threshold, message in self.interpretations:
+            if p_positive >= threshold:
+                return message
+        return self.interpretations[-1][1] if self.interpretations else ""
+
+
+DISEASES: Dict[str, DiseaseSpec] = {
+    "cardio": DiseaseSpec(
+        name="cardio",
+        features=["age", "gender", "sbp", "dbp", "glucose", "bmi", "tc", "hdl", "ldl", "smoker", "dm", "htn", "fam_cad"],
+        label="risk_label",
+        model_file="cardio_risk_rf.joblib",
+        scaler_file="cardio_scaler.joblib",
+        defaults={"age": 40.0, "gender": 0.0, "sbp": 120.0, "dbp": 80.0, "glucose": 5.2, "bmi": 25.0,
+                  "tc": 5.0, "hdl": 1.3, "ldl": 3.0, "smoker": 0.0, "dm": 0.0, "htn": 0.0, "fam_cad": 0.0},
+        positive="High",
+        negative="Low",
+        # risk_label is 0 = low, 1 = moderate, 2 = high: "High" is P(high) alone and "Low" its
+        # complement, P(low or moderate)
+        positive_classes=(2,),
+        interpretations=[
+            (0.20, "High cardiovascular risk: consider aggressive risk factor control."),
+            (0.10, "Moderate cardiovascular risk: optimize lifestyle and consider medication."),
+            (0.0, "Low cardiovascular risk: maintain healthy lifestyle."),
+        ],
+        fallback_terms={
+            "sbp": (0.003, 120.0, 120.0),
+            "ldl": (0.04, 3.0, 2.5),
+            "smoker": (0.1, 0.0, 0.0),
+            "dm": (0.08, 0.0, 0.0),
+            "age": (0.002, 40.0, 40.0),
+            "bmi": (0.003, 25.0, 25.0),
+        },
+        lookup_grid={"age": (20.0, 90.0, 5.0), "gender": (0.0, 1.0, 1.0), "sbp": (90.0, 200.0, 2.0),
+                     "ldl": (1.0, 6.0, 0.1), "smoker": (0.0, 1.0, 1.0), "dm": (0.0, 1.0, 1.0)},
+    ),
+    "diabetes": DiseaseSpec(
+        name="diabetes",
+        features=["age", "gender", "bmi", "hba1c", "glucose", "smoker"],
+        label="diabetes_label",
+        model_file="diabetes_rf.joblib",
+        scaler_file="diabetes_scaler.joblib",
+        defaults={"age": 40.0, "gender": 0.0, "bmi": 25.0, "hba1c": 5.5, "glucose": 5.2, "smoker": 0.0},
+        positive="Yes",
+        negative="No",
+        interpretations=[
+            (0.30, "High diabetes risk: consider fasting glucose/HbA1c follow-up and lifestyle intervention."),
+            (0.0, "Low diabetes risk: continue routine screening."),
+        ],
+        fallback_terms={
+            "hba1c": (0.08, 5.5, 5.5),
+            "glucose": (0.03, 5.0, 5.2),
+            "bmi": (0.02, 25.0, 25.0),
+            "fam_cad": (0.05, 0.0, 0.0),
+        },
+        lookup_grid={"age": (20.0, 90.0, 5.0), "gender": (0.0, 1.0, 1.0), "bmi": (15.0, 45.0, 0.5),
+                     "hba1c": (4.0, 12.0, 0.1), "smoker": (0.0, 1.0, 1.0)},
+    ),
+    "ckd": DiseaseSpec(
+        name="ckd",
+        features=["age", "gender", "creat", "egfr", "uacr", "sbp", "dbp", "bmi"],
+        label="ckd_label",
+        model_file="ckd_rf.joblib",
+        scaler_file="ckd_scaler.joblib",
+        defaults={"age": 40.0, "gender": 0.0, "creat": 80.0, "egfr": 90.0, "uacr": 10.0,
+                  "sbp": 120.0, "dbp": 80.0, "bmi": 25.0},
+        positive="Yes",
+        negative="No",
+        interpretations=[
+            (0.30, "High chronic kidney disease risk: check eGFR and urine albumin (UACR) and review nephrotoxic medications."),
+            (0.0, "Low chronic kidney disease risk: continue routine monitoring."),
+        ],
+        lookup_grid={"age": (20.0, 90.0, 5.0), "gender": (0.0, 1.0, 1.0), "egfr": (5.0, 120.0, 5.0),
+                     "creat": (40.0, 400.0, 10.0)},
+    ),
+    "nafld": DiseaseSpec(
+        name="nafld",
+        features=["age", "gender", "bmi", "alt", "ast", "bilirubin"],
+        label="nafld_label",
+        model_file="nafld_rf.joblib",
+        scaler_file="nafld_scaler.joblib",
+        defaults={"age": 40.0, "gender": 0.0, "bmi": 25.0, "alt": 25.0, "ast": 25.0, "bilirubin": 0.9},
+        positive="Yes",
+        negative="No",
+        interpretations=[
+            (0.30, "High fatty liver risk: consider liver enzyme follow-up and ultrasound; address weight and metabolic factors."),
+            (0.0, "Low fatty liver risk: continue routine screening."),
+        ],
+        lookup_grid={"age": (20.0, 90.0, 5.0), "gender": (0.0, 1.0, 1.0), "alt": (5.0, 200.0, 5.0),
+                     "ast": (5.0, 200.0, 5.0)},
+    ),
+}
+
+
+def select_diseases(setting: str) -> Set[str]:
+    """DISEASES named in a comma-separated setting such as RISK_LOOKUP ("all" for every one)."""
+    names = {name.strip() for name in setting.lower().split(",") if name.strip()}
+    return set(DISEASES) if "all" in names else names & set(DISEASES)
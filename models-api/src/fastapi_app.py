@@ -1,12 +1,26 @@
 # models-api/src/fastapi_app.py
-from typing import Optional, Literal, Dict, Any
-from fastapi import FastAPI, Header, HTTPException
+from typing import Optional, Dict, Any, List
+from fastapi import Body, FastAPI, Header, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, field_validator
+from pydantic import ValidationError
 from pathlib import Path
-import joblib
-import numpy as np
+import asyncio
+import hmac
 import logging
+import json
+import os
+import sys
+import threading
+import time
+
+# sibling modules resolve whether we run as `fastapi_app` or `src.fastapi_app`
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# only light modules here: numpy, joblib and sklearn come in with scoring.py (see STARTUP_MODE)
+from patient_schema import PatientIn, decode_patient  # noqa: E402
+from inference_executor import InferenceExecutor, Overloaded  # noqa: E402
+from micro_batcher import MicroBatcher  # noqa: E402
+from metrics import CONTENT_TYPE, REGISTRY as METRICS, histogram_samples  # noqa: E402
 
 app = FastAPI(title="Risk Predictor API", version="1.0.0")
 
@@ -24,179 +38,239 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ---- Models (Pydantic v2) ----
-class PatientIn(BaseModel):
-    # strings allowed; we coerce to numbers where needed
-    name: Optional[str] = None
-    email: Optional[str] = None
-    age: Optional[float] = None
-    gender: Optional[Literal["0", "1"]] = None
-
-    sbp: Optional[float] = None
-    dbp: Optional[float] = None
-    bmi: Optional[float] = None
-
-    glucose: Optional[float] = None
-    tc: Optional[float] = None
-    hdl: Optional[float] = None
-    ldl: Optional[float] = None
-    hba1c: Optional[float] = None
-    alt: Optional[float] = None
-    ast: Optional[float] = None
-    creat: Optional[float] = None
-    egfr: Optional[float] = None
-    uacr: Optional[float] = None
-    bilirubin: Optional[float] = None
-
-    smoker: Optional[Literal["0", "1"]] = None
-    dm: Optional[Literal["0", "1"]] = None
-    htn: Optional[Literal["0", "1"]] = None
-    fam_cad: Optional[Literal["0", "1"]] = None
-
-    # coerce blanks ("") to None so Number("") in the UI doesn’t explode server-side
-    @field_validator("*", mode="before")
-    @classmethod
-    def empty_to_none(cls, v: Any) -> Any:
-        if v == "":
-            return None
-        return v
-
 # ------------------------
-# Logging + model paths
+# Logging + startup mode
 # ------------------------
 logger = logging.getLogger("uvicorn.error")
-HERE = Path(__file__).resolve().parent
-MODELS_DIR = (HERE.parent / "models").resolve()
 
-# Names expected in your repository (adjust if different)
-CARDIO_MODEL_FN = MODELS_DIR / "cardio_risk_rf.joblib"
-CARDIO_SCALER_FN = MODELS_DIR / "cardio_scaler.joblib"
-DIAB_MODEL_FN = MODELS_DIR / "diabetes_rf.joblib"
-DIAB_SCALER_FN = MODELS_DIR / "diabetes_scaler.joblib"
+# How much work happens before the first request is answered:
+#   lazy     numpy/joblib/sklearn and the models load on the first prediction; /health and
+#            /metrics answer as soon as the web stack is imported (serverless cold starts)
+#   prewarm  as lazy, but a background thread loads them right after startup
+#   eager    everything is loaded before the server accepts requests
+STARTUP_MODE = os.getenv("STARTUP_MODE", "lazy").lower()
 
-_cardio_model = None
-_cardio_scaler = None
-_diab_model = None
-_diab_scaler = None
 
-# ------------------------
-# Utilities
-# ------------------------
-def _safe_float(val: Any, default: float = 0.0) -> float:
-    try:
-        if val is None:
-            return default
-        if isinstance(val, str):
-            v = val.strip()
-            if v == "":
-                return default
-            if v in ("1", "0"):
-                return float(v)
-        return float(val)
-    except Exception:
-        return default
+_scoring_module = None  # set once scoring.py has been fully imported
+
+
+def _scoring():
+    """The scoring module, imported on first use (the first import pulls in numpy and the feature schemas)."""
+    global _scoring_module
+    if _scoring_module is None:
+        import scoring
+        _scoring_module = scoring
+    return _scoring_module
+
 
+def load_models(models_dir: Optional[str] = None):
+    """Eagerly load every artifact (the registry otherwise loads each one on first use)."""
+    _scoring().load_models(models_dir)
 
-def _soft_prob(p: float) -> float:
-    # clamp 0..1 and round for nicer output
-    return round(max(0.0, min(1.0, p)), 3)
 
+def score_patients_batch(payloads: List[PatientIn]) -> List[Dict[str, Any]]:
+    """Score every payload for every disease; see scoring.score_patients_batch."""
+    return _scoring().score_patients_batch(payloads)
 
-def _interpret_cardio(p_high: float) -> str:
-    if p_high >= 0.20:
-        return "High cardiovascular risk: consider aggressive risk factor control."
-    if p_high >= 0.10:
-        return "Moderate cardiovascular risk: optimize lifestyle and consider medication."
-    return "Low cardiovascular risk: maintain healthy lifestyle."
 
+def score_rows(rows: List[List[float]]) -> List[Dict[str, Any]]:
+    """Score rows from decode_patient (what the endpoints pass to the executor); see scoring.score_rows."""
+    return _scoring().score_rows(rows)
 
-def _interpret_diabetes(p_yes: float) -> str:
-    if p_yes >= 0.30:
-        return "High diabetes risk: consider fasting glucose/HbA1c follow-up and lifestyle intervention."
-    return "Low diabetes risk: continue routine screening."
 
 # ------------------------
-# Model loader + predictors
+# Metrics (scraped from GET /metrics)
 # ------------------------
-def _load_joblib(path: Path):
-    try:
-        if not path.exists():
-            logger.warning(f"Model file not found: {path}")
-            return None
-        return joblib.load(path)
-    except Exception:
-        logger.exception(f"Error loading joblib file {path}")
-        return None
+# The per-model series (stages, predictions, fallbacks, load times) are declared by
+# scoring.py and appear once it is loaded; with INFERENCE_EXECUTOR=process they stay in
+# the workers and only the HTTP/executor/batcher series are exported.
+STAGE_SECONDS = METRICS.histogram(
+    "risk_stage_seconds", "Time spent in each request-level scoring stage", ["stage"])
+HTTP_SECONDS = METRICS.histogram(
+    "http_request_duration_seconds", "End-to-end request time, including response serialization",
+    ["method", "path", "status"])
+
+
+class HTTPMetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request; unknown paths share one label to bound cardinality."""
+
+    def __init__(self, app):
+        self.app = app
+        self._paths: Optional[set] = None
+
+    def _path_label(self, path: str) -> str:
+        if self._paths is None:
+            self._paths = {getattr(r, "path", None) for r in app.routes}
+        return path if path in self._paths else "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
 
-
-def load_models():
-    global _cardio_model, _cardio_scaler, _diab_model, _diab_scaler
-    _cardio_model = _load_joblib(CARDIO_MODEL_FN)
-    _cardio_scaler = _load_joblib(CARDIO_SCALER_FN)
-    _diab_model = _load_joblib(DIAB_MODEL_FN)
-    _diab_scaler = _load_joblib(DIAB_SCALER_FN)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_SECONDS.observe_since(t0, scope["method"], self._path_label(scope["path"]), str(status[0]))
 
 
-# call on import
-load_models()
+app.add_middleware(HTTPMetricsMiddleware)
 
 
-# NOTE: The feature order below MUST match the features used during training.
-# If you trained with different names/order, update these lists to match.
-FEATURE_ORDER_CARDIO = ["age", "sbp", "ldl", "smoker", "dm", "bmi"]
-FEATURE_ORDER_DIAB = ["age", "hba1c", "glucose", "bmi", "fam_cad"]
+# ------------------------
+# Batch request decoding
+# ------------------------
+def _parse_batch_body(body: bytes, content_type: str) -> List[Any]:
+    """Decode a JSON array or NDJSON body into raw records; undecodable NDJSON lines become exceptions."""
+    if "ndjson" in content_type or "jsonl" in content_type:
+        records: List[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                records.append(e)
+        return records
+    try:
+        records = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    if isinstance(records, dict) and isinstance(records.get("patients"), list):
+        records = records["patients"]
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of patients or NDJSON")
+    return records
 
 
-def _build_feature_vector(payload: PatientIn, order: list, defaults: Dict[str, float]) -> np.ndarray:
-    vals = []
-    pdata = payload.__dict__
-    for f in order:
-        raw = pdata.get(f)
-        if raw is None:
-            # some names differ: try alternate names
-            # e.g., fam_cad in payload used for diabetes fam flag — keep mapping if needed
-            raw = pdata.get(f)
-        vals.append(_safe_float(raw, defaults.get(f, 0.0)))
-    return np.array(vals).reshape(1, -1)
+# ------------------------
+# Inference executor
+# ------------------------
+# Scoring runs on its own bounded pool ("thread" or "process"); once INFERENCE_WORKERS calls
+# are running and INFERENCE_MAX_QUEUE more are waiting, new requests get a fast 503.
+executor = InferenceExecutor(
+    kind=os.getenv("INFERENCE_EXECUTOR", "thread").lower(),
+    workers=int(os.getenv("INFERENCE_WORKERS", "0")) or None,
+    max_queue=int(os.getenv("INFERENCE_MAX_QUEUE", "64")),
+    # process workers load their own registry (compiled forests are shared via mmap)
+    initializer=load_models,
+)
 
 
-def predict_cardio_model(payload: PatientIn):
-    if _cardio_model is None:
-        return None
-    defaults = {"age": 40.0, "sbp": 120.0, "ldl": 3.0, "smoker": 0.0, "dm": 0.0, "bmi": 25.0}
-    fv = _build_feature_vector(payload, FEATURE_ORDER_CARDIO, defaults)
-    if _cardio_scaler is not None:
-        try:
-            fv = _cardio_scaler.transform(fv)
-        except Exception:
-            logger.exception("Cardio scaler transform failed; proceeding with raw features")
+def _prewarm():
+    t0 = time.perf_counter()
     try:
-        proba = _cardio_model.predict_proba(fv)
-        # sklearn convention: classes_ order -> assume index 1 is positive/high risk
-        p_high = float(proba[0, 1]) if proba.shape[1] > 1 else float(proba[0, 0])
-        return {"High": _soft_prob(p_high), "Low": _soft_prob(1.0 - p_high)}
+        load_models()
+        executor.start()
     except Exception:
-        logger.exception("Cardio model predict failed")
-        return None
+        logger.exception("Prewarm failed; models will load on first use")
+        return
+    logger.info(f"Prewarmed scoring in {time.perf_counter() - t0:.2f}s")
 
 
-def predict_diab_model(payload: PatientIn):
-    if _diab_model is None:
-        return None
-    defaults = {"age": 40.0, "hba1c": 5.5, "glucose": 5.2, "bmi": 25.0, "fam_cad": 0.0}
-    fv = _build_feature_vector(payload, FEATURE_ORDER_DIAB, defaults)
-    if _diab_scaler is not None:
+# ------------------------
+# Model hot reload
+# ------------------------
+# POST /admin/models/reload (needs ADMIN_TOKEN) and, when MODEL_WATCH_SECONDS > 0, a thread
+# that reloads once the active set's files have changed and then stayed unchanged for one
+# poll (so a training run is not picked up half-written). Each uvicorn worker reloads on
+# its own: with several workers use the watcher, or call the endpoint once per worker.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+MODEL_WATCH_SECONDS = float(os.getenv("MODEL_WATCH_SECONDS", "0"))
+
+
+def _reload(models_dir: Optional[Path] = None, canary: Optional[List[PatientIn]] = None,
+            force: bool = False) -> Dict[str, Any]:
+    """Swap in a new artifact set (see scoring.reload_models); process workers are replaced to follow it."""
+    result = _scoring().reload_models(models_dir, canary, force)
+    if executor.kind == "process":
+        executor.restart((result["models_dir"],))
+    return result
+
+
+def _watch_models():
+    last, attempted = None, None
+    while True:
+        time.sleep(MODEL_WATCH_SECONDS)
+        scoring = _scoring_module
+        if scoring is None:
+            continue  # nothing loaded yet: the first prediction reads the files as they are then
         try:
-            fv = _diab_scaler.transform(fv)
-        except Exception:
-            logger.exception("Diabetes scaler transform failed; proceeding with raw features")
+            stamps = scoring.changed_artifact_stamps()
+            if stamps is not None and stamps == last and stamps != attempted:
+                attempted = stamps  # a rejected set is not retried until its files change again
+                _reload()
+            last = stamps
+        except Exception as e:
+            logger.warning(f"Model watcher: reload not applied ({e})")
+
+
+@app.on_event("startup")
+def _start_executor():
+    if STARTUP_MODE == "eager":
+        _prewarm()
+    elif STARTUP_MODE == "prewarm":
+        threading.Thread(target=_prewarm, name="prewarm", daemon=True).start()
+    # lazy: the pool (and, for process workers, their model loading) starts with the first call
+    if MODEL_WATCH_SECONDS > 0:
+        threading.Thread(target=_watch_models, name="model-watcher", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def _stop_executor():
+    executor.shutdown()
+
+
+async def _score(rows: List[List[float]]) -> List[Dict[str, Any]]:
     try:
-        proba = _diab_model.predict_proba(fv)
-        p_yes = float(proba[0, 1]) if proba.shape[1] > 1 else float(proba[0, 0])
-        return {"Yes": _soft_prob(p_yes), "No": _soft_prob(1.0 - p_yes)}
-    except Exception:
-        logger.exception("Diabetes model predict failed")
-        return None
+        return await executor.run(score_rows, rows)
+    except Overloaded as e:
+        logger.warning(f"Shedding load: {e}")
+        raise HTTPException(status_code=503, detail="Scoring is at capacity; retry shortly",
+                            headers={"Retry-After": "1"})
+
+
+# Concurrent single-patient requests arriving within MICRO_BATCH_WINDOW_MS of each other
+# (up to MICRO_BATCH_MAX) are scored as one batch; a window of 0 scores each request alone.
+MICRO_BATCH_WINDOW_MS = float(os.getenv("MICRO_BATCH_WINDOW_MS", "2"))
+MICRO_BATCH_MAX = int(os.getenv("MICRO_BATCH_MAX", "64"))
+batcher = MicroBatcher(_score, MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX) if MICRO_BATCH_WINDOW_MS > 0 else None
+
+
+def _executor_collector(key: str, name: str):
+    def collect():
+        yield name, {"kind": executor.kind}, executor.status()[key]
+    return collect
+
+
+def _micro_batch_collector(attr: str, name: str, scale: float = 1.0):
+    def collect():
+        if batcher is not None:
+            yield from histogram_samples(name, getattr(batcher, attr), scale=scale)
+    return collect
+
+
+for _key, _kind, _help in [
+    ("in_flight", "gauge", "Scoring calls running or queued on the inference executor"),
+    ("peak_in_flight", "gauge", "Most scoring calls ever in flight at once"),
+    ("completed", "counter", "Scoring calls that finished"),
+    ("failed", "counter", "Scoring calls that raised"),
+    ("rejected", "counter", "Scoring calls shed with a 503 because the executor was full"),
+]:
+    _name = f"risk_executor_{_key}" + ("_total" if _kind == "counter" else "")
+    METRICS.callback(f"risk_executor_{_key}", _help, _executor_collector(_key, _name), kind=_kind)
+METRICS.callback("risk_micro_batch_size", "Patients per micro-batch",
+                 _micro_batch_collector("batch_sizes", "risk_micro_batch_size"), kind="histogram")
+# the batcher records milliseconds; exported in seconds per Prometheus convention
+METRICS.callback("risk_micro_batch_queue_delay_seconds", "Time a request waited for its micro-batch",
+                 _micro_batch_collector("queue_delay_ms", "risk_micro_batch_queue_delay_seconds", 1e-3),
+                 kind="histogram")
 
 
 # ------------------------
@@ -204,69 +278,135 @@ def predict_diab_model(payload: PatientIn):
 # ------------------------
 @app.get("/health")
 async def health():
+    # reports load state only; never triggers a load (or an import of numpy/sklearn)
+    scoring = _scoring_module  # not sys.modules: a prewarm thread may be half-way through importing it
+    not_loaded = {"engine": None, "model_version": None, "models": {}, "features": {}, "prediction_cache": {}}
     return {
         "status": "ok",
-        "models": {
-            "cardio_model": bool(_cardio_model),
-            "cardio_scaler": bool(_cardio_scaler),
-            "diab_model": bool(_diab_model),
-            "diab_scaler": bool(_diab_scaler),
-        },
+        "startup_mode": STARTUP_MODE,
+        # with INFERENCE_EXECUTOR=process scoring loads in the workers; this is the API process's view
+        "scoring_loaded": scoring is not None,
+        **(scoring.health() if scoring else not_loaded),
+        "executor": executor.status(),
+        "micro_batch": batcher.status() if batcher else None,
     }
 
 
-@app.post("/api/patient/add")
-def add_patient(payload: PatientIn, authorization: Optional[str] = Header(None)):
+@app.get("/metrics")
+def metrics():
+    # Prometheus text exposition format
+    return Response(METRICS.render(), media_type=CONTENT_TYPE)
+
+
+# The scoring endpoints take the parsed JSON as is and decode it with decode_patient (a
+# compiled fast path that falls back to PatientIn), so the schema is documented here.
+_PATIENT_BODY = {"requestBody": {"required": True,
+                                 "content": {"application/json": {"schema": PatientIn.model_json_schema()}}}}
+
+
+@app.post("/api/patient/add", openapi_extra=_PATIENT_BODY)
+async def add_patient(record: Any = Body(...), authorization: Optional[str] = Header(None)):
+    """
+    Score one patient: {"risk": {<disease>: {"probabilities", "interpretation", "source"}}, "model_version"}.
+    "source" is "model", or "heuristic" where the model is unavailable and a rule-of-thumb score
+    stands in; a disease with neither is left out of "risk". cardio "High" is the probability
+    of the high-risk class and "Low" its complement (low or moderate risk).
+    """
     # (Optional) quick token check – make it strict later
     if authorization is None or not authorization.startswith("Bearer "):
         # Keep 200 if you want to avoid frontend errors; or enforce 401:
         # raise HTTPException(status_code=401, detail="Missing/invalid token")
         pass
 
-    # First, try model-based predictions
-    cardio_probs = predict_cardio_model(payload)
-    diab_probs = predict_diab_model(payload)
-
-    # If model(s) missing or failed, fall back to the existing heuristic
-    if cardio_probs is None:
-        sbp = payload.sbp or 120
-        ldl = payload.ldl or 2.5
-        smoker = 1.0 if payload.smoker == "1" else 0.0
-        dm = 1.0 if payload.dm == "1" else 0.0
-        age = payload.age or 40.0
-        bmi = payload.bmi or 25.0
-
-        raw_cardio = 0.003 * (sbp - 120) + 0.04 * (ldl - 3.0) + 0.1 * smoker + 0.08 * dm + 0.002 * (age - 40) + 0.003 * (bmi - 25)
-        p_cardio_high = _soft_prob(0.05 + raw_cardio)
-        p_cardio_low = _soft_prob(1.0 - p_cardio_high)
-        cardio_probs = {"High": p_cardio_high, "Low": p_cardio_low}
-
-    if diab_probs is None:
-        hba1c = payload.hba1c or 5.5
-        glucose = payload.glucose or 5.2
-        fam = 1.0 if payload.fam_cad == "1" else 0.0
-        bmi = payload.bmi or 25.0
-        raw_dm = 0.08 * (hba1c - 5.5) + 0.03 * (glucose - 5.0) + 0.02 * (bmi - 25) + 0.05 * fam
-        p_dm_yes = _soft_prob(0.05 + raw_dm)
-        p_dm_no = _soft_prob(1.0 - p_dm_yes)
-        diab_probs = {"Yes": p_dm_yes, "No": p_dm_no}
-
-    cardio_block = {
-        "probabilities": cardio_probs,
-        "interpretation": _interpret_cardio(cardio_probs.get("High") or cardio_probs.get("high") or 0.0),
-    }
-    diabetes_block = {
-        "probabilities": diab_probs,
-        "interpretation": _interpret_diabetes(diab_probs.get("Yes") or diab_probs.get("yes") or 0.0),
-    }
+    t0 = time.perf_counter()
+    try:
+        # FastAPI validates body models with from_attributes; so does this, for identical errors
+        row = decode_patient(record, from_attributes=True)
+    except ValidationError as e:
+        # the 422 FastAPI gives for an invalid PatientIn body
+        errors = [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        raise RequestValidationError(errors, body=record)
+    finally:
+        STAGE_SECONDS.observe_since(t0, "validate")
+    if batcher is not None:
+        return await batcher.submit(row)
+    return (await _score([row]))[0]
+
+
+@app.post("/api/patients/score")
+async def score_patients(request: Request, authorization: Optional[str] = Header(None)):
+    """
+    Batch scoring: accepts a JSON array of patients (or {"patients": [...]}) or NDJSON
+    (Content-Type: application/x-ndjson). Valid rows are scored together with a single
+    transform + predict_proba call per model; invalid rows get a per-row error.
+    Results come back in input order, each tagged with its input index.
+    """
+    body = await request.body()
+    t0 = time.perf_counter()
+    records = _parse_batch_body(body, request.headers.get("content-type", ""))
+    t0 = STAGE_SECONDS.observe_since(t0, "parse")
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    valid_idx: List[int] = []
+    rows: List[List[float]] = []
+    for i, rec in enumerate(records):
+        if isinstance(rec, Exception):
+            results[i] = {"index": i, "error": f"Invalid JSON: {rec}"}
+            continue
+        try:
+            rows.append(decode_patient(rec))
+            valid_idx.append(i)
+        except ValidationError as e:
+            results[i] = {"index": i, "error": e.errors(include_url=False, include_context=False)}
+    STAGE_SECONDS.observe_since(t0, "validate")
+
+    scored = await _score(rows)
+    for i, res in zip(valid_idx, scored):
+        results[i] = {"index": i, **res}
 
     return {
-        "risk": {
-            "cardio": cardio_block,
-            "diabetes": diabetes_block,
-        }
+        "count": len(results),
+        "errors": len(results) - len(valid_idx),
+        "results": results,
     }
-    
+
+
+@app.post("/admin/models/reload")
+async def reload_models(request: Request, authorization: Optional[str] = Header(None)):
+    """
+    Load a new artifact set in the background, check it on canary payloads and swap it in;
+    requests already being scored finish on the previous set. Optional JSON body:
+      {"version": "<subdirectory of models/>", "canary": [patients], "force": false}
+    Without "version" the active directory is reloaded (e.g. after replacing a .joblib in place).
+    A candidate that loses a model, returns invalid probabilities or moves a canary probability
+    by more than RELOAD_MAX_CHANGE is refused with 409 unless "force" is set.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if authorization is None or not hmac.compare_digest(authorization, f"Bearer {ADMIN_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Missing/invalid admin token")
+    body = await request.body()
+    try:
+        opts = json.loads(body) if body.strip() else {}
+        canary = [PatientIn.model_validate(p) for p in opts.get("canary") or []] or None
+    except (ValueError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid reload request: {e}")
+
+    scoring = _scoring()
+    models_dir = None
+    if opts.get("version"):
+        # only versioned sets inside the models directory can be loaded
+        models_dir = (scoring.MODELS_DIR / str(opts["version"])).resolve()
+        if scoring.MODELS_DIR not in models_dir.parents or not models_dir.is_dir():
+            raise HTTPException(status_code=404, detail=f"No artifact set {opts['version']!r} under models/")
+    try:
+        return await asyncio.to_thread(_reload, models_dir, canary, bool(opts.get("force")))
+    except scoring.ReloadRejected as e:
+        raise HTTPException(status_code=409, detail={"rejected": e.problems, "active": scoring.active().version})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+
+
 @app.post("/debug/model-info")
 def model_info(payload: PatientIn):
     """
@@ -276,44 +416,6 @@ def model_info(payload: PatientIn):
       - the raw probability vector (e.g. [prob_class0, prob_class1]) so you know
         which index is the positive class.
     """
-    info = {}
-    try:
-        # Model metadata
-        if _cardio_model is not None:
-            info["cardio_meta"] = {
-                "classes": getattr(_cardio_model, "classes_", None),
-                "n_features_in": getattr(_cardio_model, "n_features_in_", None),
-            }
-        else:
-            info["cardio_meta"] = None
-
-        if _diab_model is not None:
-            info["diab_meta"] = {
-                "classes": getattr(_diab_model, "classes_", None),
-                "n_features_in": getattr(_diab_model, "n_features_in_", None),
-            }
-        else:
-            info["diab_meta"] = None
-
-        # Raw predict_proba outputs (if model present)
-        try:
-            fv_cardio = _build_feature_vector(payload, FEATURE_ORDER_CARDIO, {"age":40,"sbp":120,"ldl":3.0,"smoker":0,"dm":0,"bmi":25})
-            if _cardio_scaler is not None:
-                fv_cardio = _cardio_scaler.transform(fv_cardio)
-            info["cardio_proba_raw"] = _cardio_model.predict_proba(fv_cardio).tolist() if _cardio_model is not None else None
-        except Exception as e:
-            info["cardio_proba_error"] = str(e)
-
-        try:
-            fv_diab = _build_feature_vector(payload, FEATURE_ORDER_DIAB, {"age":40,"hba1c":5.5,"glucose":5.2,"bmi":25,"fam_cad":0})
-            if _diab_scaler is not None:
-                fv_diab = _diab_scaler.transform(fv_diab)
-            info["diab_proba_raw"] = _diab_model.predict_proba(fv_diab).tolist() if _diab_model is not None else None
-        except Exception as e:
-            info["diab_proba_error"] = str(e)
-
-    except Exception as e:
-        return {"error": str(e)}
-    return info
+    return _scoring().model_info(payload)
 
 # uvicorn src.fastapi_app:app --host 0.0.0.0 --port 8000 --reload
@@ -0,0 +1,198 @@
+# models-api/src/feature_store.py
+"""
+Persistent columnar cache of extracted bundle features.
+
+Every row is keyed by bundle path plus (mtime_ns, size); a rerun only re-extracts
+bundles that are new or changed and takes everything else from the cache. Values are
+kept as float64 (NaN for None) with a per-cell kind code, so to_frame() rebuilds the
+exact dtypes pd.DataFrame(list_of_dicts) would have given (all-int columns stay int64,
+all-None columns stay object). The cache is one uncompressed .npz next to the CSV.
+
+Extraction fills a ColumnBuffer row by row (no per-patient dict), then hands the
+finished columns over as a RecordBatch.
+"""
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+KIND_NONE, KIND_INT, KIND_FLOAT = 0, 1, 2
+
+# (values, kinds): both shaped (n_columns, n_rows); values float64 with NaN for None, kinds int8
+RecordBatch = Tuple[np.ndarray, np.ndarray]
+
+
+def file_stamp(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def pack_rows(rows: List[Dict[str, Any]], columns: Sequence[str]) -> RecordBatch:
+    """Column-major float64 values + kind codes for a list of feature dicts."""
+    values = np.full((len(columns), len(rows)), np.nan)
+    kinds = np.zeros((len(columns), len(rows)), dtype=np.int8)
+    for j, row in enumerate(rows):
+        for i, col in enumerate(columns):
+            v = row[col]
+            if v is not None:
+                values[i, j] = float(v)
+                kinds[i, j] = KIND_INT if type(v) is int else KIND_FLOAT
+    return values, kinds
+
+
+class ColumnBuffer:
+    """
+    Preallocated, growable columns with a fixed slot layout. Nullable columns (measurements,
+    age, gender) are float64 with NaN for None plus a kind code per cell, so ints and floats
+    keep their identity; flag and label columns are int8. Capacity doubles when full, and
+    columns() returns views of the filled part without copying.
+    """
+
+    def __init__(self, nullable: Sequence[str], flags: Sequence[str], capacity: int = 64):
+        self.nullable = list(nullable)
+        self.flags = list(flags)
+        self.slot = {c: i for i, c in enumerate(self.nullable)}
+        self.flag_slot = {c: i for i, c in enumerate(self.flags)}
+        capacity = max(1, capacity)
+        self.values = np.full((len(self.nullable), capacity), np.nan)
+        self.kinds = np.zeros((len(self.nullable), capacity), dtype=np.int8)
+        self.flag_values = np.zeros((len(self.flags), capacity), dtype=np.int8)
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _grow(self) -> None:
+        capacity = self.values.shape[1] * 2
+        values = np.full((len(self.nullable), capacity), np.nan)
+        kinds = np.zeros((len(self.nullable), capacity), dtype=np.int8)
+        flag_values = np.zeros((len(self.flags), capacity), dtype=np.int8)
+        values[:, :self.n], kinds[:, :self.n], flag_values[:, :self.n] = self.column_blocks()
+        self.values, self.kinds, self.flag_values = values, kinds, flag_values
+
+    def append(self, nullable_row: Sequence[Any], flag_row: Sequence[int]) -> int:
+        """Write one row: values in `nullable` slot order (None for missing), then ints in `flags` order."""
+        if self.n == self.values.shape[1]:
+            self._grow()
+        row = self.n
+        values, kinds = self.values, self.kinds
+        for slot, v in enumerate(nullable_row):
+            if v is not None:
+                values[slot, row] = v
+                kinds[slot, row] = KIND_INT if type(v) is int else KIND_FLOAT
+        self.flag_values[:, row] = flag_row
+        self.n += 1
+        return row
+
+    def column_blocks(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(values, kinds, flag_values) of the filled rows (views)."""
+        return self.values[:, :self.n], self.kinds[:, :self.n], self.flag_values[:, :self.n]
+
+    def column(self, name: str) -> np.ndarray:
+        """View of one filled column: float64 with NaN for None, or int8 for flags."""
+        if name in self.flag_slot:
+            return self.flag_values[self.flag_slot[name], :self.n]
+        return self.values[self.slot[name], :self.n]
+
+    def record_batch(self, columns: Sequence[str]) -> RecordBatch:
+        """The FeatureStore layout for `columns` (flags become KIND_INT cells)."""
+        values = np.empty((len(columns), self.n))
+        kinds = np.empty((len(columns), self.n), dtype=np.int8)
+        for i, col in enumerate(columns):
+            if col in self.flag_slot:
+                values[i] = self.flag_values[self.flag_slot[col], :self.n]
+                kinds[i] = KIND_INT
+            else:
+                values[i] = self.values[self.slot[col], :self.n]
+                kinds[i] = self.kinds[self.slot[col], :self.n]
+        return values, kinds
+
+    def row_dict(self, row: int, columns: Sequence[str]) -> Dict[str, Any]:
+        """One row back as Python values (int, float or None), as a per-patient dict used to hold them."""
+        out: Dict[str, Any] = {}
+        for col in columns:
+            if col in self.flag_slot:
+                out[col] = int(self.flag_values[self.flag_slot[col], row])
+                continue
+            slot = self.slot[col]
+            kind = self.kinds[slot, row]
+            v = self.values[slot, row]
+            out[col] = None if kind == KIND_NONE else int(v) if kind == KIND_INT else float(v)
+        return out
+
+
+class FeatureStore:
+    def __init__(self, columns: Sequence[str], fingerprint: str = "", paths: Optional[Sequence[str]] = None,
+                 stamps: Optional[np.ndarray] = None, values: Optional[np.ndarray] = None,
+                 kinds: Optional[np.ndarray] = None):
+        self.columns = list(columns)
+        # describes how the features were extracted; a cache with a different one is discarded
+        self.fingerprint = fingerprint
+        self.paths = list(paths or [])
+        n = len(self.paths)
+        self.stamps = np.zeros((n, 2), dtype=np.int64) if stamps is None else np.asarray(stamps, dtype=np.int64)
+        self.values = np.full((len(self.columns), n), np.nan) if values is None else values
+        self.kinds = np.zeros((len(self.columns), n), dtype=np.int8) if kinds is None else kinds
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    @classmethod
+    def load(cls, path: str, columns: Sequence[str], fingerprint: str) -> "FeatureStore":
+        """Cached store at `path`, or an empty one if it is missing, unreadable or stale."""
+        empty = cls(columns, fingerprint)
+        if not os.path.exists(path):
+            return empty
+        try:
+            with np.load(path) as z:
+                if list(z["columns"]) != list(columns) or str(z["fingerprint"]) != fingerprint:
+                    return empty
+                return cls(columns, fingerprint, z["paths"].tolist(), z["stamps"], z["values"], z["kinds"])
+        except (OSError, ValueError, KeyError):
+            return empty
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, columns=np.asarray(self.columns), fingerprint=np.asarray(self.fingerprint),
+                     paths=np.asarray(self.paths, dtype=str), stamps=self.stamps, values=self.values, kinds=self.kinds)
+        os.replace(tmp, path)
+
+    def lookup(self, paths: Sequence[str], stamps: np.ndarray) -> np.ndarray:
+        """Cached row index for each (path, stamp), -1 where the bundle is new or changed."""
+        index = {p: i for i, p in enumerate(self.paths)}
+        rows = np.array([index.get(p, -1) for p in paths], dtype=np.int64)
+        hit = rows >= 0
+        hit[hit] = (self.stamps[rows[hit]] == stamps[hit]).all(axis=1)
+        return np.where(hit, rows, -1)
+
+    def rebuild(self, paths: Sequence[str], stamps: np.ndarray, cached_rows: np.ndarray,
+                fresh: RecordBatch) -> "FeatureStore":
+        """Store for `paths`: rows with cached_rows >= 0 come from this store, the rest from `fresh` in order."""
+        hit = cached_rows >= 0
+        values = np.empty((len(self.columns), len(paths)))
+        kinds = np.empty((len(self.columns), len(paths)), dtype=np.int8)
+        values[:, hit], kinds[:, hit] = self.values[:, cached_rows[hit]], self.kinds[:, cached_rows[hit]]
+        values[:, ~hit], kinds[:, ~hit] = fresh
+        return FeatureStore(self.columns, self.fingerprint, paths, stamps, values, kinds)
+
+    def medians(self) -> Dict[str, float]:
+        """Per-column median over non-missing values (what DataFrame.median() gives)."""
+        out = {}
+        for col, v, k in zip(self.columns, self.values, self.kinds):
+            present = v[k != KIND_NONE]
+            out[col] = float(np.median(present)) if len(present) else np.nan
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame over the stored columns; float columns are views (pandas copies on first write)."""
+        cols = {}
+        for col, v, k in zip(self.columns, self.values, self.kinds):
+            if not (k != KIND_NONE).any():
+                cols[col] = np.full(len(self), None, dtype=object)
+            elif (k == KIND_INT).all():
+                cols[col] = v.astype(np.int64)
+            else:
+                cols[col] = v
+        return pd.DataFrame(cols, columns=self.columns, copy=False)
@@ -0,0 +1,231 @@
+# models-api/src/forest_engine.py
+"""
+Flat, array-based inference for fitted sklearn random forests.
+
+A forest (plus the StandardScaler it was trained behind) is compiled into a
+structure-of-arrays form: every tree's nodes are concatenated into contiguous
+feature / threshold / child / value arrays (right child = left child + 1), and the scaler is folded into
+the split thresholds so raw (unscaled) features can be fed in directly.
+Prediction walks all trees for all rows at once, one vectorized step per level.
+"""
+import struct
+import zipfile
+from typing import Dict, Optional
+
+import numpy as np
+
+# rows x trees node-index block processed per step; keeps the walk's scratch arrays cache-sized
+_MAX_CELLS = 1 << 16
+
+
+def _float32_split_thresholds(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Fold a StandardScaler into tree thresholds exactly.
+
+    sklearn scales in float64, casts to float32 and then tests ``x32 <= t``. That map is monotone in
+    the raw value, so for every split we bisect (over float64) for the largest raw x that still goes
+    left; ``x_raw <= T`` then reproduces sklearn's decision bit for bit, including float32 rounding.
+    """
+    def goes_left(x):
+        return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    guess = threshold * scale + mean
+    pad = (np.abs(threshold) * 2.0 ** -20 + 2.0 ** -126) * scale + np.abs(guess) * 2.0 ** -40
+    lo, hi = guess - pad, guess + pad
+    while True:
+        bad_lo = ~goes_left(lo)
+        bad_hi = goes_left(hi)
+        if not (bad_lo.any() or bad_hi.any()):
+            break
+        lo = np.where(bad_lo, lo - 2 * (hi - lo), lo)
+        hi = np.where(bad_hi, hi + 2 * (hi - lo), hi)
+    for _ in range(200):
+        mid = lo + (hi - lo) / 2
+        done = (mid <= lo) | (mid >= hi)
+        if done.all():
+            break
+        left = goes_left(mid)
+        lo = np.where(~done & left, mid, lo)
+        hi = np.where(~done & ~left, mid, hi)
+    return lo
+
+
+def _pair_children(children_left: np.ndarray, children_right: np.ndarray) -> np.ndarray:
+    """Breadth-first renumbering that stores each node's two children next to each other."""
+    order = [0]
+    for node in order:
+        if children_left[node] >= 0:
+            order.append(children_left[node])
+            order.append(children_right[node])
+    return np.asarray(order)
+
+
+def mmap_npz(path) -> Dict[str, np.ndarray]:
+    """
+    Memory-map each member of an uncompressed .npz (np.load ignores mmap_mode for archives).
+    Pages are then shared through the OS page cache by every process that maps the file.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            name = info.filename[:-len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(zf.open(info))
+                continue
+            # local file header: 30 fixed bytes, then file name and extra field
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject or not shape or 0 in shape:
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                arrays[name] = np.lib.format.read_array(f)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                     order="F" if fortran else "C")
+    return arrays
+
+
+class CompiledForest:
+    """
+    Structure-of-arrays forest. Node ``i`` tests ``X[:, feature[i]] <= threshold[i]`` and moves to
+    ``child[i]`` (left) or ``child[i] + 1`` (right); leaves point at themselves with an infinite
+    threshold, so a settled cell is one whose next step does not move. ``value`` holds per-node class
+    probabilities and ``roots`` the first node of each tree.
+    """
+
+    _ARRAYS = ("feature", "threshold", "child", "value", "roots", "classes")
+
+    def __init__(self, feature, threshold, child, value, roots, max_depth, n_features, classes, extra=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.child = np.ascontiguousarray(child, dtype=np.int32)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.classes = np.asarray(classes)
+        # caller-owned arrays stored alongside the forest (e.g. source stamps)
+        self.extra: Dict[str, np.ndarray] = dict(extra or {})
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.child, self.value, self.roots))
+
+    @property
+    def mmapped(self) -> bool:
+        return isinstance(self.threshold, np.memmap) or isinstance(self.threshold.base, np.memmap)
+
+    def save(self, path) -> None:
+        """Write an uncompressed .npz so load() can memory-map every member."""
+        arrays = {name: getattr(self, name) for name in self._ARRAYS}
+        arrays["max_depth"] = np.asarray(self.max_depth)
+        arrays["n_features"] = np.asarray(self.n_features)
+        arrays.update({f"extra_{k}": v for k, v in self.extra.items()})
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> "CompiledForest":
+        arrays = mmap_npz(path) if mmap else dict(np.load(path))
+        extra = {k[len("extra_"):]: v for k, v in arrays.items() if k.startswith("extra_")}
+        return cls(
+            **{name: arrays[name] for name in cls._ARRAYS},
+            max_depth=int(arrays["max_depth"]),
+            n_features=int(arrays["n_features"]),
+            extra=extra,
+        )
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None) -> "CompiledForest":
+        """Compile a fitted RandomForestClassifier, folding an optional StandardScaler into the thresholds."""
+        n_features = int(model.n_features_in_)
+        mean = np.zeros(n_features)
+        scale = np.ones(n_features)
+        if scaler is not None:
+            if int(scaler.n_features_in_) != n_features:
+                raise ValueError(f"Scaler expects {scaler.n_features_in_} features, model expects {n_features}")
+            if getattr(scaler, "mean_", None) is not None:
+                mean = np.asarray(scaler.mean_, dtype=np.float64)
+            if getattr(scaler, "scale_", None) is not None:
+                scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset, max_depth = 0, 0
+        for est in model.estimators_:
+            tree = est.tree_
+            order = _pair_children(tree.children_left, tree.children_right)
+            new_id = np.empty_like(order)
+            new_id[order] = np.arange(len(order))
+
+            is_leaf = tree.children_left[order] < 0
+            feat = np.where(is_leaf, 0, tree.feature[order])
+            thr = np.full(len(order), np.inf)
+            thr[~is_leaf] = _float32_split_thresholds(
+                tree.threshold[order][~is_leaf], mean[feat[~is_leaf]], scale[feat[~is_leaf]]
+            )
+            child = np.where(is_leaf, np.arange(len(order)), new_id[np.maximum(tree.children_left[order], 0)])
+
+            val = tree.value[order, 0, :].astype(np.float64)
+            totals = val.sum(axis=1, keepdims=True)
+            val = np.divide(val, totals, out=np.zeros_like(val), where=totals > 0)
+
+            features.append(feat)
+            thresholds.append(thr)
+            children.append(child + offset)
+            values.append(val)
+            roots.append(offset)
+            offset += len(order)
+            max_depth = max(max_depth, int(tree.max_depth))
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            child=np.concatenate(children),
+            value=np.concatenate(values),
+            roots=np.asarray(roots),
+            max_depth=max_depth,
+            n_features=n_features,
+            classes=model.classes_,
+        )
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf index per (row, tree). Cells that reached a leaf drop out of the walk."""
+        n_rows = X.shape[0]
+        flat = X.ravel()
+        base = np.repeat(np.arange(n_rows, dtype=np.int32) * self.n_features, self.n_trees)
+        nodes = np.tile(self.roots, n_rows)
+        leaves = np.empty_like(nodes)
+        cells = np.arange(len(nodes))
+        for _ in range(self.max_depth):
+            nxt = self.child[nodes] + (flat[base + self.feature[nodes]] > self.threshold[nodes])
+            settled = nxt == nodes
+            if settled.any():
+                leaves[cells[settled]] = nodes[settled]
+                active = ~settled
+                cells, nodes, base = cells[active], nxt[active], base[active]
+                if not len(nodes):
+                    break
+            else:
+                nodes = nxt
+        leaves[cells] = nodes
+        return leaves.reshape(n_rows, self.n_trees)
+
+    def predict_proba(self, X: np.ndarray, chunk_rows: Optional[int] = None) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X has shape {X.shape}, compiled forest expects {self.n_features} features")
+        chunk_rows = chunk_rows or max(1, _MAX_CELLS // max(1, self.n_trees))
+        out = np.empty((X.shape[0], self.value.shape[1]))
+        for start in range(0, X.shape[0], chunk_rows):
+            leaves = self._leaves(X[start:start + chunk_rows])
+            out[start:start + chunk_rows] = self.value[leaves].mean(axis=1)
+        return out
@@ -0,0 +1,121 @@
+# models-api/src/inference_executor.py
+"""
+Dedicated, bounded pool for CPU-bound scoring.
+
+Endpoints await InferenceExecutor.run() instead of running sklearn/NumPy on Starlette's
+shared threadpool. At most `workers` calls execute at once and at most `max_queue` more
+wait; beyond that run() raises Overloaded immediately so the API can shed load with a
+503 instead of letting latency grow without bound.
+
+kind="thread" runs calls on a private thread pool (forest inference is NumPy/Cython
+and releases the GIL for most of its time). kind="process" runs them in spawned worker
+processes, each of which runs `initializer(*initargs)` once (e.g. to preload models);
+compiled forests are memory-mapped, so workers share one copy through the OS page cache.
+restart() replaces the pool (e.g. after a model reload) while calls already running on
+the old one finish there.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class Overloaded(Exception):
+    """Every worker is busy and the wait queue is full."""
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+class InferenceExecutor:
+    def __init__(self, kind: str = "thread", workers: Optional[int] = None, max_queue: int = 64,
+                 initializer: Optional[Callable[..., Any]] = None, initargs: tuple = ()):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind {kind!r}; expected 'thread' or 'process'")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        # only touched from the event loop thread
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = self.failed = self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            # spawn: forking a process that runs an event loop and threads is unsafe
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=self.initializer,
+                            initargs=self.initargs,
+                        )
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        return self._pool
+
+    def start(self) -> None:
+        """Create the pool now; process workers are started (and run the initializer) up front."""
+        pool = self._get_pool()
+        if self.kind == "process":
+            for f in [pool.submit(_noop) for _ in range(self.workers)]:
+                f.result()
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise Overloaded(f"{self.in_flight} scoring calls in flight (capacity {self.capacity})")
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._get_pool(), functools.partial(fn, *args))
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return result
+
+    def restart(self, initargs: Optional[tuple] = None) -> None:
+        """Start a fresh pool (process workers rerun the initializer, with `initargs` if given); the old pool drains."""
+        with self._lock:
+            old, self._pool = self._pool, None
+            if initargs is not None:
+                self.initargs = initargs
+        if old is not None:
+            old.shutdown(wait=False)
+        if self.kind == "process":
+            self.start()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
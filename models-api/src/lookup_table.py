@@ -0,0 +1,146 @@
+# models-api/src/lookup_table.py
+"""
+Precomputed P(positive) tables for the inputs most requests actually send.
+
+Requests often supply a handful of fields and leave the rest to imputation, so their
+model inputs fall on a small set of points. A LookupTable holds a model's output over a
+grid of a few of its features (DiseaseSpec.lookup_grid: first, last, step, at clinical
+resolution), each axis with one extra slot for "missing" (the imputed value itself),
+with every other feature at its imputed value. It is an exact memo of the model, not an
+approximation: a row is answered from the table only when all its non-grid features are
+missing and each grid feature is missing or sits on a grid point (within float
+tolerance), so a hit reads the value the model returns for that very input. Nothing is
+rounded or interpolated; any other row is not a hit and goes to the model.
+
+NumPy only; training writes <model>.lookup.npz next to the forest for the diseases named
+in LOOKUP_TABLES, uncompressed, and the API memory-maps it like the forest export, so
+processes share its pages instead of each reading the table in.
+"""
+import hashlib
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from forest_engine import mmap_npz
+
+Predict = Callable[[np.ndarray], np.ndarray]  # model-column matrix -> P(positive) per row
+
+# |value - grid point| allowed for a hit, in steps: float noise only (4.1 vs 4.0 + 0.1)
+ON_GRID_TOLERANCE = 1e-9
+
+
+def file_sha1(path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LookupTable:
+    def __init__(self, columns: Sequence[str], grid_columns: Sequence[str], starts, steps, counts, fill,
+                 table: np.ndarray, meta: Optional[Dict[str, Any]] = None):
+        self.columns = list(columns)
+        self.grid_columns = list(grid_columns)
+        self.starts = np.asarray(starts, dtype=float)
+        self.steps = np.asarray(steps, dtype=float)
+        self.counts = np.asarray(counts, dtype=np.intp)   # grid points per axis; index counts[k] = missing
+        self.fill = np.asarray(fill, dtype=float)
+        self.table = np.asarray(table, dtype=float)
+        self.meta: Dict[str, Any] = dict(meta or {})
+        self.grid_index = np.array([self.columns.index(c) for c in self.grid_columns], dtype=np.intp)
+        self.other_index = np.array([i for i, c in enumerate(self.columns) if c not in self.grid_columns],
+                                    dtype=np.intp)
+
+    # ---- building ----
+    @staticmethod
+    def axis_points(first: float, last: float, step: float) -> np.ndarray:
+        # rounded so a point equals the decimal a request sends (4.1, not 4.1000000000000005)
+        return np.round(first + step * np.arange(int(round((last - first) / step)) + 1), 9)
+
+    @classmethod
+    def build(cls, columns: Sequence[str], fill: Sequence[float], grid: Mapping[str, Tuple[float, float, float]],
+              predict: Predict, meta: Optional[Dict[str, Any]] = None, chunk: int = 65536) -> "LookupTable":
+        """Evaluate `predict` on every grid point (missing slots take the fill value)."""
+        columns, fill = list(columns), np.asarray(fill, dtype=float)
+        grid_columns = [c for c in grid if c in columns]
+        axes = []
+        for c in grid_columns:
+            axes.append(np.append(cls.axis_points(*grid[c]), fill[columns.index(c)]))
+        shape = tuple(len(a) for a in axes)
+        table = np.empty(int(np.prod(shape)))
+        for lo in range(0, len(table), chunk):
+            flat = np.arange(lo, min(lo + chunk, len(table)))
+            X = np.tile(fill, (len(flat), 1))
+            for k, idx in enumerate(np.unravel_index(flat, shape)):
+                X[:, columns.index(grid_columns[k])] = axes[k][idx]
+            table[lo:lo + len(flat)] = predict(X)
+        starts = [grid[c][0] for c in grid_columns]
+        steps = [grid[c][2] for c in grid_columns]
+        return cls(columns, grid_columns, starts, steps, [n - 1 for n in shape], fill, table.reshape(shape), meta)
+
+    def points(self, k: int) -> np.ndarray:
+        return self.axis_points(self.starts[k], self.starts[k] + self.steps[k] * (self.counts[k] - 1), self.steps[k])
+
+    def sample_inputs(self, n: int, rng: np.random.Generator, missing: float = 0.3,
+                      off_grid: float = 0.0) -> np.ndarray:
+        """
+        Random model inputs (NaN = missing) with every non-grid feature missing: each grid
+        feature is missing, on a random grid point or, with probability off_grid, moved
+        off it by up to half a step.
+        """
+        X = np.full((n, len(self.columns)), np.nan)
+        for k, col in enumerate(self.grid_index):
+            values = self.points(k)[rng.integers(0, self.counts[k], n)]
+            shift = rng.uniform(-0.5, 0.5, n) * self.steps[k]
+            values = np.where(rng.random(n) < off_grid, values + shift, values)
+            X[:, col] = np.where(rng.random(n) < missing, np.nan, values)
+        return X
+
+    # ---- serving ----
+    def lookup(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (hit mask, P(positive)) for a model-column matrix with NaN for missing values;
+        p is NaN where the row is not a hit.
+        """
+        other = X[:, self.other_index]
+        hit = (np.isnan(other) | (other == self.fill[self.other_index])).all(axis=1)
+        G = X[:, self.grid_index]
+        missing = np.isnan(G)
+        at = (G - self.starts) / self.steps  # position in steps from the first grid point
+        q = np.rint(at)  # NaN where missing (NaN compares False below)
+        on_grid = (np.abs(at - q) <= ON_GRID_TOLERANCE) & (q >= 0) & (q < self.counts)
+        hit &= (on_grid | missing).all(axis=1)
+        idx = np.where(missing, self.counts, q)
+        idx[~hit] = 0
+        p = self.table[tuple(idx.astype(np.intp).T)]
+        p[~hit] = np.nan
+        return hit, p
+
+    def status(self) -> Dict[str, Any]:
+        return {"grid": self.grid_columns, "cells": int(self.table.size), "mmapped": self.mmapped}
+
+    @property
+    def mmapped(self) -> bool:
+        return isinstance(self.table, np.memmap) or isinstance(self.table.base, np.memmap)
+
+    # ---- persistence ----
+    def save(self, path) -> None:
+        """Write an uncompressed .npz so load() can memory-map the table."""
+        with open(path, "wb") as f:
+            np.savez(f, columns=np.asarray(self.columns), grid_columns=np.asarray(self.grid_columns),
+                     starts=self.starts, steps=self.steps, counts=self.counts, fill=self.fill, table=self.table,
+                     forest_sha1=np.asarray(self.meta.get("forest_sha1", "")),
+                     positive_classes=np.asarray(self.meta.get("positive_classes", []), dtype=np.int64))
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> "LookupTable":
+        z = mmap_npz(path) if mmap else dict(np.load(path))
+        meta = {"forest_sha1": str(z["forest_sha1"]),
+                "positive_classes": z["positive_classes"].tolist() if "positive_classes" in z else None}
+        return cls(z["columns"].tolist(), z["grid_columns"].tolist(), z["starts"], z["steps"], z["counts"],
+                   z["fill"], z["table"], meta)
+
+    def matches(self, columns: List[str], fill: np.ndarray) -> bool:
+        """Built for these model columns and imputation values (i.e. for the plan serving them)?"""
+        return self.columns == list(columns) and np.array_equal(self.fill, np.asarray(fill, dtype=float))
@@ -0,0 +1,252 @@
+# models-api/src/metrics.py
+"""
+Minimal Prometheus text-format metrics (no client library needed).
+
+Counters and histograms are label families whose children are created on first use.
+Each child keeps per-thread slots, so recording a sample costs a dict lookup, a
+thread-local read and a bisect, with no lock (a few hundred nanoseconds). Values that already live elsewhere
+(model load times, executor and batcher state) are exported through collect callbacks
+evaluated only when /metrics is scraped.
+"""
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 10 us .. 2.5 s, roughly x2.5 per step: scoring stages span microseconds to tens of milliseconds
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25,
+                   0.5, 1.0, 2.5)
+
+Sample = Tuple[str, Dict[str, str], float]  # (suffixed metric name, labels, value)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class _Sharded:
+    """
+    Per-thread slots, so the hot path takes no lock: each thread only ever writes its own
+    list, and readers sum across all of them (a scrape may miss an update in flight).
+    """
+
+    _width = 1
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._lock = threading.Lock()  # guards the shard list, taken once per thread
+
+    def _shard(self) -> list:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = [0] * self._width
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _totals(self) -> list:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(col) for col in zip(*shards)] if shards else [0] * self._width
+
+
+class Histogram(_Sharded):
+    """Cumulative-bucket histogram (counts of observations <= each bound)."""
+
+    def __init__(self, bounds: Sequence[float]):
+        super().__init__()
+        self.bounds = list(bounds)
+        self._width = len(self.bounds) + 2  # one slot per bucket, the +Inf bucket, then the sum
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        shard[bisect.bisect_left(self.bounds, value)] += 1
+        shard[-1] += value
+
+    @property
+    def total(self) -> float:
+        return self._totals()[-1]
+
+    @property
+    def n(self) -> int:
+        return sum(self._totals()[:-1])
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        running, out = 0, []
+        for bound, count in zip(self.bounds + [float("inf")], self._totals()[:-1]):
+            running += count
+            out.append((bound, running))
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        totals = self._totals()
+        cumulative = self.cumulative()
+        buckets = {"+Inf" if b == float("inf") else f"{b:g}": c for b, c in cumulative}
+        return {"count": cumulative[-1][1], "sum": round(totals[-1], 6), "buckets": buckets}
+
+
+class _Counter(_Sharded):
+    def inc(self, amount: float = 1.0) -> None:
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        # hot path: one dict lookup; the lock is only taken to create a child
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+
+class CounterFamily(_Family):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Counter()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self.labels(*label_values).inc(amount)
+
+    def samples(self) -> Iterable[Sample]:
+        for values, child in self._items():
+            yield f"{self.name}_total", dict(zip(self.label_names, values)), child.value
+
+
+class HistogramFamily(_Family):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return Histogram(self.buckets)
+
+    def observe(self, value: float, *label_values: str) -> None:
+        self.labels(*label_values).observe(value)
+
+    def observe_since(self, t0: float, *label_values: str) -> float:
+        """Record perf_counter() - t0 and return the new perf_counter() reading (for chaining stages)."""
+        now = time.perf_counter()
+        # Histogram.observe inlined: this runs several times per scored request
+        child = self._children.get(label_values) or self.labels(*label_values)
+        try:
+            shard = child._local.shard
+        except AttributeError:
+            shard = child._shard()
+        shard[bisect.bisect_left(child.bounds, now - t0)] += 1
+        shard[-1] += now - t0
+        return now
+
+    def samples(self) -> Iterable[Sample]:
+        for values, child in self._items():
+            labels = dict(zip(self.label_names, values))
+            yield from histogram_samples(self.name, child, labels)
+
+
+class CallbackFamily:
+    """Gauge-like family whose samples come from `collect()` at scrape time."""
+
+    def __init__(self, name: str, help_text: str, kind: str, collect: Callable[[], Iterable[Sample]]):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self) -> Iterable[Sample]:
+        return self.collect()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families: Dict[str, Any] = {}
+
+    def _add(self, family):
+        # get-or-create, so modules that share a family (e.g. the API and scoring.py) can both declare it
+        existing = self._families.get(family.name)
+        if existing is None:
+            self._families[family.name] = family
+            return family
+        if existing.kind != family.kind or getattr(existing, "label_names", None) != getattr(family, "label_names", None):
+            raise ValueError(f"Metric {family.name} already registered with a different type or labels")
+        return existing
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> CounterFamily:
+        return self._add(CounterFamily(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> HistogramFamily:
+        return self._add(HistogramFamily(name, help_text, label_names, buckets))
+
+    def callback(self, name: str, help_text: str, collect: Callable[[], Iterable[Sample]],
+                 kind: str = "gauge") -> CallbackFamily:
+        return self._add(CallbackFamily(name, help_text, kind, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in list(self._families.values()):
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def histogram_samples(name: str, hist: Histogram, labels: Optional[Dict[str, str]] = None,
+                      scale: float = 1.0) -> Iterable[Sample]:
+    """Samples for a Histogram, e.g. one owned by the micro-batcher, for a callback family.
+
+    `scale` converts the recorded unit (e.g. 1e-3 for milliseconds to seconds).
+    """
+    labels = labels or {}
+    cumulative = hist.cumulative()
+    for bound, count in cumulative:
+        yield f"{name}_bucket", dict(labels, le=_format_value(bound * scale)), count
+    yield f"{name}_sum", labels, hist.total * scale
+    yield f"{name}_count", labels, cumulative[-1][1]
+
+
+# process-wide registry that GET /metrics renders
+REGISTRY = MetricsRegistry()
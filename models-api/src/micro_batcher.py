@@ -0,0 +1,105 @@
+# models-api/src/micro_batcher.py
+"""
+Asyncio request coalescer for single-patient scoring.
+
+Concurrent submit() calls that arrive within `window_ms` of the first waiting one (or
+until `max_batch` are waiting) are handed to `process_batch` as one list, so each model
+runs once per batch instead of once per request. When nothing is waiting or being
+scored, a request is dispatched at once, so an idle service adds no window latency.
+Every caller gets its own result (or its own copy of the batch's exception) back through
+a future; if the batch task is cancelled, every waiting caller is cancelled with it.
+Batch sizes and the time requests spend waiting for their batch are recorded in
+histograms.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from metrics import Histogram
+
+
+def _copy_exception(e: BaseException) -> BaseException:
+    """Shallow copy of `e` (same type, args, attributes, cause and traceback so far) without calling __init__."""
+    try:
+        clone = type(e).__new__(type(e), *e.args)
+        clone.args = e.args
+        clone.__dict__.update(e.__dict__)
+    except Exception:
+        return e
+    clone.__cause__, clone.__context__ = e.__cause__, e.__context__
+    clone.__suppress_context__ = e.__suppress_context__
+    return clone.with_traceback(e.__traceback__)
+
+
+class MicroBatcher:
+    def __init__(self, process_batch: Callable[[List[Any]], Awaitable[List[Any]]], window_ms: float, max_batch: int):
+        self.process_batch = process_batch
+        self.window = window_ms / 1e3
+        self.max_batch = max(1, max_batch)
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.queue_delay_ms = Histogram([0.25, 0.5, 1, 2, 5, 10, 25, 50, 100])
+        self.batches = 0
+        self.running = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut, time.perf_counter()))
+        if len(self._pending) >= self.max_batch or (self.running == 0 and len(self._pending) == 1):
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if self._pending:
+            # more than max_batch arrived in one window: the rest start their own window now
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        if batch:
+            self.running += 1  # counted now, not when the task starts, so the idle check sees it
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        now = time.perf_counter()
+        self.batches += 1
+        self.batch_sizes.observe(len(batch))
+        for _, _, enqueued in batch:
+            self.queue_delay_ms.observe((now - enqueued) * 1e3)
+        try:
+            results = await self.process_batch([item for item, _, _ in batch])
+        except asyncio.CancelledError:
+            # e.g. shutdown: the callers must not wait forever for a batch that will never finish
+            for _, fut, _ in batch:
+                fut.cancel()
+            raise
+        except BaseException as e:
+            # one instance per caller: raising an exception rewrites its __traceback__, and
+            # the callers re-raise concurrently
+            for i, (_, fut, _) in enumerate(batch):
+                if not fut.done():
+                    fut.set_exception(e if i == 0 else _copy_exception(e))
+            if not isinstance(e, Exception):
+                raise
+            return
+        finally:
+            self.running -= 1
+        for (_, fut, _), result in zip(batch, results):
+            if not fut.done():  # the caller may have gone away
+                fut.set_result(result)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1e3,
+            "max_batch": self.max_batch,
+            "waiting": len(self._pending),
+            "running": self.running,
+            "batches": self.batches,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_delay_ms": self.queue_delay_ms.snapshot(),
+        }
@@ -0,0 +1,340 @@
+# models-api/src/model_registry.py
+"""
+Lazy, thread-safe registry for the joblib artifacts in MODELS_DIR.
+
+Nothing is unpickled at import time: each artifact is loaded on first use (once, even
+under concurrent requests) with joblib's mmap_mode='r'. Compiled forests are cached as
+uncompressed .npz files next to the models and memory-mapped on load, so every uvicorn
+worker on a host shares the same physical pages through the OS page cache.
+
+When training exported a forest (<model>.forest.npz, see DiseaseSpec.forest_file) that
+file is served as is, so a deployment needs neither the joblib files nor sklearn.
+"""
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from forest_engine import CompiledForest
+from lookup_table import LookupTable, file_sha1
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _file_stamp(path: Path) -> Optional[list]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+# files that make up an artifact set (the .compiled cache is derived from them)
+ARTIFACT_PATTERNS = ("*.joblib", "*.forest.npz", "*.schema.json", "*.lookup.npz")
+
+
+def artifact_stamps(models_dir: Path) -> Dict[str, list]:
+    """(mtime_ns, size) of every artifact in models_dir; cheap enough to poll."""
+    models_dir = Path(models_dir)
+    paths = sorted({p for pattern in ARTIFACT_PATTERNS for p in models_dir.glob(pattern)})
+    stamps = {p.name: _file_stamp(p) for p in paths}
+    return {name: stamp for name, stamp in stamps.items() if stamp is not None}
+
+
+def artifact_version(stamps: Dict[str, list]) -> str:
+    """
+    Version of an artifact set from its artifact_stamps (name, mtime, size of every file):
+    no file is read, so building a set stays cheap however large the models are. Workers
+    on one host agree, and so does a copy elsewhere that preserves modification times.
+    """
+    digest = hashlib.sha1()
+    for name, stamp in sorted(stamps.items()):
+        digest.update(f"{name}:{stamp[0]}:{stamp[1]};".encode())
+    return digest.hexdigest()[:12]
+
+
+def _object_nbytes(obj: Any) -> int:
+    """Rough in-memory size of a loaded artifact (array payload only)."""
+    if obj is None:
+        return 0
+    if isinstance(obj, CompiledForest):
+        return obj.nbytes
+    if hasattr(obj, "estimators_"):
+        return sum(_object_nbytes(est) for est in obj.estimators_)
+    tree = getattr(obj, "tree_", None)
+    if tree is not None:
+        # sklearn's Node struct is 64 bytes; value holds one float64 per (node, output, class)
+        return tree.node_count * 64 + tree.value.nbytes
+    return sum(v.nbytes for v in getattr(obj, "__dict__", {}).values() if isinstance(v, np.ndarray))
+
+
+_SKLEARN_INSTALLED: Optional[bool] = None
+
+
+def _sklearn_installed() -> bool:
+    # checked once, without importing it
+    global _SKLEARN_INSTALLED
+    if _SKLEARN_INSTALLED is None:
+        try:
+            _SKLEARN_INSTALLED = importlib.util.find_spec("sklearn") is not None
+        except (ImportError, ValueError):
+            _SKLEARN_INSTALLED = False
+    return _SKLEARN_INSTALLED
+
+
+class _Entry:
+    def __init__(self, name: str, path: Path, kind: str):
+        self.name = name
+        self.path = path
+        self.kind = kind  # "joblib" | "compiled" | "schema" | "lookup"
+        self.lock = threading.Lock()
+        self.state = "pending"  # pending | loaded | missing | failed
+        self.obj: Any = None
+        self.load_seconds: Optional[float] = None
+        self.nbytes = 0
+        self.mmapped = False
+        # (mtime_ns, size) of the source file(s) the loaded object came from: the artifact version
+        self.stamp: Optional[list] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "state": self.state,
+            "path": str(self.path),
+            "load_ms": None if self.load_seconds is None else round(self.load_seconds * 1e3, 2),
+            "nbytes": self.nbytes,
+            "mmapped": self.mmapped,
+        }
+
+
+class ModelRegistry:
+    def __init__(self, models_dir: Path, cache_dir: Optional[Path] = None):
+        self.models_dir = Path(models_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.models_dir / ".compiled"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self.discover()
+
+    def discover(self) -> None:
+        """Register every *.joblib artifact in models_dir as pending (does not load anything)."""
+        if not self.models_dir.is_dir():
+            logger.warning(f"Models directory not found: {self.models_dir}")
+            return
+        for path in sorted(self.models_dir.glob("*.joblib")):
+            self._entry(path.stem, path, "joblib")
+
+    def _entry(self, name: str, path: Path, kind: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _Entry(name, path, kind)
+            return entry
+
+    def get(self, name: str) -> Any:
+        """Return the unpickled artifact `name` (file stem), loading it on first use; None if unavailable."""
+        entry = self._entry(name, self.models_dir / f"{name}.joblib", "joblib")
+        if entry.state == "pending":
+            with entry.lock:
+                if entry.state == "pending":
+                    self._load_joblib(entry)
+        return entry.obj
+
+    def _load_joblib(self, entry: _Entry) -> None:
+        if not entry.path.exists():
+            logger.warning(f"Model file not found: {entry.path}")
+            entry.state = "missing"
+            return
+        try:
+            import joblib  # deferred: unpickling pulls in sklearn
+        except ImportError:
+            # NumPy-only deployments serve the exported forests instead
+            logger.warning(f"joblib is not installed; not loading {entry.path}")
+            entry.state = "missing"
+            return
+        t0 = time.perf_counter()
+        entry.stamp = _file_stamp(entry.path)
+        try:
+            entry.obj = joblib.load(entry.path, mmap_mode="r")
+        except Exception:
+            logger.exception(f"Error loading joblib file {entry.path}")
+            entry.state = "failed"
+            return
+        entry.load_seconds = time.perf_counter() - t0
+        entry.nbytes = _object_nbytes(entry.obj)
+        entry.state = "loaded"
+
+    def schema(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """Feature schema training wrote next to `model_name` ({model_name}.schema.json); None if absent."""
+        name = f"{model_name}.schema"
+        entry = self._entry(name, self.models_dir / f"{model_name}.schema.json", "schema")
+        if entry.state == "pending":
+            with entry.lock:
+                if entry.state == "pending":
+                    if not entry.path.exists():
+                        entry.state = "missing"
+                    else:
+                        t0 = time.perf_counter()
+                        entry.stamp = _file_stamp(entry.path)
+                        try:
+                            with open(entry.path, "r", encoding="utf-8") as f:
+                                entry.obj = json.load(f)
+                            entry.state = "loaded"
+                        except (OSError, ValueError):
+                            logger.exception(f"Error reading schema {entry.path}")
+                            entry.state = "failed"
+                        entry.load_seconds = time.perf_counter() - t0
+        return entry.obj
+
+    def lookup(self, model_name: str) -> Optional[LookupTable]:
+        """
+        Probability table training wrote next to `model_name` ({model_name}.lookup.npz); None
+        if absent, or if it was built for another export of the forest than the one here.
+        """
+        name = f"{model_name}.lookup"
+        entry = self._entry(name, self.models_dir / f"{model_name}.lookup.npz", "lookup")
+        if entry.state == "pending":
+            with entry.lock:
+                if entry.state == "pending":
+                    if not entry.path.exists():
+                        entry.state = "missing"
+                        return None
+                    t0 = time.perf_counter()
+                    entry.stamp = _file_stamp(entry.path)
+                    try:
+                        table = LookupTable.load(entry.path)
+                    except Exception:
+                        logger.exception(f"Error loading lookup table {entry.path}")
+                        entry.state = "failed"
+                        return None
+                    forest = self.models_dir / f"{model_name}.forest.npz"
+                    if not forest.exists() or file_sha1(forest) != table.meta.get("forest_sha1"):
+                        logger.error(f"{entry.path} was not built from {forest}; scoring those rows with the model")
+                        entry.state = "failed"
+                        return None
+                    entry.obj = table
+                    entry.load_seconds = time.perf_counter() - t0
+                    entry.nbytes = table.table.nbytes
+                    entry.mmapped = table.mmapped
+                    entry.state = "loaded"
+        return entry.obj
+
+    def engine(self, model_name: str, scaler_name: Optional[str] = None) -> Optional[CompiledForest]:
+        """
+        Compiled forest for `model_name` with `scaler_name` folded in. The forest training
+        exported is memory-mapped when present; otherwise it is served from the .npz cache
+        when that matches the current artifacts, or compiled from the joblib files (which
+        needs sklearn) and written back to the cache.
+        """
+        name = f"{model_name}.compiled"
+        exported = self.models_dir / f"{model_name}.forest.npz"
+        entry = self._entries.get(name)
+        if entry is None:
+            # which file serves the model is decided once, when the entry is created: no stat per call
+            path = exported if exported.exists() else self.cache_dir / f"{model_name}.npz"
+            entry = self._entry(name, path, "compiled")
+        if entry.state == "pending":
+            with entry.lock:
+                if entry.state == "pending":
+                    if entry.path == exported:
+                        self._load_exported_engine(entry)
+                    else:
+                        self._load_engine(entry, model_name, scaler_name)
+        return entry.obj
+
+    @staticmethod
+    def _load_exported_engine(entry: _Entry) -> None:
+        t0 = time.perf_counter()
+        entry.stamp = _file_stamp(entry.path)
+        try:
+            forest = CompiledForest.load(entry.path, mmap=True)
+        except Exception:
+            logger.exception(f"Error loading exported forest {entry.path}")
+            entry.state = "failed"
+            return
+        entry.obj = forest
+        entry.load_seconds = time.perf_counter() - t0
+        entry.nbytes = forest.nbytes
+        entry.mmapped = forest.mmapped
+        entry.state = "loaded"
+
+    def can_unpickle(self, name: str) -> bool:
+        """Whether get(name) could load the sklearn object: the joblib file exists and sklearn is installed."""
+        return _sklearn_installed() and (self.models_dir / f"{name}.joblib").exists()
+
+    def _load_engine(self, entry: _Entry, model_name: str, scaler_name: Optional[str]) -> None:
+        model_stamp = _file_stamp(self.models_dir / f"{model_name}.joblib")
+        if model_stamp is None:
+            entry.state = "missing"
+            return
+        scaler_stamp = _file_stamp(self.models_dir / f"{scaler_name}.joblib") if scaler_name else None
+        stamp = np.asarray(model_stamp + (scaler_stamp or [0, 0]), dtype=np.int64)
+
+        t0 = time.perf_counter()
+        forest = self._read_cached_engine(entry.path, stamp)
+        if forest is None:
+            model = self.get(model_name)
+            scaler = self.get(scaler_name) if scaler_name else None
+            if model is None:
+                entry.state = "failed"
+                return
+            try:
+                forest = CompiledForest.from_sklearn(model, scaler)
+            except Exception:
+                logger.exception(f"Could not compile {model_name}; using sklearn predict_proba")
+                entry.state = "failed"
+                return
+            forest.extra["source_stamp"] = stamp
+            forest = self._write_cached_engine(entry.path, forest)
+
+        entry.obj = forest
+        entry.stamp = stamp.tolist()
+        entry.load_seconds = time.perf_counter() - t0
+        entry.nbytes = forest.nbytes
+        entry.mmapped = forest.mmapped
+        entry.state = "loaded"
+
+    @staticmethod
+    def _read_cached_engine(path: Path, stamp: np.ndarray) -> Optional[CompiledForest]:
+        if not path.exists():
+            return None
+        try:
+            forest = CompiledForest.load(path, mmap=True)
+        except Exception:
+            logger.warning(f"Ignoring unreadable compiled cache {path}")
+            return None
+        if not np.array_equal(forest.extra.get("source_stamp"), stamp):
+            return None
+        return forest
+
+    @staticmethod
+    def _write_cached_engine(path: Path, forest: CompiledForest) -> CompiledForest:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            forest.save(tmp)
+            os.replace(tmp, path)
+            return CompiledForest.load(path, mmap=True)
+        except OSError as e:
+            # read-only deployments (e.g. serverless bundles) keep the private in-memory copy
+            logger.warning(f"Could not write compiled cache {path}: {e}")
+            return forest
+
+    def preload(self) -> None:
+        """Eagerly load every discovered artifact (skipped without sklearn: nothing could be unpickled)."""
+        if not _sklearn_installed():
+            return
+        for name in list(self._entries):
+            if self._entries[name].kind == "joblib":
+                self.get(name)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._entries.values())
+        return {e.name: e.status() for e in entries}
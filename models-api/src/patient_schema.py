@@ -0,0 +1,117 @@
+# models-api/src/patient_schema.py
+"""
+Request schema for a patient, shared by the API (fastapi_app.py) and the scoring code
+(scoring.py). Kept free of heavy imports so the API can start without numpy.
+
+decode_patient() is the request fast path: a decoder compiled from PatientIn that turns
+a parsed JSON record straight into one float per PATIENT_FIELDS slot (NaN = missing),
+without building a model instance. Records it cannot decode trivially go through
+PatientIn itself, so coercions and validation errors are exactly the model's.
+"""
+from typing import Any, Dict, List, Literal, Optional, get_args
+
+from pydantic import BaseModel, field_validator
+
+
+# ---- Models (Pydantic v2) ----
+class PatientIn(BaseModel):
+    # strings allowed; we coerce to numbers where needed
+    name: Optional[str] = None
+    email: Optional[str] = None
+    age: Optional[float] = None
+    gender: Optional[Literal["0", "1"]] = None
+
+    sbp: Optional[float] = None
+    dbp: Optional[float] = None
+    bmi: Optional[float] = None
+
+    glucose: Optional[float] = None
+    tc: Optional[float] = None
+    hdl: Optional[float] = None
+    ldl: Optional[float] = None
+    hba1c: Optional[float] = None
+    alt: Optional[float] = None
+    ast: Optional[float] = None
+    creat: Optional[float] = None
+    egfr: Optional[float] = None
+    uacr: Optional[float] = None
+    bilirubin: Optional[float] = None
+
+    smoker: Optional[Literal["0", "1"]] = None
+    dm: Optional[Literal["0", "1"]] = None
+    htn: Optional[Literal["0", "1"]] = None
+    fam_cad: Optional[Literal["0", "1"]] = None
+
+    # coerce blanks ("") to None so Number("") in the UI doesn’t explode server-side
+    @field_validator("*", mode="before")
+    @classmethod
+    def empty_to_none(cls, v: Any) -> Any:
+        if v == "":
+            return None
+        return v
+
+
+# Every numeric request field, in a fixed order: a batch is decoded into this matrix once
+# and each disease gathers its model's columns from it through a precompiled FeaturePlan.
+PATIENT_FIELDS = [f for f in PatientIn.model_fields if f not in ("name", "email")]
+
+
+# ---- Fast decoding ----
+_NAN = float("nan")
+
+
+def _compile_slots():
+    """(slot of every numeric field -> its Literal values as floats, or None for a plain number), text fields."""
+    slots: Dict[str, tuple] = {}
+    text = set()
+    for name, field in PatientIn.model_fields.items():
+        args = [a for a in get_args(field.annotation) if a is not type(None)]
+        if name not in PATIENT_FIELDS:
+            text.add(name)
+            continue
+        literal = args[0] if args and getattr(args[0], "__origin__", None) is Literal else None
+        values = {v: float(v) for v in get_args(literal)} if literal is not None else None
+        slots[name] = (PATIENT_FIELDS.index(name), values)
+    return slots, frozenset(text)
+
+
+_SLOTS, _TEXT_FIELDS = _compile_slots()
+
+
+def patient_row(payload: PatientIn) -> List[float]:
+    """A validated payload as one float per PATIENT_FIELDS slot; NaN where missing."""
+    return [_NAN if v is None else float(v) for v in map(payload.__dict__.get, PATIENT_FIELDS)]
+
+
+def decode_patient(record: Any, from_attributes: Optional[bool] = None) -> List[float]:
+    """
+    The row patient_row(PatientIn.model_validate(record)) would give. Plain JSON numbers,
+    the "0"/"1" flag strings, null and "" are decoded here; anything else (numeric strings,
+    booleans, wrong types, non-objects) is handed to PatientIn, which coerces it or raises
+    the same ValidationError it always has. `from_attributes` is passed on to model_validate.
+    """
+    if type(record) is not dict:
+        return patient_row(PatientIn.model_validate(record, from_attributes=from_attributes))
+    row = [_NAN] * len(PATIENT_FIELDS)
+    try:
+        for key, v in record.items():
+            if v is None or v == "":
+                continue
+            slot = _SLOTS.get(key)
+            if slot is None:
+                if key in _TEXT_FIELDS and type(v) is not str:
+                    break
+                continue
+            i, flag_values = slot
+            t = type(v)
+            if flag_values is None and (t is float or t is int):
+                row[i] = float(v)
+            elif flag_values is not None and t is str and v in flag_values:
+                row[i] = flag_values[v]
+            else:
+                break
+        else:
+            return row
+    except OverflowError:  # an integer too large for a float: let the model decide
+        pass
+    return patient_row(PatientIn.model_validate(record, from_attributes=from_attributes))
@@ -0,0 +1,89 @@
+# models-api/src/prediction_cache.py
+"""
+Bounded LRU + TTL cache of per-disease model outputs.
+
+Keys are the model input rows after imputation (the exact float64 bytes the forest would
+see), so fields the model ignores (name, email, other diseases' inputs) never fragment
+it. Each cache is tied to an artifact version; when the version it is asked for changes
+(a new artifact set is activated) every entry is dropped.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+
+def row_keys(X: np.ndarray) -> List[bytes]:
+    """One hashable key per row; + 0.0 folds -0.0 into 0.0 so equal inputs share a key."""
+    X = np.ascontiguousarray(X, dtype=np.float64) + 0.0
+    return [row.tobytes() for row in X]
+
+
+class PredictionCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[bytes, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def _check_version(self, version: Hashable) -> None:
+        if version != self.version:
+            if self._data:
+                self.invalidations += 1
+                self._data.clear()
+            self.version = version
+
+    def get_many(self, keys: Sequence[bytes], version: Hashable) -> List[Optional[Any]]:
+        """Cached value per key (None on a miss), refreshing LRU order of the hits."""
+        now = time.monotonic()
+        out: List[Optional[Any]] = []
+        with self._lock:
+            self._check_version(version)
+            for key in keys:
+                item = self._data.get(key)
+                if item is not None and item[0] < now:
+                    del self._data[key]
+                    self.expirations += 1
+                    item = None
+                if item is None:
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    out.append(item[1])
+        return out
+
+    def put_many(self, keys: Sequence[bytes], values: Sequence[Any], version: Hashable) -> None:
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._check_version(version)
+            for key, value in zip(keys, values):
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
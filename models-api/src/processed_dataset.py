@@ -0,0 +1,83 @@
+# models-api/src/processed_dataset.py
+"""
+Typed columnar storage for the processed training dataset.
+
+The dataset is a directory with one .npy file per column plus schema.json (row count,
+column order, dtypes). Integer columns are stored in the smallest integer type that
+holds them, so flags and labels take one byte per row; measurements stay float64 so
+training sees exactly the values extraction produced. load_processed() memory-maps
+only the requested columns and wraps them in a DataFrame without copying.
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_FILE = "schema.json"
+
+_INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def _storage_array(col: pd.Series) -> np.ndarray:
+    """Column as stored: narrowest int type for integer columns, float64 (NaN for missing) otherwise."""
+    if pd.api.types.is_integer_dtype(col.dtype) and len(col):
+        lo, hi = col.min(), col.max()
+        for dtype in _INT_TYPES:
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                return col.to_numpy(dtype=dtype)
+    if pd.api.types.is_integer_dtype(col.dtype) or pd.api.types.is_bool_dtype(col.dtype):
+        return col.to_numpy(dtype=np.int64)
+    return col.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def write_processed(df: pd.DataFrame, out_dir: str) -> None:
+    """Write `df` as a columnar dataset directory, replacing any previous one at `out_dir`."""
+    tmp_dir = f"{out_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    columns = []
+    for name in df.columns:
+        arr = _storage_array(df[name])
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), arr)
+        columns.append({"name": name, "dtype": arr.dtype.name})
+    schema = {
+        "n_rows": len(df),
+        "columns": columns,
+        "written_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(tmp_dir, SCHEMA_FILE), "w", encoding="utf-8") as f:
+        json.dump(schema, f, indent=2)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+
+
+def read_schema(data_dir: str) -> Dict:
+    with open(os.path.join(data_dir, SCHEMA_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_columns(data_dir: str, columns: Optional[Sequence[str]] = None, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """Column name -> array (read-only, file-backed when mmap=True), in schema order unless `columns` is given."""
+    names = [c["name"] for c in read_schema(data_dir)["columns"]]
+    if columns is not None:
+        missing = [c for c in columns if c not in names]
+        if missing:
+            raise KeyError(f"Columns not in {data_dir}: {missing}")
+        names = list(columns)
+    mode = "r" if mmap else None
+    # plain ndarray views over the mapping: memmap subclass results would leak into every derived array
+    return {name: np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode=mode).view(np.ndarray) for name in names}
+
+
+def load_processed(data_dir: str, columns: Optional[Sequence[str]] = None, mmap: bool = True) -> pd.DataFrame:
+    """DataFrame over the memory-mapped columns (no copy; pandas copies on first write)."""
+    return pd.DataFrame(load_columns(data_dir, columns, mmap), copy=False)
+
+
+def export_csv(data_dir: str, csv_path: str, columns: Optional[Sequence[str]] = None) -> None:
+    load_processed(data_dir, columns).to_csv(csv_path, index=False)
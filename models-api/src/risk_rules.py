@@ -0,0 +1,89 @@
+# models-api/src/risk_rules.py
+"""
+Rule-based clinical scores evaluated over whole columns, shared by training (the label
+rules that turn extracted features into risk_label / diabetes_label / ...) and serving
+(the linear heuristic used when a model is missing or fails).
+
+Inputs are float arrays with NaN for a missing value (flags may be any int dtype).
+NaN compares False, which gives the "missing never triggers a rule" behaviour of the
+original `x is not None and x >= t` checks; rules written as `x and x >= t` also treated
+0 as absent, which present() reproduces. tests/test_risk_rules.py checks exact
+parity against the scalar versions. NumPy only, so the API can import it without sklearn.
+"""
+from typing import Callable, Dict, Mapping, Tuple
+
+import numpy as np
+
+Column = Callable[[str], np.ndarray]  # column name -> values, one per row
+
+
+def present(x: np.ndarray) -> np.ndarray:
+    """Vectorized truthiness of a measurement: False for 0 (NaN is dealt with by the comparison that follows)."""
+    return x != 0
+
+
+# ─── Training labels ───
+def compute_cvd_risk(age, gender, sbp, dbp, tc, hdl, ldl, smoking_status, has_dm, family_cad) -> np.ndarray:
+    """0 = low, 1 = moderate, 2 = high, from a points score over risk factors."""
+    score = np.zeros(np.shape(age), dtype=np.int8)
+    # Demographics
+    score += np.where(present(age) & (age >= 50), np.where(age >= 65, 2, 1), 0).astype(np.int8)
+    score += ((gender == 1) & present(age) & (age >= 45)).astype(np.int8)
+    # Lipids
+    score += np.where(present(tc) & (tc >= 6.2), 2, np.where(present(tc) & (tc >= 5.2), 1, 0)).astype(np.int8)
+    score += (present(hdl) & (((gender == 1) & (hdl < 1.0)) | ((gender == 0) & (hdl < 1.3)))).astype(np.int8)
+    score += np.where(present(ldl) & (ldl >= 4.1), 2, np.where(present(ldl) & (ldl >= 2.6), 1, 0)).astype(np.int8)
+    # BP
+    bp2 = (present(sbp) & (sbp >= 160)) | (present(dbp) & (dbp >= 100))
+    bp1 = (present(sbp) & (sbp >= 140)) | (present(dbp) & (dbp >= 90))
+    score += np.where(bp2, 2, np.where(bp1, 1, 0)).astype(np.int8)
+    # Others
+    score += np.where(smoking_status == 2, 2, np.where(smoking_status == 1, 1, 0)).astype(np.int8)
+    score += 2 * (has_dm != 0).astype(np.int8)
+    score += (family_cad != 0).astype(np.int8)
+    return np.where(score >= 8, 2, np.where(score >= 4, 1, 0)).astype(np.int8)
+
+
+def compute_diabetes_label(hba1c, has_diabetes_icd) -> np.ndarray:
+    return ((has_diabetes_icd != 0) | (hba1c >= 6.5)).astype(np.int8)
+
+
+def compute_ckd_label(egfr, creat, uacr, has_ckd_icd) -> np.ndarray:
+    # creat threshold in umol/L
+    return ((has_ckd_icd != 0) | (egfr < 60) | (creat > 120)).astype(np.int8)
+
+
+def compute_nafld_label(alt, ast, has_nafld_icd) -> np.ndarray:
+    # Very basic NAFLD: ALT/AST > 2x ULN (assuming 35 for ALT)
+    return ((has_nafld_icd != 0) | (alt > 70) | (ast > 70)).astype(np.int8)
+
+
+# label column -> (rule, input columns in argument order)
+LABEL_RULES: Dict[str, Tuple[Callable[..., np.ndarray], Tuple[str, ...]]] = {
+    "risk_label": (compute_cvd_risk, ("age", "gender", "sbp", "dbp", "tc", "hdl", "ldl", "smoker", "dm", "fam_cad")),
+    "diabetes_label": (compute_diabetes_label, ("hba1c", "has_diabetes_icd")),
+    "ckd_label": (compute_ckd_label, ("egfr", "creat", "uacr", "has_ckd_icd")),
+    "nafld_label": (compute_nafld_label, ("alt", "ast", "has_nafld_icd")),
+}
+
+
+def label_columns(column: Column) -> Dict[str, np.ndarray]:
+    """Every LABEL_RULES label (int8) for the rows `column` returns."""
+    with np.errstate(invalid="ignore"):
+        return {label: rule(*(column(c) for c in inputs)) for label, (rule, inputs) in LABEL_RULES.items()}
+
+
+# ─── Serving fallback ───
+def linear_score(base: float, terms: Mapping[str, Tuple[float, float, float]], column: Column,
+                 rows: int) -> np.ndarray:
+    """
+    base + sum(weight * ((value or default) - center)) per row, for DiseaseSpec.fallback_terms.
+    Like `value or default`, both a missing value and 0 take the default. Terms are added
+    in order, so each row gets exactly the float the scalar expression gives.
+    """
+    total = np.zeros(rows)
+    for f, (weight, center, default) in terms.items():
+        col = column(f)
+        col = np.where(np.isnan(col) | (col == 0), default, col)
+        total = total + weight * (col - center)
+    return base + total
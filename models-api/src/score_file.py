@@ -0,0 +1,163 @@
+# models-api/src/score_file.py
+"""
+Offline bulk scoring: re-score a whole patient file (CSV or Parquet) with the API's own
+prediction code instead of one HTTP call per patient.
+
+The input is read in fixed-size chunks; each chunk is decoded into the same matrix the
+API builds from request payloads (columns named like the request fields, e.g. the
+processed training dataset; missing/blank/non-numeric values count as not provided) and
+scored by scoring.risk_columns, so defaults, imputation, the heuristic fallback and the
+interpretation thresholds are exactly those of the endpoints. Chunks are scored on a
+process pool, at most workers * 2 in flight, and written out in input order as they
+finish, so memory stays flat however large the file is.
+
+    python score_file.py processed_multidisease_data.csv -o scores.csv
+    python score_file.py patients.parquet -o scores.parquet --chunk-size 100000 --keep patient_id
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+try:
+    import pyarrow as pa  # optional: Parquet input/output
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# every row of a population file is distinct: the API's prediction cache would only cost memory
+os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+import scoring  # noqa: E402
+from patient_schema import PATIENT_FIELDS  # noqa: E402
+
+SCORE_CHUNK = int(os.getenv("SCORE_CHUNK", "50000"))
+SCORE_WORKERS = int(os.getenv("SCORE_WORKERS", "0")) or (os.cpu_count() or 1)
+
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith((".parquet", ".pq"))
+
+
+def read_chunks(path: str, chunk_size: int, columns: Sequence[str]) -> Iterator[pd.DataFrame]:
+    """Yield the file `chunk_size` rows at a time, restricted to `columns` (those it has)."""
+    wanted = set(columns)
+    if _is_parquet(path):
+        if pq is None:
+            raise SystemExit("Parquet input needs pyarrow (pip install pyarrow)")
+        f = pq.ParquetFile(path)
+        cols = [c for c in f.schema_arrow.names if c in wanted]
+        for batch in f.iter_batches(batch_size=chunk_size, columns=cols):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=lambda c: c in wanted)
+
+
+def raw_matrix(df: pd.DataFrame) -> np.ndarray:
+    """(rows, len(PATIENT_FIELDS)) float matrix with NaN for anything missing, like scoring._payload_matrix."""
+    raw = np.full((len(df), len(PATIENT_FIELDS)), np.nan)
+    for i, field in enumerate(PATIENT_FIELDS):
+        if field in df.columns:
+            raw[:, i] = pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return raw
+
+
+def score_chunk(raw: np.ndarray) -> Dict[str, list]:
+    return scoring.risk_columns(raw)
+
+
+def _scored(chunks: Iterator[pd.DataFrame], workers: int) -> Iterator[tuple]:
+    """Yield (chunk, risk columns) in input order; at most workers * 2 chunks are in flight."""
+    if workers <= 1:
+        scoring.load_models()
+        for df in chunks:
+            yield df, score_chunk(raw_matrix(df))
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=scoring.load_models) as pool:
+        pending = deque()
+        for df in chunks:
+            pending.append((df, pool.submit(score_chunk, raw_matrix(df))))
+            if len(pending) >= workers * 2:
+                df, fut = pending.popleft()
+                yield df, fut.result()
+        while pending:
+            df, fut = pending.popleft()
+            yield df, fut.result()
+
+
+class _Writer:
+    """Appends result chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._parquet = None
+        self._csv = None
+        if _is_parquet(path) and pq is None:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)")
+
+    def write(self, df: pd.DataFrame) -> None:
+        if _is_parquet(self.path):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            header = self._csv is None
+            if self._csv is None:
+                self._csv = open(self.path, "w", encoding="utf-8", newline="")
+            df.to_csv(self._csv, header=header, index=False)
+            self._csv.flush()
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._csv is not None:
+            self._csv.close()
+
+
+def score_file(input_path: str, output_path: str, chunk_size: Optional[int] = None,
+               workers: Optional[int] = None, keep: Sequence[str] = ()) -> Dict[str, Dict[str, int]]:
+    """Score `input_path` into `output_path`; returns model/heuristic/unavailable row counts per disease."""
+    chunk_size = chunk_size or SCORE_CHUNK
+    workers = SCORE_WORKERS if workers is None else workers
+    chunks = read_chunks(input_path, chunk_size, list(PATIENT_FIELDS) + list(keep))
+
+    counts = {name: {"model": 0, "heuristic": 0, "unavailable": 0} for name in scoring.DISEASES}
+    writer, done, t0 = _Writer(output_path), 0, time.perf_counter()
+    try:
+        for df, risk in _scored(chunks, workers):
+            out = pd.DataFrame({"row": np.arange(done, done + len(df))})
+            for col in keep:
+                out[col] = df[col].to_numpy() if col in df.columns else None
+            out = pd.concat([out, pd.DataFrame(risk)], axis=1)
+            writer.write(out)
+            for name in counts:
+                source = risk[f"{name}_source"]
+                counts[name][source[0] if source else "model"] += len(source)
+            done += len(df)
+            rate = done / max(time.perf_counter() - t0, 1e-9)
+            print(f"\r→ {done} rows scored ({rate:,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+    finally:
+        writer.close()
+    print(f"\r→ {done} rows scored in {time.perf_counter() - t0:.1f}s → {output_path}", file=sys.stderr)
+    return counts
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input", help="CSV or Parquet (.parquet) file with one patient per row")
+    ap.add_argument("-o", "--output", required=True, help="CSV or Parquet (.parquet) file to write")
+    ap.add_argument("--chunk-size", type=int, default=SCORE_CHUNK, help="rows read and scored per task")
+    ap.add_argument("--workers", type=int, default=SCORE_WORKERS, help="scoring processes (1 = in this process)")
+    ap.add_argument("--keep", nargs="+", default=[], metavar="COLUMN",
+                    help="input columns copied to the output (e.g. a patient id)")
+    args = ap.parse_args()
+
+    counts = score_file(args.input, args.output, args.chunk_size, args.workers, args.keep)
+    for name, c in counts.items():
+        print(f"{name:9s} model {c['model']:>9d}  heuristic {c['heuristic']:>9d}  unavailable {c['unavailable']:>9d}",
+              file=sys.stderr)
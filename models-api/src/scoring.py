@@ -0,0 +1,644 @@
+# models-api/src/scoring.py
+"""
+Vectorized risk scoring: feature plans, model inference, the prediction cache, the
+precomputed lookup tables and the heuristic fallback.
+
+Everything that needs numpy (and, through joblib, sklearn) lives here, so fastapi_app can
+import this module on the first prediction instead of at startup (see STARTUP_MODE there).
+Importing it is cheap-ish (numpy plus the feature schemas); the models themselves are
+still loaded lazily by the registry, or all at once by load_models(). With the forests
+training exports (*.forest.npz) every prediction runs on NumPy alone and sklearn need
+not be installed.
+
+The artifacts in use form one ArtifactSet (a directory, versioned by the mtimes and sizes
+of its files). reload_models() loads a new set in the caller's thread, checks it on canary
+payloads and swaps it in with one assignment: each scoring call reads the active set once,
+so calls in flight finish on the old set, whose memory is released once the last of them
+returns.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from disease_specs import DISEASES, DiseaseSpec, select_diseases
+from lookup_table import LookupTable
+from metrics import REGISTRY as METRICS
+from model_registry import ModelRegistry, artifact_stamps, artifact_version
+from patient_schema import PATIENT_FIELDS, PatientIn, patient_row
+from prediction_cache import PredictionCache, row_keys
+from risk_rules import linear_score
+
+# ------------------------
+# Logging + model paths
+# ------------------------
+logger = logging.getLogger("uvicorn.error")
+HERE = Path(__file__).resolve().parent
+MODELS_DIR = (HERE.parent / "models").resolve()
+# artifact set served at startup: MODELS_DIR itself, or a versioned subdirectory of it (e.g. "2026-10-17")
+MODEL_SET = os.getenv("MODEL_SET", "")
+
+# "compiled" walks flattened forests in NumPy; "sklearn" calls predict_proba directly.
+# Past COMPILED_MAX_BATCH rows sklearn's C tree loop overtakes the NumPy walk (see benchmarks/bench_forest.py),
+# so larger batches go to sklearn when it can load the model, and stay on NumPy otherwise.
+RISK_ENGINE = os.getenv("RISK_ENGINE", "compiled").lower()
+COMPILED_MAX_BATCH = int(os.getenv("COMPILED_MAX_BATCH", "256"))
+
+# Diseases answered from their precomputed probability table (<model>.lookup.npz) when a request only sets
+# features on its grid points: comma-separated names or "all"; off by default. A hit is the model's own
+# output for that input (the table memoizes it, see lookup_table.py); every other row goes to the model.
+# (training builds the tables named in LOOKUP_TABLES / --lookup-tables)
+LOOKUP_DISEASES = select_diseases(os.getenv("RISK_LOOKUP", ""))
+
+# Per-disease LRU of model outputs keyed by the imputed model input row; 0 entries disables it
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+PREDICTION_CACHES: Dict[str, PredictionCache] = (
+    {name: PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL) for name in DISEASES}
+    if PREDICTION_CACHE_SIZE > 0 else {}
+)
+
+# ------------------------
+# Metrics (scraped from GET /metrics once this module is loaded)
+# ------------------------
+# Recorded in the process that scores: with INFERENCE_EXECUTOR=process these stay in the workers.
+STAGE_SECONDS = METRICS.histogram(
+    "risk_stage_seconds", "Time spent in each request-level scoring stage", ["stage"])
+MODEL_STAGE_SECONDS = METRICS.histogram(
+    "risk_model_stage_seconds", "Time spent in each per-disease scoring stage", ["disease", "stage"])
+PREDICTIONS = METRICS.counter(
+    "risk_predictions", "Rows scored by a model per disease, by engine, cache or lookup table", ["disease", "source"])
+FALLBACKS = METRICS.counter(
+    "risk_fallback", "Rows scored with the heuristic instead of the model, by reason", ["disease", "reason"])
+UNSCORED = METRICS.counter(
+    "risk_unscored", "Rows left without a score for a disease that has no model and no heuristic, by reason",
+    ["disease", "reason"])
+TRANSFORM_FAILURES = METRICS.counter(
+    "risk_transform_failures", "Rows scored on unscaled features because scaler.transform failed", ["disease"])
+RELOADS = METRICS.counter(
+    "risk_model_reloads", "Artifact set reloads, by result (ok, rejected by the canary check, failed)", ["result"])
+
+
+def _collect_load_seconds():
+    for name, status in _active.registry.status().items():
+        if status["load_ms"] is not None:
+            labels = {"artifact": name, "kind": status["kind"]}
+            yield "risk_model_load_seconds", labels, round(status["load_ms"] / 1e3, 6)
+
+
+def _collect_version():
+    yield "risk_model_version_info", {"version": _active.version}, 1
+
+
+METRICS.callback("risk_model_load_seconds", "Time taken to load each artifact", _collect_load_seconds)
+METRICS.callback("risk_model_version_info", "Active artifact set (always 1)", _collect_version)
+
+# ------------------------
+# Utilities
+# ------------------------
+def _soft_prob(p: float) -> float:
+    # clamp 0..1 and round for nicer output
+    return round(max(0.0, min(1.0, p)), 3)
+
+
+# ------------------------
+# Model loader + predictors
+# ------------------------
+def load_models(models_dir: Optional[str] = None):
+    """
+    Eagerly load every artifact of the active set (the registry otherwise loads each one
+    on first use). Given `models_dir`, that set is activated first without a canary
+    check: process workers use this to follow a reload the API process already validated.
+    """
+    global _active
+    if models_dir is not None and Path(models_dir).resolve() != _active.models_dir:
+        _active = ArtifactSet(Path(models_dir))
+    _active.load()
+
+
+# column of each request field in the matrix _payload_matrix decodes a batch into
+_FIELD_INDEX = {f: i for i, f in enumerate(PATIENT_FIELDS)}
+
+
+class FeaturePlan:
+    """
+    Column-index gather plan for one model, compiled once from the schema training wrote
+    next to it (or from the disease spec for older artifacts without one). Building the
+    model input is then raw[:, index] with missing values replaced by `fill`.
+    """
+
+    def __init__(self, spec: DiseaseSpec, columns: List[str], fill: List[float], source: str):
+        self.spec = spec
+        self.columns = columns
+        self.index = np.array([_FIELD_INDEX[c] for c in columns], dtype=np.intp)
+        self.fill = np.array(fill, dtype=float)
+        self.source = source
+        self.usable = True
+
+    def accepts(self, n_features: int) -> bool:
+        """Check the loaded model's width once; a mismatch disables the model (one log line, not one per request)."""
+        if self.usable and n_features != len(self.columns):
+            logger.error(
+                f"{self.spec.name}: model expects {n_features} features but its {self.source} lists "
+                f"{len(self.columns)} ({self.columns}); serving the heuristic fallback instead"
+            )
+            self.usable = False
+        return self.usable
+
+    def status(self) -> Dict[str, Any]:
+        return {"source": self.source, "columns": self.columns, "usable": self.usable}
+
+
+def _compile_plan(spec: DiseaseSpec, registry: ModelRegistry) -> Optional[FeaturePlan]:
+    schema = registry.schema(spec.model_stem)
+    columns = list(schema["columns"]) if schema else list(spec.features)
+    unknown = [c for c in columns if c not in _FIELD_INDEX]
+    if unknown:
+        logger.error(f"{spec.name}: model columns {unknown} are not request fields; serving the heuristic fallback")
+        return None
+    # impute with the training medians; fall back to the spec defaults where training had none
+    fill = spec.fill_values(columns, (schema or {}).get("medians") or {})
+    return FeaturePlan(spec, columns, fill, "schema" if schema else "spec")
+
+
+class ArtifactSet:
+    """
+    The model artifacts of one directory with their registry and feature plans. Immutable
+    once built: a new model version is a new ArtifactSet, swapped in by reload_models().
+    """
+
+    def __init__(self, models_dir: Path):
+        self.models_dir = Path(models_dir).resolve()
+        self.stamps = artifact_stamps(self.models_dir)
+        self.version = artifact_version(self.stamps)
+        self.loaded_at = time.time()
+        # artifacts are loaded lazily on first use, not here (see model_registry.py)
+        self.registry = ModelRegistry(self.models_dir)
+        # compiled up front so a schema/request mismatch is reported once, here
+        self.plans: Dict[str, Optional[FeaturePlan]] = {
+            name: _compile_plan(spec, self.registry) for name, spec in DISEASES.items()
+        }
+        # probability tables of the LOOKUP_DISEASES, checked against their plans on first use
+        self.lookups: Dict[str, Optional[LookupTable]] = {}
+        # diseases with no model file in this set (or whose model failed to load as missing): their rows
+        # go straight to the fallback, without cache lookups counted as misses
+        self.missing = {name for name, spec in DISEASES.items()
+                        if not (self.models_dir / spec.forest_file).exists()
+                        and not (self.models_dir / spec.model_file).exists()}
+
+    def load(self) -> None:
+        self.registry.preload()
+        if RISK_ENGINE == "compiled":
+            for spec in DISEASES.values():
+                self.registry.engine(spec.model_stem, spec.scaler_stem)
+        for name in LOOKUP_DISEASES:
+            self.lookup(DISEASES[name])
+
+    def lookup(self, spec: DiseaseSpec) -> Optional[LookupTable]:
+        """
+        The disease's probability table if it was built for the plan serving it; None sends
+        every row to the model.
+        """
+        if spec.name not in self.lookups:
+            table = self.registry.lookup(spec.model_stem)
+            plan = self.plans.get(spec.name)
+            if table is not None and (plan is None or not table.matches(plan.columns, plan.fill)
+                                      or table.meta.get("positive_classes") != list(spec.positive_classes)):
+                logger.error(f"{spec.name}: {spec.lookup_file} does not match the model's columns, imputation "
+                             f"values or positive classes; scoring every row with the model")
+                table = None
+            self.lookups[spec.name] = table
+        return self.lookups[spec.name]
+
+    def status(self) -> Dict[str, Any]:
+        return {"version": self.version, "models_dir": str(self.models_dir),
+                "loaded_at": datetime.fromtimestamp(self.loaded_at).isoformat(timespec="seconds")}
+
+
+_active = ArtifactSet(MODELS_DIR / MODEL_SET)
+
+
+def active() -> ArtifactSet:
+    """The artifact set new scoring calls use."""
+    return _active
+
+
+def _row_matrix(rows: List[List[float]]) -> np.ndarray:
+    """Stack decoded rows (patient_schema.decode_patient) into an (n_rows, len(PATIENT_FIELDS)) float matrix."""
+    return np.array(rows, dtype=float).reshape(len(rows), len(PATIENT_FIELDS))
+
+
+def _payload_matrix(payloads: List[PatientIn]) -> np.ndarray:
+    """Stack every numeric field into an (n_rows, len(PATIENT_FIELDS)) float matrix; missing values are NaN."""
+    return _row_matrix([patient_row(p) for p in payloads])
+
+
+def _build_feature_matrix(raw: np.ndarray, plan: FeaturePlan) -> np.ndarray:
+    X = raw[:, plan.index]
+    np.copyto(X, plan.fill, where=np.isnan(X))
+    return X
+
+
+class ModelUnavailable(Exception):
+    """The model cannot score this batch; `reason` labels the fallback it causes."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _positive_proba(plan: FeaturePlan, X: np.ndarray, registry: ModelRegistry, observe: bool = True) -> np.ndarray:
+    """
+    One scaler.transform + predict_proba call for the whole matrix; raises ModelUnavailable if
+    the model is unusable. observe=False keeps the call out of the serving metrics (reload canary).
+    """
+    spec = plan.spec
+    if RISK_ENGINE == "compiled" and (len(X) <= COMPILED_MAX_BATCH or not registry.can_unpickle(spec.model_stem)):
+        engine = registry.engine(spec.model_stem, spec.scaler_stem)
+        if engine is not None:
+            if not plan.accepts(engine.n_features):
+                raise ModelUnavailable("feature_mismatch")
+            t0 = time.perf_counter()
+            try:
+                # the scaler is already folded into the compiled thresholds
+                proba = engine.predict_proba(X)
+            except Exception:
+                logger.exception(f"{spec.name} compiled forest predict failed")
+                raise ModelUnavailable("predict_failed")
+            if observe:
+                MODEL_STAGE_SECONDS.observe_since(t0, spec.name, "predict")
+                PREDICTIONS.inc(spec.name, "compiled", amount=len(X))
+            return proba[:, np.isin(engine.classes, spec.positive_classes)].sum(axis=1)
+
+    model = registry.get(spec.model_stem)
+    if model is None:
+        raise ModelUnavailable("model_missing")
+    if not plan.accepts(int(getattr(model, "n_features_in_", len(plan.columns)))):
+        raise ModelUnavailable("feature_mismatch")
+    scaler = registry.get(spec.scaler_stem)
+    t0 = time.perf_counter()
+    if scaler is not None:
+        try:
+            X = scaler.transform(X)
+        except Exception:
+            logger.exception(f"{spec.name} scaler transform failed; proceeding with raw features")
+            if observe:
+                TRANSFORM_FAILURES.inc(spec.name, amount=len(X))
+        if observe:
+            t0 = MODEL_STAGE_SECONDS.observe_since(t0, spec.name, "transform")
+    try:
+        proba = model.predict_proba(X)
+    except Exception:
+        logger.exception(f"{spec.name} model predict failed")
+        raise ModelUnavailable("predict_failed")
+    if observe:
+        MODEL_STAGE_SECONDS.observe_since(t0, spec.name, "predict")
+        PREDICTIONS.inc(spec.name, "sklearn", amount=len(X))
+    return proba[:, np.isin(model.classes_, spec.positive_classes)].sum(axis=1)
+
+
+def _model_version(spec: DiseaseSpec, artifacts: ArtifactSet) -> tuple:
+    # the set version is a digest of every artifact's stamp and is fixed when the set is opened,
+    # so it does not move as entries load lazily
+    return artifacts.version, spec.name
+
+
+def predict_disease_batch(spec: DiseaseSpec, raw: np.ndarray, artifacts: Optional[ArtifactSet] = None) -> np.ndarray:
+    """Model probabilities for every row; raises ModelUnavailable when the heuristic has to be used."""
+    artifacts = artifacts or _active
+    plan = artifacts.plans.get(spec.name)
+    if plan is None or not plan.usable:
+        raise ModelUnavailable("feature_mismatch")
+    table = artifacts.lookup(spec) if spec.name in LOOKUP_DISEASES else None
+    if table is None:
+        return _predict_rows(spec, plan, raw, artifacts)
+
+    # rows on the table's grid are read from it, only the rest go through the cache and the model
+    t0 = time.perf_counter()
+    hit, p = table.lookup(raw[:, plan.index])
+    MODEL_STAGE_SECONDS.observe_since(t0, spec.name, "lookup")
+    hits = int(np.count_nonzero(hit))
+    if hits:
+        PREDICTIONS.inc(spec.name, "lookup", amount=hits)
+    if hits < len(p):
+        p[~hit] = _predict_rows(spec, plan, raw[~hit], artifacts)
+    return p
+
+
+def _predict_rows(spec: DiseaseSpec, plan: FeaturePlan, raw: np.ndarray, artifacts: ArtifactSet) -> np.ndarray:
+    if spec.name in artifacts.missing:
+        raise ModelUnavailable("model_missing")
+    try:
+        return _predict_cached(spec, plan, raw, artifacts)
+    except ModelUnavailable as e:
+        if e.reason == "model_missing":
+            artifacts.missing.add(spec.name)
+        raise
+
+
+def _predict_cached(spec: DiseaseSpec, plan: FeaturePlan, raw: np.ndarray, artifacts: ArtifactSet) -> np.ndarray:
+    t0 = time.perf_counter()
+    X = _build_feature_matrix(raw, plan)
+    MODEL_STAGE_SECONDS.observe_since(t0, spec.name, "features")
+    cache = PREDICTION_CACHES.get(spec.name)
+    if cache is None or artifacts is not _active:
+        # a request still finishing on a set that was just swapped out must not flush the new set's entries
+        return _positive_proba(plan, X, artifacts.registry)
+
+    # only rows the cache has not seen (for the current artifacts) go through the model
+    keys = row_keys(X)
+    cached = cache.get_many(keys, _model_version(spec, artifacts))
+    miss = [i for i, v in enumerate(cached) if v is None]
+    p = np.array([np.nan if v is None else v for v in cached], dtype=float)
+    if miss:
+        fresh = _positive_proba(plan, X[miss], artifacts.registry)
+        p[miss] = fresh
+        cache.put_many([keys[i] for i in miss], fresh.tolist(), _model_version(spec, artifacts))
+    if len(miss) < len(p):
+        PREDICTIONS.inc(spec.name, "cache", amount=len(p) - len(miss))
+    return p
+
+
+# ------------------------
+# Heuristic fallback (used when a model is missing or failed)
+# ------------------------
+def fallback_batch(spec: DiseaseSpec, raw: np.ndarray) -> np.ndarray:
+    return linear_score(spec.fallback_base, spec.fallback_terms, lambda f: raw[:, _FIELD_INDEX[f]], len(raw))
+
+
+def _binary_probs(p: float, pos: str, neg: str, from_model: bool) -> Dict[str, float]:
+    p_pos = _soft_prob(p)
+    # the heuristic derives its complement from the rounded value, the models from the raw one
+    p_neg = _soft_prob(1.0 - (p if from_model else p_pos))
+    return {pos: p_pos, neg: p_neg}
+
+
+def score_matrix(raw: np.ndarray,
+                 artifacts: Optional[ArtifactSet] = None) -> List[Tuple[DiseaseSpec, Optional[np.ndarray], bool]]:
+    """
+    (spec, P(positive) per row, from_model) for every disease, from a matrix laid out like
+    _payload_matrix; P is None for a disease whose model is unavailable and that has no heuristic.
+    """
+    artifacts = artifacts or _active
+    # First, try model-based predictions; if a model is missing or failed, fall back to the heuristic
+    columns = []
+    for spec in DISEASES.values():
+        try:
+            p = predict_disease_batch(spec, raw, artifacts)
+            from_model = True
+        except ModelUnavailable as e:
+            from_model = False
+            if not spec.fallback_terms:
+                UNSCORED.inc(spec.name, e.reason, amount=len(raw))
+                columns.append((spec, None, from_model))
+                continue
+            t0 = time.perf_counter()
+            p = fallback_batch(spec, raw)
+            MODEL_STAGE_SECONDS.observe_since(t0, spec.name, "fallback")
+            FALLBACKS.inc(spec.name, e.reason, amount=len(raw))
+        columns.append((spec, p, from_model))
+    return columns
+
+
+def risk_columns(raw: np.ndarray) -> Dict[str, list]:
+    """
+    Column-wise equivalent of score_patients_batch for offline scoring (see score_file.py):
+    the same probabilities and interpretations, as <disease>_<class> / <disease>_interpretation
+    lists plus <disease>_source ("model", "heuristic", or "unavailable" with empty values where
+    the API leaves the disease out) and the artifact set's model_version.
+    """
+    artifacts = _active
+    out: Dict[str, list] = {"model_version": [artifacts.version] * len(raw)}
+    for spec, p, from_model in score_matrix(raw, artifacts):
+        if p is None:
+            for key in (spec.positive, spec.negative, "interpretation"):
+                out[f"{spec.name}_{key}"] = [None] * len(raw)
+            out[f"{spec.name}_source"] = ["unavailable"] * len(raw)
+            continue
+        pos = [_soft_prob(v) for v in p.tolist()]
+        # complements exactly as _binary_probs derives them
+        if from_model:
+            neg = [_soft_prob(1.0 - v) for v in p.tolist()]
+        else:
+            neg = [_soft_prob(1.0 - v) for v in pos]
+        out[f"{spec.name}_{spec.positive}"] = pos
+        out[f"{spec.name}_{spec.negative}"] = neg
+        out[f"{spec.name}_interpretation"] = [spec.interpret(v) for v in pos]
+        out[f"{spec.name}_source"] = ["model" if from_model else "heuristic"] * len(pos)
+    return out
+
+
+def score_patients_batch(payloads: List[PatientIn]) -> List[Dict[str, Any]]:
+    """Score every payload for every disease with one vectorized model call each; results keep input order."""
+    return score_rows([patient_row(p) for p in payloads])
+
+
+def score_rows(rows: List[List[float]]) -> List[Dict[str, Any]]:
+    """score_patients_batch for rows already decoded by patient_schema.decode_patient (the API's request path)."""
+    if not rows:
+        return []
+    t0 = time.perf_counter()
+    raw = _row_matrix(rows)
+    STAGE_SECONDS.observe_since(t0, "decode")
+
+    artifacts = _active  # read once: a reload during this call does not mix versions
+    # diseases with neither a usable model nor a heuristic are left out of the response
+    columns = [(spec, p.tolist(), from_model) for spec, p, from_model in score_matrix(raw, artifacts)
+               if p is not None]
+    t0 = time.perf_counter()
+
+    results = []
+    for i in range(len(rows)):
+        risk = {}
+        for spec, p, from_model in columns:
+            probs = _binary_probs(p[i], spec.positive, spec.negative, from_model)
+            risk[spec.name] = {
+                "probabilities": probs,
+                "interpretation": spec.interpret(probs[spec.positive]),
+                "source": "model" if from_model else "heuristic",
+            }
+        results.append({"risk": risk, "model_version": artifacts.version})
+    STAGE_SECONDS.observe_since(t0, "format")
+    return results
+
+
+def health() -> Dict[str, Any]:
+    """Load state for /health; reports only, never triggers a load."""
+    artifacts = _active
+    return {
+        "engine": RISK_ENGINE,
+        "model_version": artifacts.version,
+        "artifacts": artifacts.status(),
+        "last_reload": _last_reload,
+        "models": artifacts.registry.status(),
+        "features": {name: plan.status() if plan else None for name, plan in artifacts.plans.items()},
+        "prediction_cache": {name: cache.stats() for name, cache in PREDICTION_CACHES.items()},
+        # grid and size of each table in use (None: not loaded yet, or unusable)
+        "lookup": {name: artifacts.lookups[name].status() if artifacts.lookups.get(name) else None
+                   for name in sorted(LOOKUP_DISEASES)},
+    }
+
+
+def model_info(payload: PatientIn) -> Dict[str, Any]:
+    """Model metadata and raw predict_proba arrays for one payload (see /debug/model-info)."""
+    artifacts = _active
+    registry, plans = artifacts.registry, artifacts.plans
+    info: Dict[str, Any] = {"model_version": artifacts.version}
+    raw = _payload_matrix([payload])
+    try:
+        for spec in DISEASES.values():
+            model = registry.get(spec.model_stem)
+            scaler = registry.get(spec.scaler_stem)
+            # Model metadata
+            if model is not None:
+                info[f"{spec.name}_meta"] = {
+                    "classes": np.asarray(getattr(model, "classes_", [])).tolist(),
+                    "n_features_in": int(getattr(model, "n_features_in_", 0)),
+                    "features": plans[spec.name].columns if plans[spec.name] else None,
+                    "positive_classes": list(spec.positive_classes),
+                }
+            else:
+                info[f"{spec.name}_meta"] = None
+            # the NumPy forest, which is all there is when sklearn is not installed
+            engine = registry.engine(spec.model_stem, spec.scaler_stem) if RISK_ENGINE == "compiled" else None
+            if model is None and engine is not None:
+                info[f"{spec.name}_meta"] = {
+                    "classes": np.asarray(engine.classes).tolist(),
+                    "n_features_in": engine.n_features,
+                    "features": plans[spec.name].columns if plans[spec.name] else None,
+                    "positive_classes": list(spec.positive_classes),
+                    "engine": "compiled",
+                }
+
+            # Raw predict_proba outputs (if model present)
+            try:
+                fv = _build_feature_matrix(raw, plans[spec.name])
+                if model is not None:
+                    if scaler is not None:
+                        fv = scaler.transform(fv)
+                    info[f"{spec.name}_proba_raw"] = model.predict_proba(fv).tolist()
+                else:
+                    info[f"{spec.name}_proba_raw"] = engine.predict_proba(fv).tolist() if engine is not None else None
+            except Exception as e:
+                info[f"{spec.name}_proba_error"] = str(e)
+
+    except Exception as e:
+        return {"error": str(e)}
+    return info
+
+
+# ------------------------
+# Hot reload
+# ------------------------
+class ReloadRejected(Exception):
+    """The candidate artifact set failed its canary check; the active set is unchanged."""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+# scored through the candidate set before it goes live: an empty record (every field imputed)
+# and a typical adult
+CANARY_PAYLOADS = [
+    PatientIn(),
+    PatientIn(age=55, gender="1", sbp=138, dbp=86, bmi=29.5, glucose=5.8, tc=5.4, hdl=1.2, ldl=3.4, hba1c=6.1,
+              alt=32, ast=28, creat=88, egfr=82, uacr=2.5, bilirubin=11, smoker="0", dm="0", htn="1", fam_cad="0"),
+]
+
+# largest |change| in a canary probability a candidate may show against the active set before the
+# swap is refused (409 unless forced); 1 accepts any change
+RELOAD_MAX_CHANGE = float(os.getenv("RELOAD_MAX_CHANGE", "0.25"))
+
+_reload_lock = threading.Lock()
+_last_reload: Optional[Dict[str, Any]] = None
+
+
+def _canary(artifacts: ArtifactSet, raw: np.ndarray) -> Dict[str, Optional[np.ndarray]]:
+    """
+    P(positive) per disease on the canary rows, or None where the model is unavailable
+    (bypasses the cache and is not counted in the serving metrics).
+    """
+    out: Dict[str, Optional[np.ndarray]] = {}
+    for spec in DISEASES.values():
+        plan = artifacts.plans.get(spec.name)
+        try:
+            if plan is None or not plan.usable:
+                raise ModelUnavailable("feature_mismatch")
+            out[spec.name] = _positive_proba(plan, _build_feature_matrix(raw, plan), artifacts.registry, observe=False)
+        except ModelUnavailable:
+            out[spec.name] = None
+    return out
+
+
+def _check_candidate(new: ArtifactSet, old: ArtifactSet, payloads: List[PatientIn]) -> Tuple[List[str], Dict[str, Any]]:
+    """Problems that block the swap, and per-disease canary results for the reload report."""
+    raw = _payload_matrix(payloads)
+    new_p, old_p = _canary(new, raw), _canary(old, raw)
+    problems, report = [], {}
+    for name, p in new_p.items():
+        if p is None:
+            report[name] = "fallback"
+            # losing a model that is serving today is a regression; never having had one is not
+            if old_p[name] is not None:
+                problems.append(f"{name}: model unavailable in the new set")
+            continue
+        if not np.all(np.isfinite(p) & (p >= 0) & (p <= 1)):
+            problems.append(f"{name}: canary probabilities out of range {p.tolist()}")
+        report[name] = {"p": np.round(p, 4).tolist()}
+        if old_p[name] is not None:
+            change = float(np.abs(p - old_p[name]).max())
+            report[name]["max_abs_change"] = round(change, 4)
+            if change > RELOAD_MAX_CHANGE:
+                problems.append(f"{name}: canary probabilities moved by {change:.4f} "
+                                f"(RELOAD_MAX_CHANGE {RELOAD_MAX_CHANGE})")
+    return problems, report
+
+
+def reload_models(models_dir: Optional[Path] = None, canary: Optional[List[PatientIn]] = None,
+                  force: bool = False) -> Dict[str, Any]:
+    """
+    Load `models_dir` (default: the active set's directory, picking up replaced files) as
+    a new ArtifactSet, score the canary payloads with it and make it active. Runs in the
+    caller's thread and blocks only other reloads; raises ReloadRejected, leaving the
+    active set in place, if the check fails and `force` is not set.
+    """
+    global _active, _last_reload
+    with _reload_lock:
+        old = _active
+        t0 = time.perf_counter()
+        result: Dict[str, Any] = {"previous_version": old.version, "at": datetime.now().isoformat(timespec="seconds")}
+        try:
+            new = ArtifactSet(Path(models_dir) if models_dir else old.models_dir)
+            new.load()
+            problems, result["canary"] = _check_candidate(new, old, canary or CANARY_PAYLOADS)
+        except Exception as e:
+            logger.exception("Model reload failed; keeping the active artifact set")
+            RELOADS.inc("failed")
+            _last_reload = dict(result, result="failed", error=str(e))
+            raise
+        result.update(version=new.version, models_dir=str(new.models_dir), problems=problems,
+                      load_seconds=round(time.perf_counter() - t0, 3))
+        if problems and not force:
+            logger.warning(f"Model reload to {new.version} rejected: {'; '.join(problems)}")
+            RELOADS.inc("rejected")
+            _last_reload = dict(result, result="rejected")
+            raise ReloadRejected(problems)
+        # the swap: calls already running keep their reference to `old`
+        _active = new
+        RELOADS.inc("ok")
+        _last_reload = dict(result, result="ok")
+        logger.info(f"Swapped models {old.version} -> {new.version} in {result['load_seconds']}s")
+        return _last_reload
+
+
+def changed_artifact_stamps() -> Optional[Dict[str, list]]:
+    """Current file stamps of the active set's directory if they differ from when it was loaded, else None."""
+    artifacts = _active
+    stamps = artifact_stamps(artifacts.models_dir)
+    return stamps if stamps != artifacts.stamps else None
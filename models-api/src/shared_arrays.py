@@ -0,0 +1,59 @@
+# models-api/src/shared_arrays.py
+"""
+Read-only NumPy arrays shared with worker processes through memory-mapped .npy files.
+
+The parent writes each array once (publish) into a private temporary directory, on
+/dev/shm where there is one; a pool initializer points the workers at that directory
+(attach) and get() maps an array on first use, so every process reads the same pages
+and a task only has to carry the array's key. close() removes the directory.
+"""
+import os
+import tempfile
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def _default_root() -> Optional[str]:
+    # tmpfs: the "files" are the shared pages themselves, never written to disk
+    return "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+
+class SharedArrays:
+    def __init__(self, root: Optional[str] = None):
+        self._tmp = tempfile.TemporaryDirectory(prefix="shared-arrays-", dir=root or _default_root())
+        self.dir = self._tmp.name
+
+    def publish(self, key: str, array: np.ndarray) -> None:
+        np.save(os.path.join(self.dir, f"{key}.npy"), np.ascontiguousarray(array))
+
+    def close(self) -> None:
+        self._tmp.cleanup()
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# worker side: the directory attach() was given and the arrays mapped from it so far
+_dir: Optional[str] = None
+_mapped: Dict[str, np.ndarray] = {}
+
+
+def attach(directory: str) -> None:
+    """Pool initializer: read arrays from the SharedArrays directory `directory`."""
+    global _dir
+    _dir = directory
+    _mapped.clear()
+
+
+def get(key: str) -> np.ndarray:
+    """The published array `key`, memory-mapped read-only on first use."""
+    array = _mapped.get(key)
+    if array is None:
+        if _dir is None:
+            raise RuntimeError("shared_arrays.get() called in a process that never attach()ed")
+        array = _mapped[key] = np.load(os.path.join(_dir, f"{key}.npy"), mmap_mode="r")
+    return array
@@ -0,0 +1,8 @@
+# models-api/tests/conftest.py
+"""Puts models-api/src on sys.path; the service modules are imported by plain name, as the API does."""
+import os
+import sys
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(API_ROOT, "src")
+sys.path.insert(0, SRC_DIR)
@@ -0,0 +1,26 @@
+# models-api/tests/test_api.py
+"""Endpoint-level checks through FastAPI's TestClient."""
+import re
+
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient  # noqa: E402
+
+import fastapi_app  # noqa: E402
+
+PATIENT = {"name": "A", "email": "a@example.org", "age": 61, "gender": "1", "sbp": 150, "ldl": 4.1, "smoker": "1"}
+
+
+def _count(metrics: str, stage: str) -> float:
+    match = re.search(rf'^risk_stage_seconds_count{{stage="{stage}"}} (\S+)$', metrics, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_add_patient_records_the_validate_stage():
+    with TestClient(fastapi_app.app) as client:
+        before = _count(client.get("/metrics").text, "validate")
+        assert client.post("/api/patient/add", json=PATIENT).status_code == 200
+        assert client.post("/api/patient/add", json={**PATIENT, "age": "old"}).status_code == 422
+        after = _count(client.get("/metrics").text, "validate")
+    assert after - before == 2
@@ -0,0 +1,34 @@
+# models-api/tests/test_coldstart.py
+"""Importing the API and answering /health must not pull in numpy, joblib or sklearn (STARTUP_MODE=lazy)."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("httpx")
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = """
+import json, sys
+sys.path.insert(0, {api_dir!r})
+import index
+from fastapi.testclient import TestClient
+with TestClient(index.app) as client:
+    response = client.get("/health")
+print(json.dumps({{"status": response.status_code, "scoring_loaded": response.json()["scoring_loaded"],
+                  "heavy": [m for m in ("numpy", "joblib", "sklearn") if m in sys.modules]}}))
+"""
+
+
+def test_import_and_health_stay_light():
+    env = {**os.environ, "STARTUP_MODE": "lazy"}
+    code = _CHILD.format(api_dir=os.path.join(API_ROOT, "api"))
+    res = subprocess.run([sys.executable, "-c", code], cwd=API_ROOT, env=env, capture_output=True, text=True,
+                         timeout=120)
+    assert res.returncode == 0, res.stderr
+    out = json.loads(res.stdout.strip().splitlines()[-1])
+    assert out["status"] == 200 and out["scoring_loaded"] is False
+    assert out["heavy"] == []
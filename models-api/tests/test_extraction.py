@@ -0,0 +1,43 @@
+# models-api/tests/test_extraction.py
+"""The streaming (ijson) and json.load bundle readers must produce the same cached features."""
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("imblearn")
+import data_preparation_model_training as prep  # noqa: E402
+
+BUNDLE = {"resourceType": "Bundle", "entry": [
+    {"resource": {"resourceType": "Patient", "birthDate": "1961-04-02", "gender": "male"}},
+    # integer values: json.load keeps them ints, ijson(use_float=True) makes them floats
+    {"resource": {"resourceType": "Observation", "code": {"coding": [{"code": "2093-3"}]},
+                  "valueQuantity": {"value": 212, "unit": "mg/dL"}}},
+    {"resource": {"resourceType": "Observation", "code": {"coding": [{"code": "4548-4"}]},
+                  "valueQuantity": {"value": 7, "unit": "%"}}},
+    {"resource": {"resourceType": "Observation", "code": {"coding": [{"code": "39156-5"}]},
+                  "valueQuantity": {"value": 27.4, "unit": "kg/m2"}}},
+    {"resource": {"resourceType": "Observation", "code": {"coding": [{"code": "85354-9"}]}, "component": [
+        {"code": {"coding": [{"code": "8480-6"}]}, "valueQuantity": {"value": 141}},
+        {"code": {"coding": [{"code": "8462-4"}]}, "valueQuantity": {"value": 88}}]}},
+    {"resource": {"resourceType": "Condition", "code": {"coding": [{"code": "I10", "display": "Hypertension"}]}}},
+    {"resource": {"resourceType": "FamilyMemberHistory", "age": {"value": 50},
+                  "condition": [{"code": {"coding": [{"code": "I21"}]}}]}},
+]}
+
+
+def test_streaming_and_json_load_give_identical_batches(tmp_path):
+    pytest.importorskip("ijson")
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"patient_{i}.json"
+        path.write_text(json.dumps(BUNDLE), encoding="utf-8")
+        paths.append(str(path))
+    loaded = prep.extract_bundle_files(paths, stream_min_bytes=1 << 40)
+    streamed = prep.extract_bundle_files(paths, stream_min_bytes=0)
+    for a, b in zip(loaded, streamed):
+        assert a.dtype == b.dtype and a.tobytes() == b.tobytes()
+    row = prep.extract_patient_features(BUNDLE)
+    assert row["sbp"] == 141.0 and type(row["sbp"]) is float
+    assert type(row["age"]) is int and row["gender"] == 1
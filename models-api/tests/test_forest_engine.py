@@ -0,0 +1,85 @@
+# models-api/tests/test_forest_engine.py
+"""CompiledForest against sklearn's predict_proba on the scaled input it replaces."""
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+from forest_engine import CompiledForest  # noqa: E402
+
+TOL = 1e-12
+
+
+def _fit(n_classes: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # clinical-looking scales (age, sbp, ldl, bmi) and a 0/1 flag, so the scaler actually moves thresholds
+    X = np.column_stack([rng.normal(55, 12, 600), rng.normal(130, 18, 600), rng.normal(3.2, 0.9, 600),
+                         rng.normal(27, 5, 600), rng.integers(0, 2, 600)]).round(1)
+    score = (X[:, 0] - 55) / 12 + (X[:, 1] - 130) / 18 + X[:, 4] + rng.normal(0, 0.5, 600)
+    y = np.digitize(score, np.quantile(score, np.linspace(0, 1, n_classes + 1)[1:-1]))
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=25, max_depth=8, class_weight="balanced",
+                                   random_state=seed).fit(scaler.transform(X), y)
+    return X, scaler, model
+
+
+def _reference(model, scaler, X):
+    return model.predict_proba(scaler.transform(X))
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_batches_match_sklearn(n_classes):
+    X, scaler, model = _fit(n_classes)
+    engine = CompiledForest.from_sklearn(model, scaler)
+    np.testing.assert_array_equal(engine.classes, model.classes_)
+    for rows in (2, 17, 64, len(X)):
+        np.testing.assert_allclose(engine.predict_proba(X[:rows]), _reference(model, scaler, X[:rows]),
+                                   rtol=0, atol=TOL)
+    # chunking must not change results
+    np.testing.assert_allclose(engine.predict_proba(X, chunk_rows=7), _reference(model, scaler, X), rtol=0, atol=TOL)
+
+
+def test_single_rows_match_sklearn():
+    X, scaler, model = _fit(3)
+    engine = CompiledForest.from_sklearn(model, scaler)
+    for row in X[:50]:
+        np.testing.assert_allclose(engine.predict_proba(row[None, :]), _reference(model, scaler, row[None, :]),
+                                   rtol=0, atol=TOL)
+
+
+def test_split_threshold_values_match_sklearn():
+    # raw inputs sitting exactly on the folded thresholds are where a wrong fold shows up
+    X, scaler, model = _fit(2)
+    engine = CompiledForest.from_sklearn(model, scaler)
+    splits = np.isfinite(engine.threshold)
+    rows = np.tile(X[:1], (int(splits.sum()), 1))
+    rows[np.arange(len(rows)), engine.feature[splits]] = engine.threshold[splits]
+    np.testing.assert_allclose(engine.predict_proba(rows), _reference(model, scaler, rows), rtol=0, atol=TOL)
+
+
+def test_nan_imputed_rows_match_sklearn():
+    # the API fills missing fields with the imputation values before predicting
+    X, scaler, model = _fit(3)
+    rng = np.random.default_rng(1)
+    raw = np.where(rng.random(X.shape) < 0.4, np.nan, X)
+    filled = np.where(np.isnan(raw), np.nanmedian(X, axis=0), raw)
+    engine = CompiledForest.from_sklearn(model, scaler)
+    np.testing.assert_allclose(engine.predict_proba(filled), _reference(model, scaler, filled), rtol=0, atol=TOL)
+
+
+def test_save_load_roundtrip(tmp_path):
+    X, scaler, model = _fit(3)
+    path = tmp_path / "forest.npz"
+    CompiledForest.from_sklearn(model, scaler).save(path)
+    for mmap in (True, False):
+        engine = CompiledForest.load(path, mmap=mmap)
+        assert engine.mmapped == mmap
+        np.testing.assert_allclose(engine.predict_proba(X), _reference(model, scaler, X), rtol=0, atol=TOL)
+
+
+def test_scaler_width_mismatch_raises():
+    X, scaler, model = _fit(2)
+    with pytest.raises(ValueError):
+        CompiledForest.from_sklearn(model, StandardScaler().fit(X[:, :3]))
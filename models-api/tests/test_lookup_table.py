@@ -0,0 +1,53 @@
+# models-api/tests/test_lookup_table.py
+"""LookupTable is an exact memo: hits read the model's own output, anything off the grid is not a hit."""
+import numpy as np
+
+from lookup_table import LookupTable
+
+COLUMNS = ["age", "sbp", "ldl", "bmi"]
+FILL = [40.0, 120.0, 3.0, 25.0]
+GRID = {"sbp": (90.0, 200.0, 2.0), "ldl": (1.0, 6.0, 0.1)}
+
+
+def _predict(X: np.ndarray) -> np.ndarray:
+    # any non-linear function of every column: a wrong cell or a rounded input shows up
+    return np.sin(X[:, 0] * 0.1) * 0.1 + np.tanh((X[:, 1] - 130) / 20) * 0.3 + np.log1p(X[:, 2]) * 0.1 + X[:, 3] * 1e-3
+
+
+def _table() -> LookupTable:
+    return LookupTable.build(COLUMNS, FILL, GRID, _predict, meta={"forest_sha1": "x", "positive_classes": [1]})
+
+
+def test_grid_inputs_are_hits_with_the_exact_value():
+    table = _table()
+    X = table.sample_inputs(5000, np.random.default_rng(0))
+    hit, p = table.lookup(X)
+    assert hit.all()
+    np.testing.assert_array_equal(p, _predict(np.where(np.isnan(X), table.fill, X)))
+    # a decimal as a request sends it, not the float the grid arithmetic produces
+    hit, p = table.lookup(np.array([[np.nan, 142.0, 4.1, np.nan]]))
+    assert hit[0] and p[0] == _predict(np.array([[40.0, 142.0, 4.1, 25.0]]))[0]
+
+
+def test_off_grid_and_other_features_are_not_hits():
+    table = _table()
+    X = table.sample_inputs(5000, np.random.default_rng(1), missing=0.0, off_grid=1.0)
+    hit, p = table.lookup(X)
+    assert not hit.any() and np.isnan(p).all()
+    rows = np.array([[np.nan, 141.0, 3.0, np.nan],    # between grid points
+                     [np.nan, 300.0, 3.0, np.nan],    # past the last one
+                     [55.0, 140.0, 3.0, np.nan],      # a non-grid feature set
+                     [40.0, 140.0, 3.0, np.nan]])     # ... to its imputed value: still a hit
+    hit, _ = table.lookup(rows)
+    assert hit.tolist() == [False, False, False, True]
+
+
+def test_save_load_memory_maps_the_table(tmp_path):
+    table, path = _table(), tmp_path / "t.lookup.npz"
+    table.save(path)
+    X = table.sample_inputs(1000, np.random.default_rng(2))
+    for mmap in (True, False):
+        loaded = LookupTable.load(path, mmap=mmap)
+        assert loaded.mmapped == mmap
+        assert loaded.meta == table.meta and loaded.matches(COLUMNS, FILL)
+        np.testing.assert_array_equal(loaded.lookup(X)[1], table.lookup(X)[1])
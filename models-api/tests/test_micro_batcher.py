@@ -0,0 +1,55 @@
+# models-api/tests/test_micro_batcher.py
+"""MicroBatcher must resolve every coalesced caller, whatever happens to the batch."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from micro_batcher import MicroBatcher
+
+
+def _gather(batcher: MicroBatcher, items):
+    async def go():
+        return await asyncio.gather(*(batcher.submit(i) for i in items), return_exceptions=True)
+    return asyncio.run(asyncio.wait_for(go(), timeout=5))
+
+
+def test_results_are_returned_per_caller():
+    async def double(items):
+        return [2 * i for i in items]
+    batcher = MicroBatcher(double, window_ms=5, max_batch=8)
+    assert _gather(batcher, range(20)) == [2 * i for i in range(20)]
+    assert batcher.running == 0
+
+
+def test_each_caller_gets_its_own_exception():
+    async def shed(items):
+        raise HTTPException(status_code=503, detail="busy", headers={"Retry-After": "1"})
+    batcher = MicroBatcher(shed, window_ms=5, max_batch=8)
+    errors = _gather(batcher, range(6))
+    assert all(isinstance(e, HTTPException) and e.status_code == 503 and e.headers == {"Retry-After": "1"}
+               for e in errors)
+    assert len({id(e) for e in errors}) == len(errors)
+
+
+def test_cancelled_batch_cancels_its_callers():
+    seen = []
+
+    async def hang(items):
+        seen.extend(items)
+        await asyncio.sleep(60)
+
+    async def go():
+        batcher = MicroBatcher(hang, window_ms=1, max_batch=4)
+        callers = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        while len(seen) < len(callers):  # the first row is dispatched alone, the rest one window later
+            await asyncio.sleep(0.001)
+        for task in asyncio.all_tasks():
+            if task.get_coro().__qualname__ == "MicroBatcher._run":
+                task.cancel()  # the batch tasks, as at shutdown
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        return batcher, results
+
+    batcher, results = asyncio.run(asyncio.wait_for(go(), timeout=5))
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert batcher.running == 0
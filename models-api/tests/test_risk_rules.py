@@ -0,0 +1,149 @@
+# models-api/tests/test_risk_rules.py
+"""
+Exact parity of the vectorized rules (risk_rules.py) with the scalar Python they replace:
+the training label rules, and the linear heuristic add_patient used to compute inline.
+
+Inputs come from a grid that hits every threshold exactly, just either side of it, 0 and
+missing (None / NaN), so each `x and x >= t` / `x is not None` branch is taken. The
+heuristic must match bit for bit.
+"""
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+import risk_rules
+from disease_specs import DISEASES
+
+
+# ─── Reference: the scalar rules as training and the API had them ───
+def cvd_risk(age, gender, sbp, dbp, tc, hdl, ldl, smoking_status, has_dm, family_cad) -> int:
+    score = 0
+    if age and age >= 50: score += 2 if age >= 65 else 1
+    if gender == 1 and age and age >= 45: score += 1
+    if tc and tc >= 6.2: score += 2
+    elif tc and tc >= 5.2: score += 1
+    if hdl and ((gender == 1 and hdl < 1.0) or (gender == 0 and hdl < 1.3)): score += 1
+    if ldl and ldl >= 4.1: score += 2
+    elif ldl and ldl >= 2.6: score += 1
+    if sbp and sbp >= 160 or dbp and dbp >= 100: score += 2
+    elif sbp and sbp >= 140 or dbp and dbp >= 90: score += 1
+    if smoking_status == 2: score += 2
+    elif smoking_status == 1: score += 1
+    if has_dm: score += 2
+    if family_cad: score += 1
+    return 2 if score >= 8 else 1 if score >= 4 else 0
+
+
+def diabetes_label(hba1c, has_diabetes_icd) -> int:
+    if has_diabetes_icd: return 1
+    if hba1c is not None and hba1c >= 6.5: return 1
+    return 0
+
+
+def ckd_label(egfr, creat, uacr, has_ckd_icd) -> int:
+    if has_ckd_icd: return 1
+    if egfr is not None and egfr < 60: return 1
+    if creat is not None and creat > 120: return 1
+    return 0
+
+
+def nafld_label(alt, ast, has_nafld_icd) -> int:
+    if has_nafld_icd: return 1
+    if alt is not None and alt > 70: return 1
+    if ast is not None and ast > 70: return 1
+    return 0
+
+
+SCALAR_LABELS = {"risk_label": cvd_risk, "diabetes_label": diabetes_label,
+                 "ckd_label": ckd_label, "nafld_label": nafld_label}
+
+
+def inline_cardio(sbp, ldl, smoker, dm, age, bmi) -> float:
+    """add_patient's cardio heuristic before the rules module (payload fields: numbers or None, flags "0"/"1"/None)."""
+    sbp = sbp or 120
+    ldl = ldl or 2.5
+    smoker = 1.0 if smoker == "1" else 0.0
+    dm = 1.0 if dm == "1" else 0.0
+    age = age or 40.0
+    bmi = bmi or 25.0
+    raw_cardio = 0.003 * (sbp - 120) + 0.04 * (ldl - 3.0) + 0.1 * smoker + 0.08 * dm + 0.002 * (age - 40) + 0.003 * (bmi - 25)
+    return 0.05 + raw_cardio
+
+
+def inline_diabetes(hba1c, glucose, bmi, fam_cad) -> float:
+    """add_patient's diabetes heuristic before the rules module."""
+    hba1c = hba1c or 5.5
+    glucose = glucose or 5.2
+    fam = 1.0 if fam_cad == "1" else 0.0
+    bmi = bmi or 25.0
+    raw_dm = 0.08 * (hba1c - 5.5) + 0.03 * (glucose - 5.0) + 0.02 * (bmi - 25) + 0.05 * fam
+    return 0.05 + raw_dm
+
+
+INLINE_HEURISTICS = {"cardio": inline_cardio, "diabetes": inline_diabetes}
+
+
+# ─── Inputs ───
+# values around every threshold the rules and heuristic terms use; 0 and None are added to each
+GRID = {
+    "age": [30, 44, 45, 49, 50, 64, 65, 80], "gender": [1, 0],
+    "sbp": [120, 139, 140, 159.9, 160], "dbp": [80, 89, 90, 99, 100],
+    "tc": [4.5, 5.19, 5.2, 6.19, 6.2], "hdl": [0.9, 1.0, 1.29, 1.3, 1.6], "ldl": [2.5, 2.6, 4.09, 4.1],
+    "hba1c": [5.5, 6.49, 6.5, 8.0], "glucose": [4.8, 5.2, 7.5], "bmi": [22.0, 25.0, 31.5],
+    "egfr": [45, 59.9, 60, 90], "creat": [80, 120, 120.1], "uacr": [5, 10, 45],
+    "alt": [25, 70, 70.1], "ast": [30, 70, 71], "bilirubin": [0.5, 0.9],
+}
+FLAGS = {"smoker": [0, 1, 2], "dm": [0, 1], "htn": [0, 1], "fam_cad": [0, 1],
+         "has_diabetes_icd": [0, 1], "has_ckd_icd": [0, 1], "has_nafld_icd": [0, 1]}
+
+
+def sample_rows(n: int, rng: random.Random):
+    """n random grid rows as dicts (None = missing) and as columns (NaN = missing, flags int8)."""
+    cols = list(GRID) + list(FLAGS)
+    rows = []
+    for _ in range(n):
+        row = {c: rng.choice(GRID[c] + [0, None]) for c in GRID}
+        row["gender"] = rng.choice([1, 0, None])
+        row.update({c: rng.choice(v) for c, v in FLAGS.items()})
+        rows.append(row)
+    arrays = {c: np.array([np.nan if r[c] is None else r[c] for r in rows], dtype=float) for c in cols}
+    for c in FLAGS:
+        arrays[c] = arrays[c].astype(np.int8)
+    return rows, arrays
+
+
+def scalar_labels(rows):
+    out = {}
+    for label, fn in SCALAR_LABELS.items():
+        _, inputs = risk_rules.LABEL_RULES[label]
+        out[label] = [fn(*(r[c] for c in inputs)) for r in rows]
+    return out
+
+
+# ─── Tests ───
+def test_label_columns_match_scalar_rules():
+    rows, arrays = sample_rows(50_000, random.Random(0))
+    got = risk_rules.label_columns(arrays.__getitem__)
+    for label, expected in scalar_labels(rows).items():
+        assert got[label].dtype == np.int8
+        mismatched = np.flatnonzero(np.asarray(expected) != got[label])
+        assert not len(mismatched), f"{label}: {len(mismatched)} rows differ, first {rows[mismatched[0]]}"
+        assert len(np.unique(got[label])) > 1  # the grid reaches every branch, not one constant
+
+
+@pytest.mark.parametrize("name", sorted(INLINE_HEURISTICS))
+def test_linear_score_is_bit_identical_to_the_inline_heuristic(name):
+    spec, inline = DISEASES[name], INLINE_HEURISTICS[name]
+    fields = list(spec.fallback_terms)
+    assert fields == list(inline.__code__.co_varnames[:inline.__code__.co_argcount])
+    # every combination of a grid value, 0 and missing; flags as the payload strings
+    choices = [["0", "1", None] if f in FLAGS else GRID[f] + [0, None] for f in fields]
+    payloads = list(itertools.product(*choices))
+    columns = {f: np.array([np.nan if p[i] is None else float(p[i]) for p in payloads])
+               for i, f in enumerate(fields)}
+    got = risk_rules.linear_score(spec.fallback_base, spec.fallback_terms, columns.__getitem__, len(payloads))
+    expected = [inline(*p) for p in payloads]
+    differ = [(p, e, g) for p, e, g in zip(payloads, expected, got.tolist()) if e.hex() != g.hex()]
+    assert not differ, f"{len(differ)} of {len(payloads)} payloads differ, first {differ[0]}"